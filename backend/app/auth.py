@@ -1,23 +1,33 @@
 # backend/app/auth.py
-from sqlalchemy.orm import Session
-from passlib.context import CryptContext
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, selectinload
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from fastapi.concurrency import run_in_threadpool
 from typing import Optional
 import os
+import time
+import threading
 
 from app.database import SessionLocal
-from app import models, schemas
+from app import models, schemas, risk
 from app.config import settings
+from app.utils.ttl_cache import TTLCache
+from app.utils.password_hasher import password_hasher, pwd_context, HasherSaturated
 
 # Secret key and algorithm from config
 SECRET_KEY = settings.secret_key
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Verified tokens are cached per worker. An entry lives until the token's exp,
+# capped at AUTH_CACHE_TTL_SECONDS so invalidations made in another worker
+# are seen within that time.
+AUTH_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "10000"))
+AUTH_CACHE_TTL_SECONDS = float(os.getenv("AUTH_CACHE_TTL_SECONDS", "60"))
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/token")
 
 def get_db():
@@ -36,9 +46,24 @@ def get_password_hash(password):
 def get_user(db: Session, username: str):
     return db.query(models.User).filter(models.User.username == username).first()
 
-def authenticate_user(db: Session, username: str, password: str):
-    user = get_user(db, username)
-    if not user or not verify_password(password, user.hashed_password):
+async def hash_in_pool(fn, *args):
+    # bcrypt runs in password_hasher's process pool; a full queue is a 503, not a wait
+    try:
+        return await fn(*args)
+    except HasherSaturated as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+
+def release_connection(db: Session):
+    # Return the session's pooled connection before a slow await; a login
+    # burst holding one each would drain the pool and block the event loop
+    db.close()
+
+async def authenticate_user(db: Session, username: str, password: str):
+    user = await run_in_threadpool(get_user, db, username)
+    if not user:
+        return False
+    release_connection(db)
+    if not await hash_in_pool(password_hasher.verify, password, user.hashed_password):
         return False
     return user
 
@@ -52,32 +77,121 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)):
-    credentials_exception = HTTPException(
+class TokenCache:
+    """
+    Bounded, TTL-limited map of verified token -> schemas.User identity.
+    invalidate_user() drops every cached token of a user at once by bumping
+    that user's generation; entries from an older generation are misses.
+    """
+
+    def __init__(self, max_entries=AUTH_CACHE_MAX_ENTRIES, max_ttl=AUTH_CACHE_TTL_SECONDS):
+        self.max_ttl = max_ttl
+        self._cache = TTLCache(max_entries=max_entries)
+        self._generations = {}  # username -> invalidation count
+        self._lock = threading.Lock()
+
+    def get(self, token):
+        entry = self._cache.get(token)
+        if entry is None:
+            return None
+        identity, generation = entry
+        if self._generations.get(identity.username, 0) != generation:
+            self._cache.invalidate(token)
+            return None
+        return identity
+
+    def generation(self, username):
+        return self._generations.get(username, 0)
+
+    def set(self, token, identity, expires_at, generation):
+        ttl = min(expires_at - time.time(), self.max_ttl)
+        if ttl > 0:
+            self._cache.set(token, (identity, generation), ttl)
+
+    def invalidate_user(self, username):
+        with self._lock:
+            self._generations[username] = self._generations.get(username, 0) + 1
+
+    def clear(self):
+        self._cache.clear()
+
+
+token_cache = TokenCache()
+
+def credentials_exception():
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+def decode_token(token: str):
+    """
+    (username, exp) of a valid token; raises 401 otherwise.
+    """
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
+    except JWTError:
+        raise credentials_exception()
+    username, expires_at = payload.get("sub"), payload.get("exp")
+    if username is None or expires_at is None:
+        raise credentials_exception()
+    return username, expires_at
+
+def load_identity(token: str):
+    """
+    Verify token and look up its user, bypassing the cache.
+    """
+    username, expires_at = decode_token(token)
+    # Read before the lookup so an invalidation racing with it isn't cached over
+    generation = token_cache.generation(username)
+    db = SessionLocal()
+    try:
         user = get_user(db, username)
         if user is None:
-            raise credentials_exception
-        return user
-    except JWTError:
-        raise credentials_exception
+            raise credentials_exception()
+        identity = schemas.User(id=user.id, username=user.username)
+    finally:
+        db.close()
+    token_cache.set(token, identity, expires_at, generation)
+    return identity
+
+async def get_current_identity(token: str = Depends(oauth2_scheme)) -> schemas.User:
+    """
+    Id and username of the caller. Cached tokens are answered without JWT
+    verification, a database session or a threadpool hop.
+    """
+    identity = token_cache.get(token)
+    if identity is not None:
+        return identity
+    return await run_in_threadpool(load_identity, token)
+
+def get_current_user(db: Session = Depends(get_db), identity: schemas.User = Depends(get_current_identity)):
+    # For endpoints that need the ORM object itself
+    user = db.get(models.User, identity.id)
+    if user is None:
+        raise credentials_exception()
+    return user
 
-def create_user(db: Session, user: schemas.UserCreate):
-    hashed_password = get_password_hash(user.password)
+async def create_user(db: Session, user: schemas.UserCreate):
+    release_connection(db)
+    hashed_password = await hash_in_pool(password_hasher.hash, user.password)
     db_user = models.User(username=user.username, hashed_password=hashed_password)
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    # Session I/O is blocking; keep it off the event loop like the bcrypt work
+    await run_in_threadpool(save_user, db, db_user)
     return db_user
 
+def save_user(db: Session, user: models.User):
+    db.add(user)
+    try:
+        db.commit()
+    except IntegrityError:
+        # Lost a race with a concurrent registration of the same username
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Username already taken.")
+    db.refresh(user)
+    return user
+
 # Portfolio Management Functions
 def create_portfolio(db: Session, portfolio: schemas.PortfolioCreate):
     db_portfolio = models.Portfolio(name=portfolio.name, user_id=portfolio.user_id)
@@ -86,8 +200,12 @@ def create_portfolio(db: Session, portfolio: schemas.PortfolioCreate):
     db.refresh(db_portfolio)
     return db_portfolio
 
-def get_portfolio(db: Session, user_id: int):
-    return db.query(models.Portfolio).filter(models.Portfolio.user_id == user_id).first()
+def get_portfolio(db: Session, user_id: int, with_holdings: bool = False):
+    query = db.query(models.Portfolio).filter(models.Portfolio.user_id == user_id)
+    if with_holdings:
+        # One extra IN query for all holdings instead of a lazy load on first access
+        query = query.options(selectinload(models.Portfolio.holdings))
+    return query.first()
 
 def add_holding(db: Session, user_id: int, holding: schemas.HoldingCreate):
     portfolio = get_portfolio(db, user_id)
@@ -118,11 +236,20 @@ def remove_holding(db: Session, user_id: int, holding_id: int):
     db.commit()
     return holding
 
-def get_portfolio_risk(db: Session, user_id: int):
-    portfolio = get_portfolio(db, user_id)
+async def get_portfolio_risk(db: Session, user_id: int):
+    portfolio = await run_in_threadpool(get_portfolio, db, user_id, True)
     if not portfolio:
         raise HTTPException(status_code=404, detail="Portfolio not found.")
-    # Placeholder for risk calculations
-    var = 1000.0  # Example Value at Risk
-    sharpe_ratio = 1.5  # Example Sharpe Ratio
-    return schemas.RiskMetrics(var=var, sharpe_ratio=sharpe_ratio)
+    quantities = {}
+    for holding in portfolio.holdings:
+        ticker = holding.ticker.upper()
+        quantities[ticker] = quantities.get(ticker, 0) + holding.quantity
+    release_connection(db)
+    if not quantities:
+        raise HTTPException(status_code=400, detail="Portfolio has no holdings.")
+    try:
+        closes = await risk.fetch_closes(list(quantities))
+        metrics = await run_in_threadpool(risk.compute_risk, closes, list(quantities.values()))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return schemas.RiskMetrics(**metrics)
@@ -0,0 +1,139 @@
+# backend/app/backtest.py
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from app.pricing import black_scholes, RISK_FREE_RATE
+
+TRADING_DAYS = 252
+
+# Legs per strategy as (instrument, strike offset in widths from entry spot, quantity).
+# Mirrors the execution steps in strategy.get_execution_steps.
+STRATEGY_LEGS = {
+    "call_spread": [("call", -1, 1), ("call", 1, -1)],
+    "put_spread": [("put", 1, 1), ("put", -1, -1)],
+    "iron_condor": [("call", 1, -1), ("call", 2, 1), ("put", -1, -1), ("put", -2, 1)],
+    "covered_call": [("stock", 0, 1), ("call", 1, -1)],
+    "protective_put": [("stock", 0, 1), ("put", -1, 1)],
+    "straddle": [("call", 0, 1), ("put", 0, 1)],
+    "strangle": [("call", 1, 1), ("put", -1, 1)],
+    "butterfly": [("call", -1, 1), ("call", 0, -2), ("call", 1, 1)],
+    "hold": [("stock", 0, 1)],
+}
+
+RESULT_COLUMNS = [
+    'strategy', 'holding_days', 'width', 'trades',
+    'mean_return', 'median_return', 'hit_rate', 'mean_drawdown', 'max_drawdown'
+]
+
+
+def _leg_matrix(strategies):
+    """
+    Distinct option contracts across the strategies and a (strategies x
+    contracts) quantity matrix, so each contract is priced once and every
+    strategy's value is a single matrix product.
+    """
+    contracts = sorted({(kind, offset) for name in strategies for kind, offset, _ in STRATEGY_LEGS[name] if kind != "stock"})
+    index = {contract: i for i, contract in enumerate(contracts)}
+    quantities = np.zeros((len(strategies), len(contracts)))
+    stock = np.zeros(len(strategies))
+    for s, name in enumerate(strategies):
+        for kind, offset, qty in STRATEGY_LEGS[name]:
+            if kind == "stock":
+                stock[s] += qty
+            else:
+                quantities[s, index[(kind, offset)]] += qty
+    return contracts, quantities, stock
+
+
+def realized_volatility(closes, lookback=20):
+    """
+    Annualized close-to-close volatility over the trailing lookback days;
+    NaN until lookback returns are available.
+    """
+    log_returns = np.diff(np.log(closes))
+    vol = np.full(len(closes), np.nan)
+    if len(log_returns) >= lookback:
+        windows = sliding_window_view(log_returns, lookback)
+        vol[lookback:] = windows.std(axis=1, ddof=1) * np.sqrt(TRADING_DAYS)
+    return vol
+
+
+def strategy_pnl_paths(closes, holding_days, widths, strategies=None, lookback=20,
+                       vol_multiplier=1.0, r=RISK_FREE_RATE, step=1):
+    """
+    Mark-to-market P&L paths for every strategy, strike width and start date.
+
+    Each trade opens at a start date's close on a synthetic chain priced with
+    Black-Scholes at the trailing realized volatility (times vol_multiplier),
+    expiring holding_days trading days later, and is revalued at every close
+    until expiry. Strikes sit at spot * (1 + offset * width).
+
+    Returns (paths, starts): paths has shape (strategies, widths, starts,
+    holding_days + 1) in price units per share, starting at 0; starts are the
+    positions in closes where trades were opened.
+    """
+    strategies = list(strategies or STRATEGY_LEGS)
+    closes = np.asarray(closes, dtype=np.float64)
+    widths = np.asarray(widths, dtype=np.float64)
+    sigma = realized_volatility(closes, lookback) * vol_multiplier
+
+    starts = np.arange(lookback, len(closes) - holding_days, step)
+    starts = starts[np.isfinite(sigma[starts])]
+    if starts.size == 0:
+        return np.zeros((len(strategies), widths.size, 0, holding_days + 1)), starts
+
+    # (starts, days) spot path of each trade
+    spots = sliding_window_view(closes, holding_days + 1)[starts]
+    entry = spots[:, :1]
+    T = (holding_days - np.arange(holding_days + 1)) / TRADING_DAYS
+    contracts, quantities, stock = _leg_matrix(strategies)
+
+    # Price every contract at once: (contracts, widths, starts, days)
+    offsets = np.array([offset for _, offset in contracts], dtype=np.float64)[:, None, None, None]
+    is_call = np.array([kind == "call" for kind, _ in contracts])[:, None, None, None]
+    strikes = entry[None, None] * (1.0 + offsets * widths[None, :, None, None])
+    values = black_scholes(spots[None, None], strikes, T, sigma[starts][:, None], is_call, r=r)['price']
+
+    # (strategies, widths, starts, days)
+    position = np.tensordot(quantities, values, axes=1) + stock[:, None, None, None] * spots[None, None]
+    return position - position[..., :1], starts
+
+
+def backtest(closes, holding_days=(5, 10, 21), widths=(0.025, 0.05, 0.1), strategies=None,
+             lookback=20, vol_multiplier=1.0, r=RISK_FREE_RATE, step=1) -> pd.DataFrame:
+    """
+    Backtest every strategy over all start dates for each holding period and
+    strike width. Returns are P&L at expiry over the entry spot (per share of
+    underlying notional); drawdown is the worst peak-to-trough of a trade's
+    mark-to-market P&L on the same scale. hit_rate is the share of trades
+    that finished with a profit.
+    """
+    strategies = list(strategies or STRATEGY_LEGS)
+    closes = np.asarray(closes, dtype=np.float64)
+    frames = []
+    for days in holding_days:
+        paths, starts = strategy_pnl_paths(
+            closes, days, widths, strategies, lookback=lookback,
+            vol_multiplier=vol_multiplier, r=r, step=step
+        )
+        if starts.size == 0:
+            continue
+        notional = closes[starts]
+        returns = paths[..., -1] / notional
+        drawdowns = (np.maximum.accumulate(paths, axis=-1) - paths).max(axis=-1) / notional
+
+        frames.append(pd.DataFrame({
+            'strategy': np.repeat(strategies, len(widths)),
+            'holding_days': days,
+            'width': np.tile(np.asarray(widths, dtype=np.float64), len(strategies)),
+            'trades': starts.size,
+            'mean_return': returns.mean(axis=-1).ravel(),
+            'median_return': np.median(returns, axis=-1).ravel(),
+            'hit_rate': (returns > 0).mean(axis=-1).ravel(),
+            'mean_drawdown': drawdowns.mean(axis=-1).ravel(),
+            'max_drawdown': drawdowns.max(axis=-1).ravel(),
+        }))
+    if not frames:
+        return pd.DataFrame(columns=RESULT_COLUMNS)
+    return pd.concat(frames, ignore_index=True)[RESULT_COLUMNS]
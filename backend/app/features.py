@@ -0,0 +1,159 @@
+# backend/app/features.py
+#
+# Feature engineering shared by the training scripts and the API, so a model
+# is always served the same inputs it was trained on.
+
+import os
+import joblib
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from sklearn.preprocessing import MinMaxScaler
+from app.pricing import years_to_expiry
+
+# LSTM next-close model: daily-bar indicators over a trailing window
+LSTM_FEATURES = ['Close', 'SMA_50', 'SMA_200', 'RSI']
+LSTM_WINDOW = int(os.getenv("LSTM_WINDOW", "20"))
+RSI_PERIOD = 14
+# Bars needed before the first complete feature row (the 200-day SMA)
+INDICATOR_WARMUP = 199
+
+# FNN strategy model: one row per contract of an option chain
+CHAIN_FEATURES = ['Close', 'strike', 'T', 'impliedVolatility', 'moneyness', 'lastPrice', 'volume', 'openInterest', 'option_type_encoded']
+
+
+def _rolling_mean(values, window):
+    # Trailing mean via cumulative sums; NaN until window values are available
+    out = np.full(len(values), np.nan)
+    if len(values) >= window:
+        csum = np.cumsum(np.insert(values, 0, 0.0))
+        out[window - 1:] = (csum[window:] - csum[:-window]) / window
+    return out
+
+
+def indicator_matrix(closes) -> np.ndarray:
+    """
+    (len(closes), len(LSTM_FEATURES)) array of Close, 50/200-day SMAs and a
+    14-day RSI (simple average gains over losses). Rows before
+    INDICATOR_WARMUP bars are NaN.
+    """
+    closes = np.asarray(closes, dtype=np.float64)
+    delta = np.diff(closes, prepend=np.nan)
+    gain = _rolling_mean(np.where(delta > 0, delta, 0.0), RSI_PERIOD)
+    loss = _rolling_mean(np.where(delta < 0, -delta, 0.0), RSI_PERIOD)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = 100.0 - 100.0 / (1.0 + gain / loss)
+    return np.column_stack([
+        closes,
+        _rolling_mean(closes, 50),
+        _rolling_mean(closes, 200),
+        rsi,
+    ])
+
+
+def indicator_frame(bars: pd.DataFrame) -> pd.DataFrame:
+    """
+    LSTM_FEATURES for every bar with a complete history, indexed like bars.
+    """
+    features = pd.DataFrame(indicator_matrix(bars['Close'].to_numpy()), index=bars.index, columns=LSTM_FEATURES)
+    return features.dropna()
+
+
+class FeaturePipeline:
+    """
+    Scaled, windowed LSTM inputs. The fitted scaler, window and feature list
+    are saved next to the model (see pipeline_path) so serving reproduces
+    training exactly.
+    """
+
+    def __init__(self, window=LSTM_WINDOW, features=None, scaler=None):
+        self.window = window
+        self.features = list(features or LSTM_FEATURES)
+        self.scaler = scaler
+
+    @property
+    def input_shape(self):
+        return (self.window, len(self.features))
+
+    def fit(self, features: pd.DataFrame):
+        self.scaler = MinMaxScaler().fit(features[self.features].to_numpy(dtype=np.float64))
+        return self
+
+    def windows(self, features: pd.DataFrame) -> np.ndarray:
+        """
+        (samples, window, n_features) float32: every trailing window of the
+        scaled features, oldest first.
+        """
+        scaled = self.scaler.transform(features[self.features].to_numpy(dtype=np.float64))
+        return sliding_window_view(scaled, self.window, axis=0).transpose(0, 2, 1).astype(np.float32)
+
+    def training_set(self, features: pd.DataFrame):
+        """
+        Windows ending on each day paired with that day's next close.
+        """
+        X = self.windows(features)[:-1]
+        y = features['Close'].to_numpy(dtype=np.float64)[self.window:]
+        return X, y
+
+    @property
+    def history_required(self):
+        return self.window + INDICATOR_WARMUP
+
+    def latest_window(self, bars: pd.DataFrame) -> np.ndarray:
+        """
+        (1, window, n_features) input for the most recent window, computed
+        from only the last history_required bars rather than the whole frame.
+        """
+        if len(bars) < self.history_required:
+            raise ValueError(f"Need at least {self.history_required} daily bars, got {len(bars)}.")
+        closes = bars['Close'].to_numpy(dtype=np.float64)[-self.history_required:]
+        features = indicator_matrix(closes)[-self.window:]
+        scaled = self.scaler.transform(features).astype(np.float32)[None]
+        self.validate(scaled)
+        return scaled
+
+    def validate(self, batch):
+        batch = np.asarray(batch)
+        if batch.ndim != 3 or batch.shape[1:] != self.input_shape:
+            raise ValueError(f"Expected LSTM input of shape (batch, {self.window}, {len(self.features)}), got {batch.shape}.")
+        if not np.isfinite(batch).all():
+            raise ValueError("LSTM input contains NaN or infinite values.")
+
+    def save(self, path):
+        joblib.dump({"window": self.window, "features": self.features, "scaler": self.scaler}, path)
+
+    @classmethod
+    def load(cls, path):
+        state = joblib.load(path)
+        return cls(window=state["window"], features=state["features"], scaler=state["scaler"])
+
+
+def pipeline_path(model_path):
+    # models/lstm_option_pricing_AAPL.npz -> models/lstm_option_pricing_AAPL.pipeline.pkl
+    return os.path.splitext(model_path)[0] + ".pipeline.pkl"
+
+
+def prepare_option_chain(options_data: pd.DataFrame, current_price: float, now: pd.Timestamp) -> pd.DataFrame:
+    """
+    Add moneyness, the T feature (whole days to the tz-aware 'expiration'
+    column, in years) and T_pricing (exact years to the expiration-day
+    close, for IV and Greeks) in place.
+    """
+    options_data['moneyness'] = (options_data['strike'] / current_price) - 1.0
+    options_data['T'] = (options_data['expiration'] - now).dt.days / 365.0
+    options_data['T_pricing'] = years_to_expiry(options_data['expiration'], now)
+    return options_data
+
+
+def option_chain_features(options_data: pd.DataFrame, current_price: float) -> np.ndarray:
+    """
+    Fill gaps and encode a prepared chain in place; returns the
+    (contracts, CHAIN_FEATURES) matrix the FNN is trained and served on.
+    """
+    options_data.fillna(0, inplace=True)
+    options_data['option_type_encoded'] = options_data['option_type'].map({'call': 1, 'put': 0})
+    options_data['Close'] = current_price
+    for col in CHAIN_FEATURES:
+        if col not in options_data.columns:
+            options_data[col] = 0.0
+    return options_data[CHAIN_FEATURES].to_numpy(dtype=np.float64)
@@ -1,30 +1,51 @@
 # backend/app/main.py
 
-from fastapi import FastAPI, HTTPException, Depends, WebSocket
+from fastapi import FastAPI, HTTPException, Depends, Query, WebSocket, status
 from dotenv import load_dotenv
 import os
 from app.auth import (
-    get_current_user,
+    get_current_identity,
+    credentials_exception,
     authenticate_user,
     create_access_token,
     get_db,
-    create_user
+    create_user,
+    get_user,
+    get_portfolio,
+    get_portfolio_risk,
+    release_connection
 )
 from app import schemas, models
-from app.database import engine, Base
 from sqlalchemy.orm import Session
 from fastapi.security import OAuth2PasswordRequestForm
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi import WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse, PlainTextResponse
+from fastapi.encoders import jsonable_encoder
 from app.utils.connection_manager import ConnectionManager
-from app.strategy import make_prediction, generate_strategies
-from app.utils.model_utils import ModelUtils
+from app.strategy import make_prediction, generate_strategies, warm_up_models, lstm_batcher
 from app.utils import data_fetcher
 from app.utils.news_fetcher import fetch_top_business_news
+from app.utils.http_client import upstream
+from app.pricing import chain_greeks, chain_implied_volatility
+from app.vol_surface import get_volatility_surface
+from app.backtest import backtest
+from app import predictions
+from app.features import prepare_option_chain, option_chain_features
+from app.utils.training_jobs import TrainingJobQueue
+from app.utils.price_stream import PriceStreamer, YahooPriceFeed, FakePriceFeed, InterestRegistry, PriceRelay
+from app.utils.pubsub import create_broker
+from app.utils.password_hasher import password_hasher
+from app.utils.instrumentation import InstrumentationMiddleware, instrument_engine, profiler, render_metrics, span, PROFILE_KEEP_SLOWEST
+from app.database import engine
+import numpy as np
 import pandas as pd
-import subprocess
+import json
+import re
+import asyncio
 import logging
-from typing import List
+from typing import List, Optional
 
 # Initialize logging
 logging.basicConfig(
@@ -38,11 +59,6 @@ logging.basicConfig(
 # Load environment variables
 load_dotenv()
 
-# Create all database tables
-if not engine.dialect.has_table(engine, "users"):
-    Base.metadata.create_all(bind=engine)
-
-
 # Initialize FastAPI app
 app = FastAPI()
 
@@ -59,27 +75,104 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(InstrumentationMiddleware)
+instrument_engine(engine)
 
-# Initialize Connection Manager and Model Utils
+# Initialize Connection Manager
 manager = ConnectionManager()
-model_utils = ModelUtils()
+
+# Cross-worker message bus: one price producer per host, fanned out to every worker's sockets
+broker = create_broker()
+ticker_interest = InterestRegistry()
+price_relay = PriceRelay(manager)
+INTEREST_HEARTBEAT_SECONDS = float(os.getenv("INTEREST_HEARTBEAT_SECONDS", "10"))
+
+# /predict/batch limits: tickers per request and tickers in flight at once
+PREDICT_BATCH_MAX_TICKERS = int(os.getenv("PREDICT_BATCH_MAX_TICKERS", "50"))
+PREDICT_BATCH_CONCURRENCY = int(os.getenv("PREDICT_BATCH_CONCURRENCY", "8"))
+
+# /ws limits: tickers one connection may follow, and what a ticker may look like (AAPL, BRK-B, ^GSPC, ES=F)
+WS_MAX_SUBSCRIPTIONS = int(os.getenv("WS_MAX_SUBSCRIPTIONS", "50"))
+TICKER_PATTERN = re.compile(r"^[A-Z0-9^][A-Z0-9.^=-]{0,14}$")
+
+# DEBUG_ENDPOINTS=true serves /debug/profiles (to authenticated users)
+DEBUG_ENDPOINTS = os.getenv("DEBUG_ENDPOINTS", "false").lower() == "true"
+
+async def announce_interest():
+    await broker.publish("interest", json.dumps({"worker": os.getpid(), "tickers": sorted(manager.subscribed_tickers())}))
+
+async def publish_price(ticker, message):
+    await broker.publish("prices", message)
+
+async def deliver_training_update(message):
+    # Only sockets following the job's ticker, on whichever worker holds them
+    await manager.publish(json.loads(message)["ticker"], message)
+
+broker.subscribe("prices", price_relay.deliver)
+broker.subscribe("broadcast", manager.broadcast)
+broker.subscribe("interest", ticker_interest.update)
+broker.subscribe("training", deliver_training_update)
+
+async def notify_training_complete(job):
+    await broker.publish("training", json.dumps({"type": "training_job", **job}))
+
+training_queue = TrainingJobQueue(on_complete=notify_training_complete)
+
+# PRICE_FEED=fake streams a local random walk instead of polling Yahoo
+price_feed = FakePriceFeed() if os.getenv("PRICE_FEED", "yahoo") == "fake" else YahooPriceFeed()
+price_streamer = PriceStreamer(price_feed, ticker_interest.tickers, publish_price)
+
+async def start_price_producer():
+    logging.info(f"Worker {os.getpid()} is the price stream leader.")
+    price_streamer.start()
+
+broker.on_promoted(start_price_producer)
+
+@app.on_event("startup")
+def preload_models():
+    warm_up_models()
+    logging.info("LSTM model cache warmed up.")
+
+async def interest_heartbeat():
+    while True:
+        await asyncio.sleep(INTEREST_HEARTBEAT_SECONDS)
+        try:
+            price_relay.prune()
+            await announce_interest()
+        except Exception as e:
+            logging.error(f"Interest heartbeat failed: {str(e)}")
+
+@app.on_event("startup")
+async def start_price_stream():
+    predictions.prediction_writer.start()
+    await broker.start()
+    app.state.interest_heartbeat = asyncio.get_running_loop().create_task(interest_heartbeat())
+
+@app.on_event("shutdown")
+async def close_upstream_client():
+    app.state.interest_heartbeat.cancel()
+    await price_streamer.stop()
+    await broker.stop()
+    password_hasher.shutdown()
+    await predictions.prediction_writer.stop()
+    await upstream.aclose()
 
 @app.post("/register", response_model=schemas.User)
-def register_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
-    existing_user = db.query(models.User).filter(models.User.username == user.username).first()
+async def register_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
+    existing_user = await run_in_threadpool(get_user, db, user.username)
     if existing_user:
         logging.warning(f"Registration attempt with existing username: {user.username}")
         raise HTTPException(status_code=400, detail="Username already taken.")
-    new_user = create_user(db, user)
+    new_user = await create_user(db, user)
     logging.info(f"New user registered: {new_user.username}")
     return new_user
 
 @app.post("/token", response_model=schemas.Token)
-def login_for_access_token(
+async def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db)
 ):
-    user = authenticate_user(db, form_data.username, form_data.password)
+    user = await authenticate_user(db, form_data.username, form_data.password)
     if not user:
         logging.warning(f"Authentication failed for username: {form_data.username}")
         raise HTTPException(status_code=401, detail="Incorrect username or password")
@@ -88,109 +181,189 @@ def login_for_access_token(
     return {"access_token": access_token, "token_type": "bearer"}
 
 @app.get("/me", response_model=schemas.User)
-def read_users_me(current_user: models.User = Depends(get_current_user)):
+def read_users_me(current_user: schemas.User = Depends(get_current_identity)):
     logging.info(f"User info accessed: {current_user.username}")
     return current_user
 
-@app.post("/predict", response_model=schemas.StrategyResponse)
-def predict_endpoint(
-    request: schemas.PredictionRequest,
-    current_user: models.User = Depends(get_current_user)
-):
-    ticker = request.ticker.upper()
-    logging.info(f"Predict request received for ticker: {ticker}")
+async def run_prediction(ticker: str):
+    """
+    Full predict pipeline for one ticker. Returns (status_code, body): 200 with
+    a StrategyResponse body, or 202 with a TrainingPendingResponse body while
+    the ticker's model is trained. Errors are raised as HTTPException.
+    """
+    # Price history and option chain are independent; fetch them together
+    price_data, (calls, puts, expiration_str) = await asyncio.gather(
+        data_fetcher.fetch_historical_data(ticker),
+        data_fetcher.fetch_option_chain(ticker)
+    )
+    data_source = price_data.get('data_source', 'Unknown')
+    logging.info(f"Historical data fetched for {ticker} from {data_source}")
+    logging.info(f"Option chain data fetched for {ticker}, expiration: {expiration_str}")
+
+    # Same bars, chain and models as a prediction made moments ago: serve that one
+    input_hash = predictions.input_fingerprint(ticker, price_data, calls, puts, expiration_str)
+    stored = await run_in_threadpool(predictions.recent_prediction, ticker, input_hash)
+    if stored is not None:
+        logging.info(f"Serving stored prediction for {ticker} (inputs unchanged)")
+        return 200, stored
     
+    # Combine calls and puts
+    calls['option_type'] = 'call'
+    puts['option_type'] = 'put'
+    options_data = pd.concat([calls, puts], ignore_index=True)
+    
+    # Process option data
+    expiration_date = pd.to_datetime(expiration_str, utc=True, errors='coerce')
+    if pd.isna(expiration_date):
+        logging.error("Invalid expiration date from Yahoo Finance.")
+        raise HTTPException(status_code=500, detail="Invalid expiration date from Yahoo Finance.")
+    
+    options_data['expiration'] = expiration_date
+    current_price = price_data['Close'].iloc[-1]
+    with span("option_chain_features"):
+        prepare_option_chain(options_data, current_price, pd.Timestamp.now(tz='UTC'))
+        # Recompute IV from mid/last prices; keep Yahoo's value where the solver has no answer
+        solved_iv = chain_implied_volatility(options_data, float(current_price), time_column='T_pricing')
+        options_data['impliedVolatility'] = np.where(np.isfinite(solved_iv), solved_iv, options_data.get('impliedVolatility', np.nan))
+        option_chain_features(options_data, current_price)
+    
+    # Attempt prediction
     try:
-        # Fetch historical price data with fallback
-        price_data = data_fetcher.fetch_historical_data(ticker)
-        data_source = price_data.get('data_source', 'Unknown')
-        logging.info(f"Historical data fetched for {ticker} from {data_source}")
-        
-        # Fetch option chain from Yahoo Finance
-        calls, puts, expiration_str = data_fetcher.fetch_option_chain(ticker)
-        logging.info(f"Option chain data fetched for {ticker}, expiration: {expiration_str}")
-        
-        # Combine calls and puts
-        calls['option_type'] = 'call'
-        puts['option_type'] = 'put'
-        options_data = pd.concat([calls, puts], ignore_index=True)
-        
-        # Process option data
-        expiration_date = pd.to_datetime(expiration_str, utc=True, errors='coerce')
-        if pd.isna(expiration_date):
-            logging.error("Invalid expiration date from Yahoo Finance.")
-            raise HTTPException(status_code=500, detail="Invalid expiration date from Yahoo Finance.")
-        
-        options_data['expiration'] = expiration_date
-        current_price = price_data['Close'].iloc[-1]
-        options_data['moneyness'] = (options_data['strike'] / current_price) - 1.0
-        now = pd.Timestamp.now(tz='UTC')
-        options_data['T'] = (options_data['expiration'] - now).dt.days / 365.0
-        options_data.fillna(0, inplace=True)
-        options_data['option_type_encoded'] = options_data['option_type'].map({'call': 1, 'put': 0})
-        options_data['Close'] = current_price
-        
-        feature_cols = [
-            'Close', 'strike', 'T', 'impliedVolatility', 'moneyness',
-            'lastPrice', 'volume', 'openInterest', 'option_type_encoded'
-        ]
-        for col in feature_cols:
-            if col not in options_data.columns:
-                options_data[col] = 0.0
-        
-        # Attempt prediction
-        try:
-            predicted_close = make_prediction(ticker, options_data)
-            logging.info(f"Prediction successful for {ticker}: {predicted_close}")
-        except HTTPException as http_err:
+        predicted_close = await run_in_threadpool(make_prediction, ticker, price_data)
+        logging.info(f"Prediction successful for {ticker}: {predicted_close}")
+    except HTTPException as http_err:
+        if "LSTM model not found" not in str(http_err.detail):
             logging.error(f"HTTPException during prediction for {ticker}: {http_err.detail}")
             raise http_err
-        except Exception as e:
-            logging.error(f"Exception during prediction for {ticker}: {str(e)}")
-            if "LSTM model not found" in str(e):
-                # Train LSTM model
-                logging.info(f"LSTM model for {ticker} not found. Initiating training...")
-                try:
-                    subprocess.run(["python", "backend/models/train_lstm_option_pricing.py", ticker], check=True)
-                    logging.info(f"LSTM model trained successfully for {ticker}.")
-                except subprocess.CalledProcessError as train_err:
-                    logging.error(f"Failed to train LSTM model for {ticker}: {train_err}")
-                    raise HTTPException(status_code=500, detail=f"Failed to train LSTM model for {ticker}.")
-                
-                # Retry prediction after training
-                try:
-                    predicted_close = make_prediction(ticker, options_data)
-                    logging.info(f"Retry prediction successful for {ticker}: {predicted_close}")
-                except Exception as second_try_err:
-                    logging.error(f"Second attempt failed for {ticker}: {str(second_try_err)}")
-                    raise HTTPException(status_code=500, detail=str(second_try_err))
-            else:
-                raise HTTPException(status_code=500, detail=str(e))
-        
-        # Generate recommended strategies
-        recommended_strategies = generate_strategies(ticker, predicted_close, options_data)
-        logging.info(f"Recommended strategies generated for {ticker}: {recommended_strategies}")
-        
-        return {
+        # Train in the background instead of blocking this request on TensorFlow
+        logging.info(f"LSTM model for {ticker} not found. Queueing training...")
+        job = await training_queue.enqueue(ticker)
+        if job["status"] == "failed":
+            retry_after = training_queue.retry_after(job)
+            raise HTTPException(
+                status_code=503,
+                detail=f"Training the LSTM model for {ticker} failed: {job['error']}. Retry in {retry_after}s.",
+                headers={"Retry-After": str(retry_after)}
+            )
+        return 202, {
             "ticker": ticker,
-            "predicted_close": predicted_close,
-            "recommended_strategies": recommended_strategies,
-            "data_source": f"{data_source} (Price), Yahoo Finance (Options)"
+            "job": schemas.TrainingJob(**job).model_dump(),
+            "estimated_close": float(current_price),
+            "detail": f"LSTM model for {ticker} is being trained. Poll /train/jobs/{job['id']} or listen on /ws."
         }
+    except Exception as e:
+        logging.error(f"Exception during prediction for {ticker}: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    # Generate recommended strategies
+    recommended_strategies = await run_in_threadpool(generate_strategies, ticker, predicted_close, options_data)
+    logging.info(f"Recommended strategies generated for {ticker}: {recommended_strategies}")
+
+    # Per-strike Black-Scholes Greeks for the whole chain in one vectorized pass
+    with span("chain_greeks"):
+        # Same exact T the IV was solved with; the day-floored T feature is only an FNN input
+        greek_cols = [col for col in ['contractSymbol', 'option_type', 'strike', 'T_pricing', 'impliedVolatility'] if col in options_data.columns]
+        greeks = pd.concat([
+            options_data[greek_cols].rename(columns={'T_pricing': 'T'}),
+            chain_greeks(options_data, float(current_price), time_column='T_pricing')
+        ], axis=1)
+    
+    body = {
+        "ticker": ticker,
+        "predicted_close": predicted_close,
+        "recommended_strategies": recommended_strategies,
+        "data_source": f"{data_source} (Price), Yahoo Finance (Options)",
+        "greeks": greeks.to_dict(orient="records")
+    }
+    predictions.record_prediction(ticker, input_hash, body, calls, puts, expiration_str, current_price)
+    return 200, body
+
+@app.post(
+    "/predict",
+    response_model=schemas.StrategyResponse,
+    responses={202: {"model": schemas.TrainingPendingResponse}}
+)
+async def predict_endpoint(
+    request: schemas.PredictionRequest,
+    current_user: schemas.User = Depends(get_current_identity)
+):
+    ticker = request.ticker.upper()
+    logging.info(f"Predict request received for ticker: {ticker}")
     
+    try:
+        status_code, body = await run_prediction(ticker)
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(f"Unhandled exception in predict_endpoint: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error.")
+    if status_code == 202:
+        return JSONResponse(status_code=202, content=body)
+    return body
+
+@app.post("/predict/batch")
+async def predict_batch_endpoint(
+    request: schemas.BatchPredictionRequest,
+    current_user: schemas.User = Depends(get_current_identity)
+):
+    """
+    Predict for several tickers at once. Results stream back as NDJSON, one
+    line per ticker in completion order: {"ticker", "status", "result"} on
+    success (status 200, or 202 while a model trains) or {"ticker", "status",
+    "error"} when that ticker failed. One bad symbol never fails the batch.
+    """
+    tickers = list(dict.fromkeys(t.strip().upper() for t in request.tickers if t.strip()))
+    if not tickers:
+        raise HTTPException(status_code=400, detail="No tickers given.")
+    if len(tickers) > PREDICT_BATCH_MAX_TICKERS:
+        raise HTTPException(status_code=400, detail=f"At most {PREDICT_BATCH_MAX_TICKERS} tickers per batch.")
+    logging.info(f"Batch predict request received for {len(tickers)} tickers: {tickers}")
+
+    # Tickers run concurrently; their LSTM calls coalesce per model in lstm_batcher
+    slots = asyncio.Semaphore(PREDICT_BATCH_CONCURRENCY)
+
+    async def predict_one(ticker):
+        async with slots:
+            try:
+                status_code, body = await run_prediction(ticker)
+                return {"ticker": ticker, "status": status_code, "result": body}
+            except HTTPException as e:
+                return {"ticker": ticker, "status": e.status_code, "error": e.detail}
+            except Exception as e:
+                logging.error(f"Unhandled exception in batch prediction for {ticker}: {str(e)}")
+                return {"ticker": ticker, "status": 500, "error": "Internal server error."}
+
+    async def stream():
+        tasks = [asyncio.create_task(predict_one(ticker)) for ticker in tickers]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                yield json.dumps(jsonable_encoder(await finished)) + "\n"
+        finally:
+            # Client went away mid-stream: stop the remaining work
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+@app.get("/train/jobs/{job_id}", response_model=schemas.TrainingJob)
+def get_training_job(
+    job_id: str,
+    current_user: schemas.User = Depends(get_current_identity)
+):
+    job = training_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Training job not found.")
+    return job
 
 @app.get("/price/{ticker}", response_model=schemas.PriceResponse)
-def get_price(
+async def get_price(
     ticker: str,
-    current_user: models.User = Depends(get_current_user)
+    current_user: schemas.User = Depends(get_current_identity)
 ):
     ticker = ticker.upper()
     logging.info(f"Price request received for ticker: {ticker}")
     try:
-        price_data = data_fetcher.fetch_historical_data(ticker)
+        price_data = await data_fetcher.fetch_historical_data(ticker)
         current_price = price_data['Close'].iloc[-1]
         logging.info(f"Current price for {ticker}: {current_price}")
         return {"current_price": float(current_price)}
@@ -201,49 +374,122 @@ def get_price(
         logging.error(f"Unhandled exception fetching price for {ticker}: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error.")
 
-@app.get("/portfolio", response_model=List[schemas.Holding])
-def get_user_portfolio(
-    current_user: models.User = Depends(get_current_user),
+@app.get("/volatility/{ticker}", response_model=schemas.VolatilitySurfaceResponse)
+async def get_volatility_surface_grid(
+    ticker: str,
+    current_user: schemas.User = Depends(get_current_identity)
+):
+    ticker = ticker.upper()
+    logging.info(f"Volatility surface request received for ticker: {ticker}")
+    try:
+        surface = await get_volatility_surface(ticker)
+    except HTTPException as e:
+        logging.error(f"Error building volatility surface for {ticker}: {e.detail}")
+        raise e
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return {"ticker": ticker, "spot": surface.spot, **surface.grid()}
+
+@app.get("/volatility/{ticker}/iv", response_model=schemas.ImpliedVolatilityResponse)
+async def get_surface_implied_volatility(
+    ticker: str,
+    strike: float,
+    T: float,
+    current_user: schemas.User = Depends(get_current_identity)
+):
+    ticker = ticker.upper()
+    try:
+        surface = await get_volatility_surface(ticker)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    iv = float(surface.implied_volatility(strike, T))
+    return {"ticker": ticker, "strike": strike, "T": T, "implied_volatility": iv}
+
+@app.get("/backtest/{ticker}", response_model=schemas.BacktestResponse)
+async def backtest_strategies(
+    ticker: str,
+    holding_days: List[int] = Query([5, 10, 21]),
+    widths: List[float] = Query([0.025, 0.05, 0.1]),
+    current_user: schemas.User = Depends(get_current_identity)
+):
+    ticker = ticker.upper()
+    logging.info(f"Backtest request received for ticker: {ticker}")
+    if any(days < 1 for days in holding_days) or any(width <= 0 for width in widths):
+        raise HTTPException(status_code=400, detail="holding_days and widths must be positive.")
+    try:
+        historical_data = await data_fetcher.fetch_historical_data(ticker)
+    except HTTPException as e:
+        logging.error(f"Error fetching data for backtest of {ticker}: {e.detail}")
+        raise e
+    closes = historical_data['Close'].to_numpy(dtype=np.float64)
+    results = await run_in_threadpool(backtest, closes, holding_days, widths)
+    if results.empty:
+        raise HTTPException(status_code=400, detail="Not enough history for the requested holding periods.")
+    return {
+        "ticker": ticker,
+        "start": str(historical_data.index[0].date()),
+        "end": str(historical_data.index[-1].date()),
+        "results": results.to_dict(orient="records")
+    }
+
+@app.get("/portfolio", response_model=List[schemas.HoldingValuation])
+async def get_user_portfolio(
+    current_user: schemas.User = Depends(get_current_identity),
     db: Session = Depends(get_db)
 ):
     logging.info(f"Portfolio request received for user: {current_user.username}")
-    portfolio = db.query(models.Portfolio).filter(models.Portfolio.user_id == current_user.id).first()
+    portfolio = await run_in_threadpool(get_portfolio, db, current_user.id, True)
     if not portfolio:
         logging.info(f"No portfolio found for user: {current_user.username}")
         return []
-    
+
+    holdings = portfolio.holdings
+    # Holdings are already loaded; don't hold a pooled connection across the quote request
+    release_connection(db)
+    # One bulk quote request for every distinct ticker instead of a history download per holding
+    prices = await data_fetcher.fetch_latest_prices([holding.ticker for holding in holdings])
+    logging.info(f"Fetched {len(prices)} prices for {len(holdings)} holdings.")
+
     holdings_data = []
-    for holding in portfolio.holdings:
+    for holding in holdings:
         ticker = holding.ticker.upper()
-        logging.info(f"Fetching price for holding: {ticker}")
-        try:
-            price_data = data_fetcher.fetch_historical_data(ticker)
-            current_price = price_data['Close'].iloc[-1]
-            logging.info(f"Current price for {ticker}: {current_price}")
-        except HTTPException as e:
-            logging.warning(f"Could not fetch price for {ticker}: {e.detail}. Using purchase price.")
-            current_price = holding.purchase_price
-        except Exception as e:
-            logging.error(f"Unhandled exception fetching price for {ticker}: {str(e)}. Using purchase price.")
+        current_price = prices.get(ticker)
+        if current_price is None:
+            logging.warning(f"Could not fetch price for {ticker}. Using purchase price.")
             current_price = holding.purchase_price
         
         profit_loss = (current_price - holding.purchase_price) * holding.quantity
         holdings_data.append({
+            "id": holding.id,
             "ticker": ticker,
             "quantity": holding.quantity,
             "purchase_price": holding.purchase_price,
             "current_price": float(current_price),
             "profit_loss": float(profit_loss)
         })
-        logging.info(f"Holding updated: {ticker}, Profit/Loss: {profit_loss}")
     
     return holdings_data
 
+@app.get("/portfolio/risk", response_model=schemas.RiskMetrics)
+async def get_user_portfolio_risk(
+    current_user: schemas.User = Depends(get_current_identity),
+    db: Session = Depends(get_db)
+):
+    logging.info(f"Portfolio risk request received for user: {current_user.username}")
+    try:
+        return await get_portfolio_risk(db, current_user.id)
+    except HTTPException as e:
+        logging.error(f"Error computing portfolio risk for {current_user.username}: {e.detail}")
+        raise e
+    except Exception as e:
+        logging.error(f"Unhandled exception computing portfolio risk for {current_user.username}: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error.")
+
 @app.get("/news", response_model=List[schemas.NewsArticle])
-def get_news(current_user: models.User = Depends(get_current_user)):
+async def get_news(current_user: schemas.User = Depends(get_current_identity)):
     logging.info(f"News request received for user: {current_user.username}")
     try:
-        news = fetch_top_business_news()
+        news = await fetch_top_business_news()
         logging.info(f"Fetched {len(news)} news articles.")
         return news
     except HTTPException as e:
@@ -253,14 +499,86 @@ def get_news(current_user: models.User = Depends(get_current_user)):
         logging.error(f"Unhandled exception fetching news: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error.")
 
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    # Per worker process: latency histograms plus every component's stats as gauges
+    return render_metrics({
+        "inference_batcher": lstm_batcher.stats,
+        "websocket": manager.stats,
+        "password_hasher": password_hasher.stats,
+        "prediction_writer": predictions.prediction_writer.stats,
+    })
+
+@app.get("/debug/profiles")
+def get_slowest_profiles(
+    limit: int = Query(PROFILE_KEEP_SLOWEST, ge=1),
+    current_user: schemas.User = Depends(get_current_identity)
+):
+    # Stacks expose source paths and request routes: only served when explicitly enabled
+    if not DEBUG_ENDPOINTS:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not profiler.enabled:
+        raise HTTPException(status_code=404, detail="Profiling is disabled. Set PROFILE_SAMPLE_RATE to enable it.")
+    return profiler.slowest()[:limit]
+
 @app.websocket("/ws")
-async def websocket_endpoint(websocket: WebSocket):
+async def websocket_endpoint(websocket: WebSocket, token: Optional[str] = Query(None)):
+    # Browsers can't set headers on a WebSocket handshake, so the token may come as ?token=
+    authorization = websocket.headers.get("authorization", "")
+    if token is None and authorization.lower().startswith("bearer "):
+        token = authorization[7:]
+    try:
+        if not token:
+            raise credentials_exception()
+        current_user = await get_current_identity(token)
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
     await manager.connect(websocket)
-    logging.info("WebSocket connected.")
+    logging.info(f"WebSocket connected for user: {current_user.username}")
     try:
         while True:
             data = await websocket.receive_text()
-            await manager.broadcast(f"Received: {data}")
+            # Protocol: {"action": "subscribe" | "unsubscribe", "tickers": ["AAPL", ...]}
+            try:
+                message = json.loads(data)
+                action = message["action"]
+                tickers = [str(t).upper() for t in message.get("tickers", [])]
+            except (ValueError, KeyError, TypeError, AttributeError):
+                await manager.send(websocket, json.dumps({"type": "error", "detail": "Expected {\"action\": ..., \"tickers\": [...]}."}))
+                continue
+            invalid = [t for t in tickers if not TICKER_PATTERN.match(t)]
+            if invalid:
+                await manager.send(websocket, json.dumps({"type": "error", "detail": f"Invalid tickers: {', '.join(invalid[:10])}"}))
+                tickers = [t for t in tickers if TICKER_PATTERN.match(t)]
+            if action == "subscribe":
+                requested = list(dict.fromkeys(tickers))
+                current = manager.subscriptions.get(websocket, set())
+                new = [t for t in requested if t not in current]
+                room = max(WS_MAX_SUBSCRIPTIONS - len(current), 0)
+                rejected = set(new[room:])
+                if rejected:
+                    await manager.send(websocket, json.dumps({
+                        "type": "error",
+                        "detail": f"At most {WS_MAX_SUBSCRIPTIONS} subscriptions per connection; not subscribed to {', '.join(new[room:][:10])}."
+                    }))
+                for ticker in requested:
+                    if ticker in rejected:
+                        continue
+                    manager.subscribe(websocket, ticker)
+                    snapshot = price_relay.snapshot(ticker)
+                    if snapshot is not None:
+                        await manager.send(websocket, snapshot)
+            elif action == "unsubscribe":
+                for ticker in tickers:
+                    manager.unsubscribe(websocket, ticker)
+            else:
+                await manager.send(websocket, json.dumps({"type": "error", "detail": f"Unknown action: {action}"}))
+                continue
+            await announce_interest()
+            await manager.send(websocket, json.dumps({"type": "subscriptions", "tickers": sorted(manager.subscriptions.get(websocket, ()))}))
     except WebSocketDisconnect:
-        manager.disconnect(websocket)
         logging.info("WebSocket disconnected.")
+    finally:
+        manager.disconnect(websocket)
+        await announce_interest()
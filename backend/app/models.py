@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Text, LargeBinary, Index
 from sqlalchemy.orm import relationship
 from app.database import Base
 
@@ -31,3 +31,36 @@ class Holding(Base):
     purchase_price = Column(Float)
 
     portfolio = relationship("Portfolio", back_populates="holdings")
+
+class Prediction(Base):
+    __tablename__ = "predictions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    ticker = Column(String, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+    # Hash of the bars, option chain and model versions the prediction was made from
+    input_hash = Column(String(40), nullable=False)
+    model_version = Column(String)
+    current_price = Column(Float)
+    predicted_close = Column(Float)
+    top_strategy = Column(String)
+    top_probability = Column(Float)
+    # Full StrategyResponse body as JSON, served again while the inputs are unchanged
+    response = Column(Text, nullable=False)
+
+    __table_args__ = (Index("ix_predictions_ticker_created_at", "ticker", "created_at"),)
+
+class OptionChainSnapshot(Base):
+    __tablename__ = "option_chain_snapshots"
+
+    id = Column(Integer, primary_key=True, index=True)
+    ticker = Column(String, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+    input_hash = Column(String(40), nullable=False, index=True)
+    expiration = Column(String)
+    underlying_price = Column(Float)
+    contracts = Column(Integer)
+    # zlib-compressed float32 columns, see app.predictions.decode_chain_snapshot
+    payload = Column(LargeBinary, nullable=False)
+
+    __table_args__ = (Index("ix_option_chain_snapshots_ticker_created_at", "ticker", "created_at"),)
@@ -0,0 +1,139 @@
+# backend/app/predictions.py
+#
+# Prediction history: every computed /predict result and a compact snapshot
+# of the option chain it was made from are recorded through a bulk writer.
+# A recent result whose inputs are unchanged is served from the table
+# instead of being recomputed.
+
+import os
+import json
+import zlib
+import hashlib
+import logging
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+from fastapi.encoders import jsonable_encoder
+
+from app import models
+from app.database import SessionLocal
+from app.utils.bulk_writer import BulkWriter
+from app.utils.model_utils import model_utils, lstm_model_path
+
+PREDICTION_REUSE_SECONDS = float(os.getenv("PREDICTION_REUSE_SECONDS", "60"))
+
+# Option chain columns kept in a snapshot, in payload order
+SNAPSHOT_COLUMNS = ['strike', 'is_call', 'lastPrice', 'bid', 'ask', 'volume', 'openInterest', 'impliedVolatility']
+
+prediction_writer = BulkWriter(SessionLocal)
+
+
+def _mtime(path):
+    try:
+        return int(os.path.getmtime(path))
+    except OSError:
+        return 0
+
+
+def model_version(ticker):
+    # Retraining either model changes the version, and with it the input hash
+    return f"lstm:{_mtime(lstm_model_path(ticker))},fnn:{_mtime(model_utils.fnn_path)}"
+
+
+def _chain_arrays(calls, puts):
+    columns = []
+    for col in SNAPSHOT_COLUMNS:
+        if col == 'is_call':
+            values = np.concatenate([np.ones(len(calls)), np.zeros(len(puts))])
+        else:
+            values = np.concatenate([
+                pd.to_numeric(frame[col], errors='coerce').to_numpy(dtype=np.float64) if col in frame.columns else np.full(len(frame), np.nan)
+                for frame in (calls, puts)
+            ])
+        columns.append(values.astype(np.float32))
+    return np.stack(columns)
+
+
+def input_fingerprint(ticker, price_data, calls, puts, expiration_str):
+    """
+    SHA-1 over everything a prediction depends on: the latest bars, the
+    option chain quotes and the model versions.
+    """
+    digest = hashlib.sha1()
+    closes = price_data['Close'].to_numpy(dtype=np.float64)
+    digest.update(f"{ticker}|{price_data.index[-1]}|{len(closes)}|{model_version(ticker)}|{expiration_str}".encode())
+    digest.update(closes[-5:].tobytes())
+    digest.update(_chain_arrays(calls, puts).tobytes())
+    return digest.hexdigest()
+
+
+def recent_prediction(ticker, input_hash, max_age_seconds=PREDICTION_REUSE_SECONDS):
+    """
+    Stored response body for ticker with identical inputs made within
+    max_age_seconds, or None.
+    """
+    if max_age_seconds <= 0:
+        return None
+    db = SessionLocal()
+    try:
+        row = (
+            db.query(models.Prediction.response)
+            .filter(
+                models.Prediction.ticker == ticker,
+                models.Prediction.created_at >= datetime.utcnow() - timedelta(seconds=max_age_seconds),
+                models.Prediction.input_hash == input_hash,
+            )
+            .order_by(models.Prediction.created_at.desc())
+            .first()
+        )
+    finally:
+        db.close()
+    return json.loads(row.response) if row else None
+
+
+def encode_chain_snapshot(calls, puts):
+    arrays = _chain_arrays(calls, puts)
+    return zlib.compress(arrays.tobytes(), 6)
+
+
+def decode_chain_snapshot(snapshot: models.OptionChainSnapshot) -> pd.DataFrame:
+    """
+    Option chain stored in a snapshot, one row per contract.
+    """
+    arrays = np.frombuffer(zlib.decompress(snapshot.payload), dtype=np.float32)
+    frame = pd.DataFrame(arrays.reshape(len(SNAPSHOT_COLUMNS), -1).T, columns=SNAPSHOT_COLUMNS)
+    frame['option_type'] = np.where(frame.pop('is_call') == 1.0, 'call', 'put')
+    return frame
+
+
+def record_prediction(ticker, input_hash, body, calls, puts, expiration_str, current_price):
+    """
+    Queue the prediction and its option chain snapshot for the bulk writer.
+    """
+    now = datetime.utcnow()
+    strategies = body.get("recommended_strategies") or [{}]
+    prediction_writer.submit(models.Prediction, {
+        "ticker": ticker,
+        "created_at": now,
+        "input_hash": input_hash,
+        "model_version": model_version(ticker),
+        "current_price": float(current_price),
+        "predicted_close": float(body["predicted_close"]),
+        "top_strategy": strategies[0].get("name"),
+        "top_probability": strategies[0].get("probability"),
+        "response": json.dumps(jsonable_encoder(body)),
+    })
+    try:
+        payload = encode_chain_snapshot(calls, puts)
+    except Exception as e:
+        logging.error(f"Could not snapshot option chain for {ticker}: {str(e)}")
+        return
+    prediction_writer.submit(models.OptionChainSnapshot, {
+        "ticker": ticker,
+        "created_at": now,
+        "input_hash": input_hash,
+        "expiration": expiration_str,
+        "underlying_price": float(current_price),
+        "contracts": len(calls) + len(puts),
+        "payload": payload,
+    })
@@ -0,0 +1,212 @@
+# backend/app/pricing.py
+
+import os
+import numpy as np
+import pandas as pd
+from scipy.special import ndtr
+
+RISK_FREE_RATE = float(os.getenv("RISK_FREE_RATE", "0.045"))
+
+# Floors that keep d1/d2 finite for expiring contracts and zero/missing vols
+MIN_T = 1e-6
+MIN_SIGMA = 1e-6
+
+# Listed options stop trading at the 16:00 New York close on expiration day
+EXPIRY_TZ = "America/New_York"
+EXPIRY_CLOSE = pd.Timedelta(hours=16)
+SECONDS_PER_YEAR = 365.0 * 86400.0
+
+SQRT_2PI = np.sqrt(2.0 * np.pi)
+
+GREEK_COLUMNS = ['bs_price', 'delta', 'gamma', 'vega', 'theta', 'rho']
+
+
+def norm_pdf(x):
+    return np.exp(-0.5 * x * x) / SQRT_2PI
+
+
+def black_scholes(S, K, T, sigma, is_call, r=RISK_FREE_RATE, q=0.0):
+    """
+    Vectorized Black-Scholes prices and Greeks. All inputs broadcast against
+    each other; is_call is a boolean array (True for calls, False for puts).
+
+    Returns a dict of arrays: price, delta, gamma, vega, theta, rho.
+    vega and rho are per 1 percentage point move, theta is per calendar day.
+    """
+    S, K, T, sigma, is_call = np.broadcast_arrays(
+        np.asarray(S, dtype=np.float64),
+        np.asarray(K, dtype=np.float64),
+        np.maximum(np.asarray(T, dtype=np.float64), MIN_T),
+        np.maximum(np.asarray(sigma, dtype=np.float64), MIN_SIGMA),
+        np.asarray(is_call, dtype=bool)
+    )
+
+    sqrt_T = np.sqrt(T)
+    vol_sqrt_T = sigma * sqrt_T
+    d1 = (np.log(S / K) + (r - q + 0.5 * sigma * sigma) * T) / vol_sqrt_T
+    d2 = d1 - vol_sqrt_T
+
+    disc_r = np.exp(-r * T)
+    disc_q = np.exp(-q * T)
+    pdf_d1 = norm_pdf(d1)
+    # Puts use N(-x) = 1 - N(x); flipping the sign once covers both legs
+    sign = np.where(is_call, 1.0, -1.0)
+    cdf_d1 = ndtr(sign * d1)
+    cdf_d2 = ndtr(sign * d2)
+
+    price = sign * (S * disc_q * cdf_d1 - K * disc_r * cdf_d2)
+    delta = sign * disc_q * cdf_d1
+    gamma = disc_q * pdf_d1 / (S * vol_sqrt_T)
+    vega = S * disc_q * pdf_d1 * sqrt_T / 100.0
+    theta = (
+        -S * disc_q * pdf_d1 * sigma / (2.0 * sqrt_T)
+        + sign * (q * S * disc_q * cdf_d1 - r * K * disc_r * cdf_d2)
+    ) / 365.0
+    rho = sign * K * T * disc_r * cdf_d2 / 100.0
+
+    return {
+        'price': price,
+        'delta': delta,
+        'gamma': gamma,
+        'vega': vega,
+        'theta': theta,
+        'rho': rho,
+    }
+
+
+def years_to_expiry(expiration: pd.Series, now: pd.Timestamp) -> pd.Series:
+    """
+    Years from now to the 16:00 New York close on each tz-aware expiration
+    date, to the second and floored at 0. This is the T to price with; the
+    day-floored T feature is only an FNN input.
+    """
+    dates = expiration.dt.tz_convert('UTC').dt.tz_localize(None).dt.normalize()
+    close = (dates + EXPIRY_CLOSE).dt.tz_localize(EXPIRY_TZ)
+    return ((close - now).dt.total_seconds() / SECONDS_PER_YEAR).clip(lower=0.0)
+
+
+def chain_greeks(options_data: pd.DataFrame, spot: float, r: float = RISK_FREE_RATE,
+                 time_column: str = 'T') -> pd.DataFrame:
+    """
+    Price every row of a calls+puts chain (as built in predict_endpoint) in one
+    array pass. Expects strike, impliedVolatility, option_type and time_column
+    (years to expiry) columns; returns a frame with GREEK_COLUMNS aligned to
+    options_data's index.
+    """
+    result = black_scholes(
+        spot,
+        options_data['strike'].to_numpy(dtype=np.float64),
+        options_data[time_column].to_numpy(dtype=np.float64),
+        options_data['impliedVolatility'].to_numpy(dtype=np.float64),
+        (options_data['option_type'] == 'call').to_numpy(),
+        r=r
+    )
+    result['bs_price'] = result.pop('price')
+    return pd.DataFrame(result, index=options_data.index)[GREEK_COLUMNS]
+
+
+def _price_and_vega(S, K, T, sigma, sign, r, q):
+    sqrt_T = np.sqrt(T)
+    vol_sqrt_T = sigma * sqrt_T
+    d1 = (np.log(S / K) + (r - q + 0.5 * sigma * sigma) * T) / vol_sqrt_T
+    d2 = d1 - vol_sqrt_T
+    disc_q = S * np.exp(-q * T)
+    price = sign * (disc_q * ndtr(sign * d1) - K * np.exp(-r * T) * ndtr(sign * d2))
+    vega = disc_q * norm_pdf(d1) * sqrt_T
+    return price, vega
+
+
+def implied_volatility(price, S, K, T, is_call, r=RISK_FREE_RATE, q=0.0,
+                       lower=1e-4, upper=5.0, tol=1e-6, max_iter=60):
+    """
+    Vectorized implied volatility from option prices.
+
+    Each contract runs Newton iterations inside a [lower, upper] bracket that
+    shrinks every step; when a Newton step leaves the bracket (or vega is
+    ~0) the step falls back to bisection, so every contract converges.
+    Contracts whose price is outside the no-arbitrage bounds, or with T <= 0,
+    come back as NaN.
+    """
+    price, S, K, T, is_call = np.broadcast_arrays(
+        np.asarray(price, dtype=np.float64),
+        np.asarray(S, dtype=np.float64),
+        np.asarray(K, dtype=np.float64),
+        np.asarray(T, dtype=np.float64),
+        np.asarray(is_call, dtype=bool)
+    )
+    shape = price.shape
+    price, S, K, T, is_call = (a.ravel() for a in (price, S, K, T, is_call))
+    sign = np.where(is_call, 1.0, -1.0)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        disc_S = S * np.exp(-q * T)
+        disc_K = K * np.exp(-r * T)
+        intrinsic = np.maximum(sign * (disc_S - disc_K), 0.0)
+        upper_bound = np.where(is_call, disc_S, disc_K)
+    valid = (
+        np.isfinite(price) & np.isfinite(S) & np.isfinite(K) & np.isfinite(T)
+        & (T > 0) & (S > 0) & (K > 0)
+        & (price > intrinsic) & (price < upper_bound)
+    )
+
+    sigma = np.full(price.shape, np.nan)
+    idx = np.flatnonzero(valid)
+    lo = np.full(idx.size, lower)
+    hi = np.full(idx.size, upper)
+    # Brenner-Subrahmanyam starting guess, clipped into the bracket
+    guess = np.sqrt(2.0 * np.pi / T[idx]) * price[idx] / S[idx]
+    sig = np.clip(np.nan_to_num(guess, nan=0.3), lower * 2, upper / 2)
+
+    for _ in range(max_iter):
+        if idx.size == 0:
+            break
+        model, vega = _price_and_vega(S[idx], K[idx], T[idx], sig, sign[idx], r, q)
+        diff = model - price[idx]
+        done = np.abs(diff) < tol
+        sigma[idx[done]] = sig[done]
+
+        # Price is increasing in sigma, so the sign of diff tells which side the root is on
+        hi = np.where(diff > 0, sig, hi)
+        lo = np.where(diff < 0, sig, lo)
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            newton = sig - diff / vega
+        use_newton = np.isfinite(newton) & (newton > lo) & (newton < hi) & (vega > 1e-12)
+        sig = np.where(use_newton, newton, 0.5 * (lo + hi))
+
+        keep = ~done & (hi - lo > tol * 1e-3)
+        # Bracket collapsed without hitting the price tolerance: accept the midpoint
+        collapsed = ~done & ~keep
+        sigma[idx[collapsed]] = sig[collapsed]
+        idx, lo, hi, sig = idx[keep], lo[keep], hi[keep], sig[keep]
+
+    return sigma.reshape(shape)
+
+
+def option_market_price(options_data: pd.DataFrame) -> np.ndarray:
+    """
+    Bid/ask mid where both quotes are positive, otherwise lastPrice.
+    """
+    last = options_data['lastPrice'].to_numpy(dtype=np.float64) if 'lastPrice' in options_data.columns else np.full(len(options_data), np.nan)
+    if 'bid' not in options_data.columns or 'ask' not in options_data.columns:
+        return last
+    bid = options_data['bid'].to_numpy(dtype=np.float64)
+    ask = options_data['ask'].to_numpy(dtype=np.float64)
+    has_quote = (bid > 0) & (ask >= bid)
+    return np.where(has_quote, 0.5 * (bid + ask), last)
+
+
+def chain_implied_volatility(options_data: pd.DataFrame, spot: float, r: float = RISK_FREE_RATE,
+                             time_column: str = 'T') -> np.ndarray:
+    """
+    Implied volatility for every contract of a calls+puts chain, recomputed
+    from market prices with years to expiry from time_column. NaN where no
+    volatility reproduces the price.
+    """
+    return implied_volatility(
+        option_market_price(options_data),
+        spot,
+        options_data['strike'].to_numpy(dtype=np.float64),
+        options_data[time_column].to_numpy(dtype=np.float64),
+        (options_data['option_type'] == 'call').to_numpy(),
+        r=r
+    )
@@ -0,0 +1,174 @@
+# backend/app/risk.py
+
+import os
+import asyncio
+import numpy as np
+import pandas as pd
+from app.pricing import black_scholes, RISK_FREE_RATE
+from app.utils import data_fetcher
+
+TRADING_DAYS = 252
+RISK_LOOKBACK_DAYS = int(os.getenv("RISK_LOOKBACK_DAYS", "504"))
+RISK_CONFIDENCE = float(os.getenv("RISK_CONFIDENCE", "0.95"))
+RISK_HORIZON_DAYS = int(os.getenv("RISK_HORIZON_DAYS", "1"))
+RISK_MC_PATHS = int(os.getenv("RISK_MC_PATHS", "100000"))
+# Paths simulated per chunk; bounds memory at chunk x holdings floats
+RISK_MC_CHUNK = int(os.getenv("RISK_MC_CHUNK", "20000"))
+
+
+def return_matrix(closes: pd.DataFrame, lookback=RISK_LOOKBACK_DAYS) -> np.ndarray:
+    """
+    (days, tickers) daily log returns over the dates every ticker traded,
+    from a frame of closes with one column per ticker.
+    """
+    closes = closes.dropna().tail(lookback + 1)
+    return np.diff(np.log(closes.to_numpy(dtype=np.float64)), axis=0)
+
+
+def value_at_risk(pnl, confidence=RISK_CONFIDENCE):
+    """
+    VaR and CVaR (expected shortfall) of a P&L sample, both as positive losses.
+    """
+    pnl = np.asarray(pnl, dtype=np.float64)
+    if pnl.size == 0:
+        return 0.0, 0.0
+    cutoff = np.quantile(pnl, 1.0 - confidence)
+    tail = pnl[pnl <= cutoff]
+    return float(max(-cutoff, 0.0)), float(max(-tail.mean(), 0.0))
+
+
+def historical_pnl(returns, values):
+    """
+    One-day P&L of today's position values replayed over every historical day.
+    """
+    return np.expm1(returns) @ values
+
+
+def _cholesky(cov):
+    try:
+        return np.linalg.cholesky(cov)
+    except np.linalg.LinAlgError:
+        # Collinear or short histories: clip negative eigenvalues to get a PSD factor
+        eigvals, eigvecs = np.linalg.eigh(cov)
+        return eigvecs * np.sqrt(np.clip(eigvals, 0.0, None))
+
+
+def monte_carlo_pnl(returns, values, paths=RISK_MC_PATHS, horizon_days=RISK_HORIZON_DAYS,
+                    chunk_size=RISK_MC_CHUNK, seed=None):
+    """
+    P&L of the positions over horizon_days under a multivariate normal fitted
+    to the historical log returns. Paths are drawn chunk_size at a time, so
+    only the (paths,) P&L vector and one chunk of draws are ever in memory.
+    """
+    rng = np.random.default_rng(seed)
+    mean = returns.mean(axis=0) * horizon_days
+    factor = _cholesky(np.atleast_2d(np.cov(returns, rowvar=False)) * horizon_days).astype(np.float32)
+    mean = mean.astype(np.float32)
+    values = np.asarray(values, dtype=np.float32)
+
+    pnl = np.empty(paths, dtype=np.float64)
+    for start in range(0, paths, chunk_size):
+        n = min(chunk_size, paths - start)
+        draws = rng.standard_normal((n, len(values)), dtype=np.float32)
+        simulated = draws @ factor.T
+        simulated += mean
+        np.expm1(simulated, out=simulated)
+        pnl[start:start + n] = simulated @ values
+    return pnl
+
+
+def sharpe_ratio(portfolio_returns, r=RISK_FREE_RATE):
+    """
+    Annualized Sharpe ratio of daily portfolio returns.
+    """
+    std = portfolio_returns.std(ddof=1) if portfolio_returns.size > 1 else 0.0
+    if std == 0:
+        return 0.0
+    return float((portfolio_returns.mean() - r / TRADING_DAYS) / std * np.sqrt(TRADING_DAYS))
+
+
+def portfolio_greeks(spots, quantities, strikes=None, T=None, sigma=None, is_call=None, r=RISK_FREE_RATE):
+    """
+    Dollar Greeks summed over positions. Rows with a NaN (or no) strike are
+    shares with delta 1; option rows are priced with Black-Scholes per unit
+    of underlying. delta is dollar exposure (delta * spot), gamma the change
+    in dollar delta per 1% spot move, vega per vol point, theta per day.
+    """
+    spots = np.asarray(spots, dtype=np.float64)
+    quantities = np.asarray(quantities, dtype=np.float64)
+    delta = np.ones_like(spots)
+    gamma = np.zeros_like(spots)
+    vega = np.zeros_like(spots)
+    theta = np.zeros_like(spots)
+    if strikes is not None:
+        strikes = np.asarray(strikes, dtype=np.float64)
+        options = np.isfinite(strikes)
+        if options.any():
+            greeks = black_scholes(
+                spots[options], strikes[options], np.asarray(T)[options],
+                np.asarray(sigma)[options], np.asarray(is_call)[options], r=r
+            )
+            delta[options] = greeks['delta']
+            gamma[options] = greeks['gamma']
+            vega[options] = greeks['vega']
+            theta[options] = greeks['theta']
+    return {
+        "delta": float(np.sum(quantities * delta * spots)),
+        "gamma": float(np.sum(quantities * gamma * spots * spots) / 100.0),
+        "vega": float(np.sum(quantities * vega)),
+        "theta": float(np.sum(quantities * theta)),
+    }
+
+
+def compute_risk(closes: pd.DataFrame, quantities, confidence=RISK_CONFIDENCE,
+                 horizon_days=RISK_HORIZON_DAYS, paths=RISK_MC_PATHS, seed=None):
+    """
+    Risk metrics for share positions given a frame of daily closes (one
+    column per ticker) and the quantity held of each column.
+    """
+    quantities = np.asarray(quantities, dtype=np.float64)
+    spots = closes.ffill().iloc[-1].to_numpy(dtype=np.float64)
+    values = quantities * spots
+    portfolio_value = float(values.sum())
+    returns = return_matrix(closes)
+    if len(returns) < 2:
+        raise ValueError("Not enough overlapping price history to compute risk.")
+
+    hist_var, hist_cvar = value_at_risk(historical_pnl(returns, values), confidence)
+    mc_var, mc_cvar = value_at_risk(monte_carlo_pnl(returns, values, paths, horizon_days, seed=seed), confidence)
+    gross = np.abs(values).sum()
+    daily = np.expm1(returns) @ (values / gross) if gross else np.zeros(len(returns))
+    return {
+        "portfolio_value": portfolio_value,
+        "confidence": confidence,
+        "horizon_days": horizon_days,
+        "paths": paths,
+        "var": mc_var,
+        "cvar": mc_cvar,
+        "historical_var": hist_var,
+        "historical_cvar": hist_cvar,
+        "volatility": float(daily.std(ddof=1) * np.sqrt(TRADING_DAYS)),
+        "sharpe_ratio": sharpe_ratio(daily),
+        "greeks": portfolio_greeks(spots, quantities),
+    }
+
+
+def _daily_closes(ticker, frame: pd.DataFrame) -> pd.Series:
+    if frame is None or frame.empty or 'Close' not in frame.columns:
+        raise ValueError(f"No price history for {ticker}.")
+    closes = frame['Close'].rename(ticker)
+    index = pd.DatetimeIndex(closes.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    # Bars from different sources carry different times of day; align on the session date
+    closes.index = index.normalize()
+    return closes[~closes.index.duplicated(keep='last')]
+
+
+async def fetch_closes(tickers) -> pd.DataFrame:
+    """
+    Cached daily closes for tickers, aligned on session date, one column per
+    ticker. Raises ValueError when a ticker has no usable history.
+    """
+    frames = await asyncio.gather(*(data_fetcher.fetch_historical_data(ticker) for ticker in tickers))
+    return pd.concat([_daily_closes(ticker, frame) for ticker, frame in zip(tickers, frames)], axis=1).sort_index()
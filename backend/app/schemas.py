@@ -26,11 +26,63 @@ class Token(BaseModel):
 class PredictionRequest(BaseModel):
     ticker: str
 
+class BatchPredictionRequest(BaseModel):
+    tickers: List[str]
+
 class StrategyResponse(BaseModel):
     ticker: str
     predicted_close: float
     recommended_strategies: List[dict]
     data_source: Optional[str] = None  # Added for clarity
+    greeks: Optional[List[dict]] = None  # Black-Scholes price and Greeks per contract
+
+# Volatility Surface
+class VolatilitySurfaceResponse(BaseModel):
+    ticker: str
+    spot: float
+    strikes: List[float]
+    expiries: List[float]  # T in years
+    implied_volatility: List[List[float]]  # [expiry][strike]
+
+class ImpliedVolatilityResponse(BaseModel):
+    ticker: str
+    strike: float
+    T: float
+    implied_volatility: float
+
+# Backtesting
+class BacktestResult(BaseModel):
+    strategy: str
+    holding_days: int
+    width: float  # Strike spacing as a fraction of spot
+    trades: int
+    mean_return: float
+    median_return: float
+    hit_rate: float
+    mean_drawdown: float
+    max_drawdown: float
+
+class BacktestResponse(BaseModel):
+    ticker: str
+    start: str
+    end: str
+    results: List[BacktestResult]
+
+# Training Jobs
+class TrainingJob(BaseModel):
+    id: str
+    ticker: str
+    status: str  # queued, running, succeeded or failed
+    created_at: str
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    error: Optional[str] = None
+
+class TrainingPendingResponse(BaseModel):
+    ticker: str
+    job: TrainingJob
+    estimated_close: Optional[float] = None  # Last close, until the model is trained
+    detail: str
 
 # Price Response
 class PriceResponse(BaseModel):
@@ -51,6 +103,10 @@ class Holding(HoldingBase):
     class Config:
         from_attributes = True
 
+class HoldingValuation(Holding):
+    current_price: float
+    profit_loss: float
+
 class PortfolioBase(BaseModel):
     name: str
 
@@ -66,9 +122,24 @@ class Portfolio(PortfolioBase):
         from_attributes = True
 
 # Risk Metrics
+class PortfolioGreeks(BaseModel):
+    delta: float  # Dollar delta
+    gamma: float
+    vega: float
+    theta: float
+
 class RiskMetrics(BaseModel):
-    var: float  # Value at Risk
+    portfolio_value: float
+    confidence: float
+    horizon_days: int
+    paths: int  # Monte Carlo paths
+    var: float  # Monte Carlo Value at Risk
+    cvar: float  # Monte Carlo expected shortfall
+    historical_var: float  # One-day historical VaR
+    historical_cvar: float
+    volatility: float  # Annualized
     sharpe_ratio: float
+    greeks: PortfolioGreeks
 
 # News Article Schema (Newly Added)
 class NewsArticle(BaseModel):
@@ -1,10 +1,23 @@
 # backend/app/strategy.py
 
 from fastapi import HTTPException
-import numpy as np
-from app.utils.model_utils import ModelUtils
+from app.utils.model_utils import model_utils
+from app.utils.inference_batcher import InferenceBatcher
+from app.features import CHAIN_FEATURES
+from app.utils.instrumentation import timed, span
 
-model_utils = ModelUtils()
+# Concurrent /predict calls for the same ticker share one batched LSTM forward pass
+lstm_batcher = InferenceBatcher(model_utils.predict_option_prices)
+
+# Chain-averaged probability thresholds for the confidence label of a strategy
+HIGH_CONFIDENCE = 0.5
+MEDIUM_CONFIDENCE = 0.2
+
+def warm_up_models(tickers=None):
+    """
+    Preload the strategy model and LSTM models (PRELOAD_TICKERS by default) so the first requests skip disk loads.
+    """
+    model_utils.warm_up(tickers)
 
 def get_execution_steps(strategy: str) -> str:
     if strategy == "call_spread":
@@ -26,24 +39,50 @@ def get_execution_steps(strategy: str) -> str:
     else:
         return "Hold."
 
-def make_prediction(ticker: str, data, time_steps=60):
-    FEATURES = ['Close','strike','T','impliedVolatility','moneyness','lastPrice','volume','openInterest','option_type_encoded']
-    if len(data) < time_steps:
-        raise HTTPException(status_code=400, detail="Not enough data for prediction.")
-    latest_data = data[FEATURES].tail(time_steps).values
-    latest_data = np.reshape(latest_data, (1, time_steps, len(FEATURES)))
+@timed("make_prediction")
+def make_prediction(ticker: str, price_data):
+    """
+    Next close for ticker from its daily bars, using the feature pipeline the
+    ticker's LSTM was trained with. Only the last window is computed.
+    """
     try:
-        predicted_close = model_utils.predict_option_price(ticker, latest_data)
-    except ValueError as e:
+        pipeline = model_utils.load_lstm_pipeline(ticker)
+    except FileNotFoundError as e:
         # Model not found or not trained
         raise HTTPException(status_code=500, detail=str(e))
+    try:
+        with span("make_prediction.features"):
+            latest_window = pipeline.latest_window(price_data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Not enough data for prediction. {str(e)}")
+    try:
+        with span("make_prediction.lstm"):
+            predicted_close = float(lstm_batcher.submit(ticker, latest_window))
+    except ValueError as e:
+        raise HTTPException(status_code=500, detail=str(e))
     return predicted_close
 
+def confidence_label(probability: float) -> str:
+    if probability >= HIGH_CONFIDENCE:
+        return "High"
+    if probability >= MEDIUM_CONFIDENCE:
+        return "Medium"
+    return "Low"
+
+@timed("generate_strategies")
 def generate_strategies(ticker: str, predicted_close: float, data):
-    latest_features = data.iloc[-1][['Close','strike','T','impliedVolatility','moneyness','lastPrice','volume','openInterest','option_type_encoded']].values.reshape(1,-1)
-    strategy = model_utils.recommend_strategy(latest_features)
+    # Every contract in the chain is scored in one batch; the ranking averages over all of them
+    chain_features = data[CHAIN_FEATURES].values
+    ranked = model_utils.strategy_probabilities(chain_features)
+    if not ranked:
+        return [{
+            "name": "hold",
+            "confidence": "High",
+            "execution": get_execution_steps("hold")
+        }]
     return [{
         "name": strategy,
-        "confidence": "High",
+        "confidence": confidence_label(probability),
+        "probability": probability,
         "execution": get_execution_steps(strategy)
-    }]
+    } for strategy, probability in ranked]
@@ -0,0 +1,164 @@
+# backend/app/utils/bar_store.py
+
+import os
+import fcntl
+import tempfile
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+
+BAR_STORE_DIR = os.getenv("BAR_STORE_DIR", "/app/data/bars")
+# Relative close difference on an already stored date that means the series was re-adjusted
+ADJUSTMENT_RTOL = float(os.getenv("BAR_ADJUSTMENT_RTOL", "1e-3"))
+
+# One record per completed daily session
+BAR_DTYPE = np.dtype([
+    ("date", "datetime64[D]"),
+    ("open", "f8"),
+    ("high", "f8"),
+    ("low", "f8"),
+    ("close", "f8"),
+    ("volume", "f8"),
+])
+
+FRAME_COLUMNS = {"open": "Open", "high": "High", "low": "Low", "close": "Close", "volume": "Volume"}
+
+
+class BarStore:
+    """
+    On-disk daily OHLCV per ticker, one memory-mapped .npy file each.
+
+    Files are replaced atomically under an flock, so every gunicorn worker can
+    read them concurrently while one appends. Readers get read-only memmaps and
+    column access (bars["close"]) is a zero-copy view. Bars are stored split-
+    and dividend-adjusted, so a new adjustment rewrites the whole file.
+    """
+
+    def __init__(self, root=BAR_STORE_DIR):
+        self.root = root
+
+    def _path(self, ticker):
+        return os.path.join(self.root, f"{ticker.upper()}.npy")
+
+    @contextmanager
+    def _locked(self, ticker):
+        os.makedirs(self.root, exist_ok=True)
+        with open(os.path.join(self.root, f"{ticker.upper()}.lock"), "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def read(self, ticker):
+        """
+        Read-only structured memmap of stored bars, or None if nothing is stored.
+        """
+        path = self._path(ticker)
+        if not os.path.exists(path):
+            return None
+        bars = np.load(path, mmap_mode="r")
+        return bars if len(bars) else None
+
+    def last_date(self, ticker):
+        bars = self.read(ticker)
+        return None if bars is None else pd.Timestamp(bars["date"][-1])
+
+    def last_close(self, ticker):
+        bars = self.read(ticker)
+        return None if bars is None else float(bars["close"][-1])
+
+    def append(self, ticker, df: pd.DataFrame):
+        """
+        Merge bars from an OHLCV DataFrame (DatetimeIndex) into the store,
+        keeping only dates after the last stored one. Returns rows added.
+        """
+        if df is None or df.empty:
+            return 0
+        new = frame_to_records(df)
+        if not len(new):
+            return 0
+        with self._locked(ticker):
+            existing = self.read(ticker)
+            if existing is not None:
+                new = new[new["date"] > existing["date"][-1]]
+                if not len(new):
+                    return 0
+                merged = np.concatenate([np.asarray(existing), new])
+            else:
+                merged = new
+            self._write(ticker, merged)
+        return len(new)
+
+    def replace(self, ticker, df: pd.DataFrame):
+        """
+        Overwrite the ticker's stored bars with df. Returns rows stored.
+        """
+        records = frame_to_records(df)
+        with self._locked(ticker):
+            self._write(ticker, records)
+        return len(records)
+
+    def matches(self, ticker, df: pd.DataFrame, rtol=ADJUSTMENT_RTOL):
+        """
+        False when a bar in df for an already stored date has a different
+        close, i.e. the history has been re-adjusted (split or dividend)
+        since it was stored. True when nothing overlaps.
+        """
+        existing = self.read(ticker)
+        if existing is None or df is None or df.empty:
+            return True
+        new = frame_to_records(df)
+        common, stored_at, new_at = np.intersect1d(existing["date"], new["date"], return_indices=True)
+        if not len(common):
+            return True
+        return bool(np.allclose(new["close"][new_at], existing["close"][stored_at], rtol=rtol, atol=0.0))
+
+    def _write(self, ticker, records):
+        os.makedirs(self.root, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".npy.tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.save(f, records)
+            os.replace(tmp_path, self._path(ticker))
+        except BaseException:
+            # Don't leave partial files behind in the shared volume
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def frame(self, ticker):
+        """
+        Stored bars as an OHLCV DataFrame indexed by date, or None.
+        """
+        bars = self.read(ticker)
+        if bars is None:
+            return None
+        return records_to_frame(bars)
+
+
+def frame_to_records(df: pd.DataFrame):
+    index = pd.DatetimeIndex(df.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    records = np.empty(len(df), dtype=BAR_DTYPE)
+    records["date"] = index.normalize().values.astype("datetime64[D]")
+    for field, column in FRAME_COLUMNS.items():
+        records[field] = df[column].to_numpy(dtype="f8") if column in df.columns else np.nan
+    order = np.argsort(records["date"], kind="stable")
+    records = records[order]
+    # Keep the last bar for any duplicated date
+    keep = np.ones(len(records), dtype=bool)
+    keep[:-1] = records["date"][1:] != records["date"][:-1]
+    return records[keep]
+
+
+def records_to_frame(bars):
+    return pd.DataFrame(
+        {column: bars[field] for field, column in FRAME_COLUMNS.items()},
+        index=pd.DatetimeIndex(bars["date"].astype("datetime64[ns]"), name="Date"),
+        copy=False
+    )
+
+
+bar_store = BarStore()
@@ -0,0 +1,107 @@
+# backend/app/utils/bulk_writer.py
+
+import os
+import time
+import asyncio
+import logging
+from collections import defaultdict
+from sqlalchemy import insert
+from fastapi.concurrency import run_in_threadpool
+
+BULK_WRITE_INTERVAL_SECONDS = float(os.getenv("BULK_WRITE_INTERVAL_SECONDS", "1"))
+BULK_WRITE_MAX_BATCH = int(os.getenv("BULK_WRITE_MAX_BATCH", "500"))
+BULK_WRITE_MAX_QUEUE = int(os.getenv("BULK_WRITE_MAX_QUEUE", "10000"))
+
+
+class BulkWriter:
+    """
+    Buffers ORM rows off the request path and inserts them in batches: one
+    executemany INSERT per model every interval seconds, or sooner once
+    max_batch rows are waiting. submit() never blocks; when max_queue rows
+    are already buffered the row is dropped and counted.
+    """
+
+    def __init__(self, session_factory, interval=BULK_WRITE_INTERVAL_SECONDS, max_batch=BULK_WRITE_MAX_BATCH, max_queue=BULK_WRITE_MAX_QUEUE):
+        self.session_factory = session_factory
+        self.interval = interval
+        self.max_batch = max_batch
+        self.max_queue = max_queue
+        self._rows = []  # (model, values)
+        self._wake = None
+        self._task = None
+        self._flushes = 0
+        self._written = 0
+        self._dropped = 0
+        self._failed = 0
+        self._last_flush_ms = 0.0
+
+    def submit(self, model, values):
+        if len(self._rows) >= self.max_queue:
+            self._dropped += 1
+            return False
+        self._rows.append((model, values))
+        if len(self._rows) >= self.max_batch and self._wake is not None:
+            self._wake.set()
+        return True
+
+    def _write(self, rows):
+        grouped = defaultdict(list)
+        for model, values in rows:
+            grouped[model].append(values)
+        db = self.session_factory()
+        try:
+            for model, values in grouped.items():
+                db.execute(insert(model), values)
+            db.commit()
+        finally:
+            db.close()
+
+    async def flush(self):
+        while self._rows:
+            rows, self._rows = self._rows[:self.max_batch], self._rows[self.max_batch:]
+            start = time.perf_counter()
+            try:
+                await run_in_threadpool(self._write, rows)
+            except Exception as e:
+                self._failed += len(rows)
+                logging.error(f"Bulk insert of {len(rows)} rows failed: {str(e)}")
+                continue
+            self._flushes += 1
+            self._written += len(rows)
+            self._last_flush_ms = 1000.0 * (time.perf_counter() - start)
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    def start(self):
+        if self._task is None:
+            self._wake = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        # Whatever is still buffered goes out before shutdown
+        await self.flush()
+
+    def stats(self):
+        return {
+            "interval_seconds": self.interval,
+            "queued": len(self._rows),
+            "flushes": self._flushes,
+            "written": self._written,
+            "dropped": self._dropped,
+            "failed": self._failed,
+            "last_flush_ms": self._last_flush_ms,
+        }
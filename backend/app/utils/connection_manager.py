@@ -1,17 +1,159 @@
-from typing import List
+import os
+import time
+import asyncio
+import logging
+from collections import deque
+from typing import Dict, Set
 from fastapi import WebSocket
 
+WS_QUEUE_SIZE = int(os.getenv("WS_QUEUE_SIZE", "100"))
+# "drop_oldest" discards the oldest queued message for a slow client; "disconnect" closes it
+WS_SLOW_CONSUMER_POLICY = os.getenv("WS_SLOW_CONSUMER_POLICY", "drop_oldest")
+WS_SEND_TIMEOUT_SECONDS = float(os.getenv("WS_SEND_TIMEOUT_SECONDS", "5"))
+
+
+class _Client:
+    def __init__(self, websocket: WebSocket, queue_size: int):
+        self.websocket = websocket
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.task = None
+
+
 class ConnectionManager:
-    def __init__(self):
-        self.active_connections: List[WebSocket] = []
-    
+    """
+    Tracks WebSocket clients and their ticker subscriptions.
+
+    broadcast() and publish() never wait on a socket: each message goes onto
+    the client's bounded outbound queue and a per-client sender task drains
+    it. When a queue is full the slow-consumer policy either drops that
+    client's oldest message or disconnects it, and a failed or timed-out send
+    only drops that one client.
+    """
+
+    def __init__(self, queue_size=WS_QUEUE_SIZE, slow_consumer_policy=WS_SLOW_CONSUMER_POLICY,
+                 send_timeout=WS_SEND_TIMEOUT_SECONDS, lag_samples=4096):
+        self.queue_size = queue_size
+        self.slow_consumer_policy = slow_consumer_policy
+        self.send_timeout = send_timeout
+        self.active_connections: Set[WebSocket] = set()
+        self._clients: Dict[WebSocket, _Client] = {}
+        # ticker -> sockets subscribed to it, and the reverse for cleanup on disconnect
+        self.subscribers: Dict[str, Set[WebSocket]] = {}
+        self.subscriptions: Dict[WebSocket, Set[str]] = {}
+        self.sent = 0
+        self.dropped = 0
+        self.slow_disconnects = 0
+        self.send_failures = 0
+        self._lags = deque(maxlen=lag_samples)
+
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
-        self.active_connections.append(websocket)
-    
+        client = _Client(websocket, self.queue_size)
+        client.task = asyncio.get_running_loop().create_task(self._sender(client))
+        self._clients[websocket] = client
+        self.active_connections.add(websocket)
+
     def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
-    
+        # Idempotent: both the receive loop and a failing sender may call this
+        client = self._clients.pop(websocket, None)
+        self.active_connections.discard(websocket)
+        for ticker in self.subscriptions.pop(websocket, set()):
+            self._drop_subscriber(ticker, websocket)
+        if client is not None and client.task is not None and client.task is not asyncio.current_task():
+            client.task.cancel()
+
+    def subscribe(self, websocket: WebSocket, ticker: str):
+        if websocket not in self._clients:
+            return
+        self.subscribers.setdefault(ticker, set()).add(websocket)
+        self.subscriptions.setdefault(websocket, set()).add(ticker)
+
+    def unsubscribe(self, websocket: WebSocket, ticker: str):
+        self.subscriptions.get(websocket, set()).discard(ticker)
+        self._drop_subscriber(ticker, websocket)
+
+    def _drop_subscriber(self, ticker: str, websocket: WebSocket):
+        sockets = self.subscribers.get(ticker)
+        if sockets is not None:
+            sockets.discard(websocket)
+            if not sockets:
+                del self.subscribers[ticker]
+
+    def subscribed_tickers(self) -> Set[str]:
+        return set(self.subscribers)
+
+    async def send(self, websocket: WebSocket, message: str):
+        client = self._clients.get(websocket)
+        if client is not None:
+            self._enqueue(client, message)
+
     async def broadcast(self, message: str):
-        for connection in self.active_connections:
-            await connection.send_text(message)
+        for client in list(self._clients.values()):
+            self._enqueue(client, message)
+
+    async def publish(self, ticker: str, message: str):
+        # Only the sockets subscribed to this ticker, not every connection
+        for websocket in list(self.subscribers.get(ticker, ())):
+            client = self._clients.get(websocket)
+            if client is not None:
+                self._enqueue(client, message)
+
+    def _enqueue(self, client: _Client, message: str):
+        item = (message, time.monotonic())
+        try:
+            client.queue.put_nowait(item)
+            return
+        except asyncio.QueueFull:
+            pass
+        if self.slow_consumer_policy == "disconnect":
+            self.slow_disconnects += 1
+            logging.warning("Disconnecting slow WebSocket consumer.")
+            self._close(client, code=1013)
+            return
+        client.queue.get_nowait()
+        client.queue.put_nowait(item)
+        self.dropped += 1
+
+    def _close(self, client: _Client, code=1011):
+        self.disconnect(client.websocket)
+
+        async def close():
+            try:
+                await asyncio.wait_for(client.websocket.close(code=code), self.send_timeout)
+            except Exception:
+                pass
+
+        asyncio.get_running_loop().create_task(close())
+
+    async def _sender(self, client: _Client):
+        while True:
+            message, enqueued_at = await client.queue.get()
+            try:
+                await asyncio.wait_for(client.websocket.send_text(message), self.send_timeout)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.send_failures += 1
+                logging.info(f"Dropping WebSocket after failed send: {type(e).__name__}")
+                self._close(client)
+                return
+            self.sent += 1
+            self._lags.append(time.monotonic() - enqueued_at)
+
+    def stats(self):
+        lags = sorted(self._lags)
+        depths = [client.queue.qsize() for client in self._clients.values()]
+        return {
+            "connections": len(self._clients),
+            "subscribed_tickers": len(self.subscribers),
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "slow_disconnects": self.slow_disconnects,
+            "send_failures": self.send_failures,
+            "queue_depth": {"max": max(depths, default=0), "total": sum(depths)},
+            "lag_ms": {
+                "p50": 1000.0 * lags[len(lags) // 2] if lags else 0.0,
+                "p99": 1000.0 * lags[int(len(lags) * 0.99)] if lags else 0.0,
+                "max": 1000.0 * lags[-1] if lags else 0.0,
+            },
+        }
@@ -1,20 +1,99 @@
 # backend/app/utils/data_fetcher.py
 
 import os
-import requests
+import asyncio
+import logging
+from datetime import datetime, time as dtime, timedelta
+from zoneinfo import ZoneInfo
+import httpx
+import numpy as np
 import pandas as pd
 import yfinance as yf
 from fastapi import HTTPException
+from app.utils.ttl_cache import TTLCache
+from app.utils.bar_store import bar_store, frame_to_records, records_to_frame
+from app.utils.http_client import upstream, RateLimited
+from app.utils.instrumentation import timed
 
 ALPHAVANTAGE_API_KEY = os.getenv("ALPHAVANTAGE_API_KEY")
 
-def fetch_historical_data_alpha(ticker: str, period: str = "2y") -> pd.DataFrame:
+# Cache settings: short TTLs while the market is open, otherwise cache until the next open
+BARS_TTL_SECONDS = int(os.getenv("BARS_TTL_SECONDS", "300"))
+OPTION_CHAIN_TTL_SECONDS = int(os.getenv("OPTION_CHAIN_TTL_SECONDS", "60"))
+CLOSED_MARKET_MAX_TTL_SECONDS = int(os.getenv("CLOSED_MARKET_MAX_TTL_SECONDS", str(6 * 3600)))
+DATA_CACHE_MAX_ENTRIES = int(os.getenv("DATA_CACHE_MAX_ENTRIES", "256"))
+
+MARKET_TZ = ZoneInfo("America/New_York")
+MARKET_OPEN = dtime(9, 30)
+MARKET_CLOSE = dtime(16, 0)
+
+bars_cache = TTLCache(max_entries=DATA_CACHE_MAX_ENTRIES)
+option_chain_cache = TTLCache(max_entries=DATA_CACHE_MAX_ENTRIES)
+quote_cache = TTLCache(max_entries=4 * DATA_CACHE_MAX_ENTRIES)
+
+QUOTE_TTL_SECONDS = int(os.getenv("QUOTE_TTL_SECONDS", "30"))
+
+# Multi-expiration chains: 0 loads every listed expiration, N loads the nearest N
+OPTION_EXPIRATIONS = int(os.getenv("OPTION_EXPIRATIONS", "0"))
+OPTION_CHAINS_TTL_SECONDS = int(os.getenv("OPTION_CHAINS_TTL_SECONDS", "300"))
+option_chains_cache = TTLCache(max_entries=DATA_CACHE_MAX_ENTRIES)
+
+CHAIN_COLUMNS = ['strike', 'expiration', 'T', 'option_type', 'impliedVolatility', 'openInterest', 'volume', 'lastPrice', 'bid', 'ask']
+
+def is_market_open(now: datetime = None) -> bool:
+    """
+    Regular NYSE session, weekdays 09:30-16:00 New York time (holidays not modelled).
+    """
+    now = (now or datetime.now(MARKET_TZ)).astimezone(MARKET_TZ)
+    return now.weekday() < 5 and MARKET_OPEN <= now.time() < MARKET_CLOSE
+
+def seconds_until_market_open(now: datetime = None) -> float:
+    now = (now or datetime.now(MARKET_TZ)).astimezone(MARKET_TZ)
+    candidate = now.replace(hour=MARKET_OPEN.hour, minute=MARKET_OPEN.minute, second=0, microsecond=0)
+    if candidate <= now:
+        candidate += timedelta(days=1)
+    while candidate.weekday() >= 5:
+        candidate += timedelta(days=1)
+    return (candidate - now).total_seconds()
+
+def last_completed_session(now: datetime = None):
+    """
+    Date of the most recent regular session that has already closed.
+    """
+    now = (now or datetime.now(MARKET_TZ)).astimezone(MARKET_TZ)
+    day = now.date()
+    if now.weekday() >= 5 or now.time() < MARKET_CLOSE:
+        day -= timedelta(days=1)
+    while day.weekday() >= 5:
+        day -= timedelta(days=1)
+    return pd.Timestamp(day)
+
+def completed_bars(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Drop the in-progress bar for today's session so only final bars get stored.
+    """
+    index = pd.DatetimeIndex(df.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return df[index.normalize() <= last_completed_session()]
+
+def market_aware_ttl(open_ttl: int) -> float:
+    """
+    open_ttl while the market trades; while it is closed nothing moves, so keep
+    data until the next open (bounded by CLOSED_MARKET_MAX_TTL_SECONDS).
+    """
+    if is_market_open():
+        return open_ttl
+    return max(open_ttl, min(seconds_until_market_open(), CLOSED_MARKET_MAX_TTL_SECONDS))
+
+async def fetch_historical_data_alpha(ticker: str, period: str = "2y", outputsize: str = "full") -> pd.DataFrame:
     """
     Fetch historical data from Alpha Vantage.
     period is interpreted:
      '2y' ~ last 500 trading days
      '1y' ~ last 250 trading days
      'max' ~ full data
+    outputsize 'compact' returns only the latest 100 bars (used for incremental updates).
     """
     if not ALPHAVANTAGE_API_KEY:
         raise HTTPException(status_code=500, detail="Alpha Vantage API key not configured.")
@@ -24,10 +103,16 @@ def fetch_historical_data_alpha(ticker: str, period: str = "2y") -> pd.DataFrame
         "function": "TIME_SERIES_DAILY_ADJUSTED",
         "symbol": ticker,
         "apikey": ALPHAVANTAGE_API_KEY,
-        "outputsize": "full"
+        "outputsize": outputsize
     }
 
-    r = requests.get(url, params=params)
+    try:
+        r = await upstream.get(url, params=params, wait_for_rate_limit=False)
+    except RateLimited:
+        # Over our share of the quota; callers fall back to Yahoo Finance
+        raise HTTPException(status_code=429, detail="Alpha Vantage rate limit reached.")
+    except httpx.HTTPError as e:
+        raise HTTPException(status_code=500, detail=f"Alpha Vantage request failed: {str(e)}")
     if r.status_code != 200:
         raise HTTPException(status_code=500, detail=f"Alpha Vantage request failed with code {r.status_code}.")
 
@@ -48,6 +133,7 @@ def fetch_historical_data_alpha(ticker: str, period: str = "2y") -> pd.DataFrame
         '6. volume': 'Volume'
     }, inplace=True)
     df.sort_index(inplace=True)
+    df = adjusted_bars(df)
 
     # Filter by period
     if period == "2y":
@@ -61,35 +147,206 @@ def fetch_historical_data_alpha(ticker: str, period: str = "2y") -> pd.DataFrame
 
     return df
 
-def fetch_historical_data(ticker: str) -> pd.DataFrame:
+def adjusted_bars(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Scale OHLC by Adj Close / Close so Alpha Vantage bars are split- and
+    dividend-adjusted like Yahoo's auto-adjusted history, and drop Adj Close.
+    """
+    factor = df['Adj Close'] / df['Close']
+    for col in ('Open', 'High', 'Low', 'Close'):
+        df[col] = df[col] * factor
+    return df.drop(columns=['Adj Close'])
+
+@timed("fetch_historical_data")
+async def fetch_historical_data(ticker: str) -> pd.DataFrame:
+    """
+    Cached 2y daily bars for ticker. Concurrent misses share one upstream call.
+    The returned frame is shared between callers and must not be modified.
+    """
+    ticker = ticker.upper()
+    return await bars_cache.aget_or_load(
+        ticker,
+        lambda: fetch_historical_data_upstream(ticker),
+        lambda: market_aware_ttl(BARS_TTL_SECONDS)
+    )
+
+async def fetch_historical_data_upstream(ticker: str) -> pd.DataFrame:
+    """
+    Serve 2y bars from the local bar store, downloading only the bars after the
+    last stored session. A ticker with nothing stored gets a full download.
+    While the market is open the live bar is appended in memory but not stored.
+    """
+    last_stored = bar_store.last_date(ticker)
+    if last_stored is None:
+        new_bars = await fetch_historical_data_full(ticker)
+        data_source = new_bars['data_source'].iloc[0]
+        bar_store.append(ticker, completed_bars(new_bars))
+        df = with_live_bar(bar_store.frame(ticker), new_bars)
+    elif last_stored >= last_completed_session() and not is_market_open():
+        df = bar_store.frame(ticker)
+        data_source = 'Local store'
+    else:
+        try:
+            new_bars, data_source = await fetch_historical_data_since(ticker, last_stored)
+        except Exception as e:
+            logging.warning(f"Incremental bar fetch failed for {ticker}: {str(e)}. Serving stored bars.")
+            new_bars, data_source = pd.DataFrame(), 'Local store'
+        if bar_store.matches(ticker, new_bars):
+            bar_store.append(ticker, completed_bars(new_bars))
+        else:
+            # A split or dividend re-adjusted the history: stored bars no longer line up
+            logging.info(f"Stored bars for {ticker} disagree with upstream; rebuilding the bar store.")
+            new_bars = await fetch_historical_data_full(ticker)
+            data_source = new_bars['data_source'].iloc[0]
+            bar_store.replace(ticker, completed_bars(new_bars))
+        df = with_live_bar(bar_store.frame(ticker), new_bars)
+
+    return two_year_window(df, data_source)
+
+def two_year_window(df: pd.DataFrame, data_source: str) -> pd.DataFrame:
+    """
+    The last two years of df plus a data_source column. Rows are selected with
+    a positional slice and the frame is rebuilt with copy=False, so stored
+    bars stay zero-copy views of the bar store's memmap.
+    """
+    window = df.iloc[df.index.searchsorted(df.index[-1] - pd.DateOffset(years=2)):]
+    columns = {col: window[col].to_numpy() for col in window.columns}
+    columns['data_source'] = np.full(len(window), data_source, dtype=object)
+    return pd.DataFrame(columns, index=window.index, copy=False)
+
+def with_live_bar(df, new_bars: pd.DataFrame) -> pd.DataFrame:
+    """
+    Stored bars plus any fetched bar newer than the last stored session (the
+    in-progress one), in the store's OHLCV shape.
+    """
+    if new_bars.empty:
+        return df
+    live = records_to_frame(frame_to_records(new_bars))
+    if df is None:
+        return live
+    live = live[live.index > df.index[-1]]
+    return pd.concat([df, live]) if not live.empty else df
+
+async def fetch_historical_data_since(ticker: str, last_date: pd.Timestamp):
+    """
+    Bars from last_date on, from Alpha Vantage (compact when the gap fits in
+    its 100-bar window) or Yahoo Finance as fallback. The last_date bar is
+    kept so callers can check it against the stored one.
+    """
+    outputsize = "compact" if pd.Timestamp.now() - last_date < pd.Timedelta(days=120) else "full"
+    try:
+        df = await fetch_historical_data_alpha(ticker, "max", outputsize=outputsize)
+        data_source = 'Alpha Vantage'
+    except HTTPException as e:
+        if e.status_code not in (404, 429):
+            raise e
+        start = last_date.strftime("%Y-%m-%d")
+        df = await upstream.run_yahoo(lambda: yf.Ticker(ticker).history(start=start, interval='1d'))
+        data_source = 'Yahoo Finance'
+    if df.empty:
+        return df, data_source
+    index = pd.DatetimeIndex(df.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return df[index.normalize() >= last_date], data_source
+
+async def fetch_historical_data_full(ticker: str) -> pd.DataFrame:
     """
     Attempt to fetch 2y data from Alpha Vantage first.
-    If no data found, fallback to Yahoo Finance.
+    If no data found (or we're over the Alpha Vantage quota), fallback to Yahoo Finance.
     """
     try:
-        df = fetch_historical_data_alpha(ticker, "2y")
+        df = await fetch_historical_data_alpha(ticker, "2y")
         df['data_source'] = 'Alpha Vantage'
         return df
     except HTTPException as e:
-        if e.status_code == 404:
-            # Fallback to yfinance
-            df_yf = yf.Ticker(ticker).history(period="2y", interval='1d')
-            if df_yf.empty:
-                # Try shorter period or max with yfinance
-                df_yf = yf.Ticker(ticker).history(period="1y", interval='1d')
-                if df_yf.empty:
-                    df_yf = yf.Ticker(ticker).history(period="max", interval='1d')
-                    if df_yf.empty:
-                        raise HTTPException(status_code=404, detail=f"No historical data found for {ticker} via Alpha Vantage or Yahoo Finance.")
-            df_yf['data_source'] = 'Yahoo Finance'
-            return df_yf
+        if e.status_code in (404, 429):
+            return await upstream.run_yahoo(fetch_historical_data_yahoo, ticker)
         else:
             # Some other error from Alpha Vantage
             raise e
 
-def fetch_option_chain(ticker: str):
+def fetch_historical_data_yahoo(ticker: str) -> pd.DataFrame:
+    """
+    Blocking yfinance download; run it through upstream.run_yahoo.
+    """
+    df_yf = yf.Ticker(ticker).history(period="2y", interval='1d')
+    if df_yf.empty:
+        # Try shorter period or max with yfinance
+        df_yf = yf.Ticker(ticker).history(period="1y", interval='1d')
+        if df_yf.empty:
+            df_yf = yf.Ticker(ticker).history(period="max", interval='1d')
+            if df_yf.empty:
+                raise HTTPException(status_code=404, detail=f"No historical data found for {ticker} via Alpha Vantage or Yahoo Finance.")
+    df_yf['data_source'] = 'Yahoo Finance'
+    return df_yf
+
+async def fetch_latest_prices(tickers) -> dict:
+    """
+    Latest close for each ticker, without downloading full histories.
+
+    Prices come from the quote/bar caches or the local bar store when they're
+    fresh; everything left is fetched in a single multi-ticker yf.download of
+    the last few sessions. Tickers with no price are left out of the result.
+    """
+    prices = {}
+    missing = []
+    store_is_current = not is_market_open()
+    session = last_completed_session()
+    for ticker in dict.fromkeys(t.upper() for t in tickers):
+        cached = quote_cache.get(ticker)
+        if cached is None:
+            bars = bars_cache.get(ticker)
+            if bars is not None:
+                cached = float(bars['Close'].iloc[-1])
+            elif store_is_current and (bar_store.last_date(ticker) or pd.Timestamp.min) >= session:
+                cached = bar_store.last_close(ticker)
+        if cached is not None:
+            prices[ticker] = cached
+        else:
+            missing.append(ticker)
+
+    if missing:
+        try:
+            fetched = await upstream.run_yahoo(fetch_latest_prices_yahoo, missing)
+        except Exception as e:
+            logging.error(f"Bulk quote download failed for {missing}: {str(e)}")
+            fetched = {}
+        ttl = market_aware_ttl(QUOTE_TTL_SECONDS)
+        for ticker, price in fetched.items():
+            quote_cache.set(ticker, price, ttl)
+        prices.update(fetched)
+    return prices
+
+def fetch_latest_prices_yahoo(tickers) -> dict:
     """
-    Fetch option chain from Yahoo Finance as previously.
+    Blocking multi-ticker download of the last few daily closes.
+    """
+    df = yf.download(tickers, period="5d", interval="1d", group_by="column", progress=False, threads=True, auto_adjust=False)
+    if df.empty:
+        return {}
+    closes = df['Close']
+    if isinstance(closes, pd.Series):
+        closes = closes.to_frame(name=tickers[0])
+    last = closes.ffill().iloc[-1]
+    return {ticker: float(price) for ticker, price in last.items() if pd.notna(price)}
+
+@timed("fetch_option_chain")
+async def fetch_option_chain(ticker: str):
+    """
+    Cached nearest-expiry option chain. Returns copies so callers may add columns.
+    """
+    ticker = ticker.upper()
+    calls, puts, expiration_str = await option_chain_cache.aget_or_load(
+        ticker,
+        lambda: upstream.run_yahoo(fetch_option_chain_upstream, ticker),
+        lambda: market_aware_ttl(OPTION_CHAIN_TTL_SECONDS)
+    )
+    return calls.copy(), puts.copy(), expiration_str
+
+def fetch_option_chain_upstream(ticker: str):
+    """
+    Fetch option chain from Yahoo Finance as previously (blocking).
     """
     ticker_obj = yf.Ticker(ticker)
     expirations = ticker_obj.options
@@ -102,3 +359,59 @@ def fetch_option_chain(ticker: str):
     if calls.empty and puts.empty:
         raise HTTPException(status_code=404, detail=f"No option chain data for {ticker} at {expiration_str}.")
     return calls, puts, expiration_str
+
+async def fetch_option_chains(ticker: str, max_expirations: int = OPTION_EXPIRATIONS) -> pd.DataFrame:
+    """
+    Every listed expiration (or the nearest max_expirations), fetched
+    concurrently and merged into one compact typed frame with CHAIN_COLUMNS.
+    Cached per ticker; callers must not modify the returned frame.
+    """
+    ticker = ticker.upper()
+    return await option_chains_cache.aget_or_load(
+        (ticker, max_expirations),
+        lambda: fetch_option_chains_upstream(ticker, max_expirations),
+        lambda: market_aware_ttl(OPTION_CHAINS_TTL_SECONDS)
+    )
+
+async def fetch_option_chains_upstream(ticker: str, max_expirations: int) -> pd.DataFrame:
+    ticker_obj = yf.Ticker(ticker)
+    expirations = await upstream.run_yahoo(lambda: ticker_obj.options)
+    if not expirations:
+        raise HTTPException(status_code=404, detail=f"No option chain available for {ticker}.")
+    if max_expirations:
+        expirations = expirations[:max_expirations]
+
+    chains = await asyncio.gather(
+        *[upstream.run_yahoo(ticker_obj.option_chain, expiration) for expiration in expirations],
+        return_exceptions=True
+    )
+    frames = []
+    now = pd.Timestamp.now(tz='UTC')
+    for expiration_str, chain in zip(expirations, chains):
+        if isinstance(chain, Exception):
+            logging.warning(f"Skipping {ticker} expiration {expiration_str}: {str(chain)}")
+            continue
+        for option_type, df in (('call', chain.calls), ('put', chain.puts)):
+            if not df.empty:
+                frames.append(compact_chain(df, option_type, expiration_str, now))
+    if not frames:
+        raise HTTPException(status_code=404, detail=f"No option chain data for {ticker}.")
+    return pd.concat(frames, ignore_index=True)
+
+def compact_chain(df: pd.DataFrame, option_type: str, expiration_str: str, now: pd.Timestamp) -> pd.DataFrame:
+    """
+    Reduce a raw yfinance calls/puts frame to CHAIN_COLUMNS with narrow dtypes.
+    """
+    # Listed options stop trading at the 16:00 New York close on expiration day
+    expiration = pd.Timestamp(f"{expiration_str} 16:00", tz=MARKET_TZ).tz_convert('UTC')
+    out = pd.DataFrame({
+        'strike': df['strike'].to_numpy(dtype=np.float64),
+        'expiration': expiration,
+        'T': max((expiration - now).total_seconds(), 0.0) / (365.0 * 86400.0),
+        'option_type': pd.Categorical([option_type] * len(df), categories=['call', 'put']),
+    })
+    for col in ('impliedVolatility', 'lastPrice', 'bid', 'ask'):
+        out[col] = df[col].to_numpy(dtype=np.float32) if col in df.columns else np.float32(np.nan)
+    for col in ('openInterest', 'volume'):
+        out[col] = df[col].fillna(0).to_numpy(dtype=np.int64) if col in df.columns else 0
+    return out[CHAIN_COLUMNS]
@@ -0,0 +1,140 @@
+# backend/app/utils/http_client.py
+
+import os
+import time
+import random
+import asyncio
+import logging
+from urllib.parse import urlsplit
+import httpx
+
+HTTP_TIMEOUT_SECONDS = float(os.getenv("HTTP_TIMEOUT_SECONDS", "10"))
+HTTP_CONNECT_TIMEOUT_SECONDS = float(os.getenv("HTTP_CONNECT_TIMEOUT_SECONDS", "3"))
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "50"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+HTTP_PER_HOST_CONCURRENCY = int(os.getenv("HTTP_PER_HOST_CONCURRENCY", "8"))
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "3"))
+HTTP_BACKOFF_BASE_SECONDS = float(os.getenv("HTTP_BACKOFF_BASE_SECONDS", "0.25"))
+HTTP_BACKOFF_MAX_SECONDS = float(os.getenv("HTTP_BACKOFF_MAX_SECONDS", "4"))
+
+# Alpha Vantage's quota is per API key, so split it across the gunicorn workers
+ALPHAVANTAGE_REQUESTS_PER_MINUTE = float(os.getenv("ALPHAVANTAGE_REQUESTS_PER_MINUTE", "5"))
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "4"))
+
+# yfinance does its own HTTP, so Yahoo calls run in threads behind this limit
+YAHOO_CONCURRENCY = int(os.getenv("YAHOO_CONCURRENCY", "8"))
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class RateLimited(Exception):
+    """
+    Raised instead of waiting when a host's token bucket is empty and the caller asked not to wait.
+    """
+
+
+class TokenBucket:
+    """
+    Async token bucket: `rate` tokens per second, bursting up to `capacity`.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self):
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    async def acquire(self):
+        async with self._lock:
+            while not self.try_acquire():
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+def backoff_delay(attempt):
+    # Full jitter: uniform over [0, min(cap, base * 2^attempt)]
+    return random.uniform(0, min(HTTP_BACKOFF_MAX_SECONDS, HTTP_BACKOFF_BASE_SECONDS * (2 ** attempt)))
+
+
+class UpstreamClient:
+    """
+    Shared async HTTP client for upstream data providers: keep-alive pooling,
+    per-host concurrency limits, timeouts, jittered retries and optional
+    per-host token-bucket rate limits.
+    """
+
+    def __init__(self):
+        self._client = None
+        self._host_limits = {}
+        self.rate_limits = {}
+        self.yahoo_limit = asyncio.Semaphore(YAHOO_CONCURRENCY)
+
+    @property
+    def client(self):
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(HTTP_TIMEOUT_SECONDS, connect=HTTP_CONNECT_TIMEOUT_SECONDS),
+                limits=httpx.Limits(max_connections=HTTP_MAX_CONNECTIONS, max_keepalive_connections=HTTP_MAX_KEEPALIVE),
+            )
+        return self._client
+
+    def _host_limit(self, host):
+        if host not in self._host_limits:
+            self._host_limits[host] = asyncio.Semaphore(HTTP_PER_HOST_CONCURRENCY)
+        return self._host_limits[host]
+
+    async def get(self, url, params=None, wait_for_rate_limit=True):
+        """
+        GET with retries. With wait_for_rate_limit=False a rate-limited host
+        raises RateLimited immediately so the caller can use another source.
+        """
+        host = urlsplit(url).hostname
+        bucket = self.rate_limits.get(host)
+        for attempt in range(HTTP_MAX_RETRIES + 1):
+            if bucket is not None:
+                if wait_for_rate_limit:
+                    await bucket.acquire()
+                elif not bucket.try_acquire():
+                    raise RateLimited(f"Rate limit reached for {host}.")
+            try:
+                async with self._host_limit(host):
+                    response = await self.client.get(url, params=params)
+                if response.status_code not in RETRY_STATUS_CODES or attempt == HTTP_MAX_RETRIES:
+                    return response
+                logging.warning(f"{host} returned {response.status_code}, retrying (attempt {attempt + 1}).")
+            except httpx.TransportError as e:
+                if attempt == HTTP_MAX_RETRIES:
+                    raise
+                logging.warning(f"Request to {host} failed: {str(e)}, retrying (attempt {attempt + 1}).")
+            await asyncio.sleep(backoff_delay(attempt))
+
+    async def run_yahoo(self, func, *args, **kwargs):
+        """
+        Run a blocking yfinance call in a worker thread, bounded by YAHOO_CONCURRENCY.
+        """
+        async with self.yahoo_limit:
+            return await asyncio.to_thread(func, *args, **kwargs)
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+upstream = UpstreamClient()
+upstream.rate_limits["www.alphavantage.co"] = TokenBucket(
+    rate=ALPHAVANTAGE_REQUESTS_PER_MINUTE / 60.0 / WEB_CONCURRENCY,
+    capacity=max(1.0, ALPHAVANTAGE_REQUESTS_PER_MINUTE / WEB_CONCURRENCY)
+)
@@ -0,0 +1,113 @@
+# backend/app/utils/inference_batcher.py
+
+import os
+import time
+import threading
+from collections import deque
+from concurrent.futures import Future
+import numpy as np
+
+INFERENCE_BATCH_WINDOW_MS = float(os.getenv("INFERENCE_BATCH_WINDOW_MS", "5"))
+INFERENCE_MAX_BATCH_SIZE = int(os.getenv("INFERENCE_MAX_BATCH_SIZE", "64"))
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64)
+
+
+class _Batch:
+    def __init__(self):
+        self.items = []  # (input_data, future, enqueued_at)
+        self.full = threading.Event()
+
+
+class InferenceBatcher:
+    """
+    Coalesces concurrent predictions for the same model into one batched call.
+
+    The first caller for a key becomes the batch leader: it waits up to
+    window_ms (or until max_batch_size requests have queued), runs
+    predict_fn(key, stacked_inputs) once, and hands row i of the result back
+    to the i-th caller. Everyone else just waits on their future.
+    """
+
+    def __init__(self, predict_fn, window_ms=INFERENCE_BATCH_WINDOW_MS, max_batch_size=INFERENCE_MAX_BATCH_SIZE, wait_samples=2048):
+        self.predict_fn = predict_fn
+        self.window = window_ms / 1000.0
+        self.max_batch_size = max_batch_size
+        self._lock = threading.Lock()
+        self._open = {}  # (key, input shape) -> _Batch still accepting requests
+        self._batches = 0
+        self._requests = 0
+        self._size_histogram = {bucket: 0 for bucket in BATCH_SIZE_BUCKETS}
+        self._size_histogram["+Inf"] = 0
+        self._waits = deque(maxlen=wait_samples)
+        self._wait_total = 0.0
+
+    def submit(self, key, input_data):
+        """
+        Run input_data (shape (1, ...)) through the model for key, batched with
+        whatever else arrives within the window. Blocks until the result is ready.
+        """
+        group = (key, input_data.shape[1:])
+        future = Future()
+        with self._lock:
+            batch = self._open.get(group)
+            leader = batch is None
+            if leader:
+                batch = self._open[group] = _Batch()
+            batch.items.append((input_data, future, time.perf_counter()))
+            if len(batch.items) >= self.max_batch_size:
+                # Close the batch so later arrivals start a new one
+                del self._open[group]
+                batch.full.set()
+
+        if leader:
+            batch.full.wait(self.window)
+            with self._lock:
+                if self._open.get(group) is batch:
+                    del self._open[group]
+            self._run(key, batch)
+        return future.result()
+
+    def _run(self, key, batch):
+        started = time.perf_counter()
+        items = batch.items
+        self._record(len(items), [started - enqueued for _, _, enqueued in items])
+        try:
+            outputs = self.predict_fn(key, np.concatenate([x for x, _, _ in items], axis=0))
+        except BaseException as e:
+            for _, future, _ in items:
+                future.set_exception(e)
+            return
+        for i, (_, future, _) in enumerate(items):
+            future.set_result(outputs[i])
+
+    def _record(self, size, waits):
+        with self._lock:
+            self._batches += 1
+            self._requests += size
+            for bucket in BATCH_SIZE_BUCKETS:
+                if size <= bucket:
+                    self._size_histogram[bucket] += 1
+                    break
+            else:
+                self._size_histogram["+Inf"] += 1
+            self._waits.extend(waits)
+            self._wait_total += sum(waits)
+
+    def stats(self):
+        with self._lock:
+            waits = np.array(self._waits) if self._waits else np.zeros(1)
+            return {
+                "window_ms": self.window * 1000.0,
+                "max_batch_size": self.max_batch_size,
+                "batches": self._batches,
+                "requests": self._requests,
+                "mean_batch_size": self._requests / self._batches if self._batches else 0.0,
+                "batch_size_histogram": {str(k): v for k, v in self._size_histogram.items()},
+                "queue_wait_ms": {
+                    "mean": 1000.0 * self._wait_total / self._requests if self._requests else 0.0,
+                    "p50": 1000.0 * float(np.percentile(waits, 50)),
+                    "p99": 1000.0 * float(np.percentile(waits, 99)),
+                    "max": 1000.0 * float(waits.max()),
+                },
+            }
@@ -0,0 +1,330 @@
+# backend/app/utils/instrumentation.py
+
+import os
+import sys
+import time
+import heapq
+import random
+import inspect
+import logging
+import threading
+import functools
+import contextvars
+from collections import Counter
+from contextlib import contextmanager
+from sqlalchemy import event
+
+# Opt-in sampling profiler: fraction of requests sampled (0 disables it),
+# stack sampling interval, and how many of the slowest profiles are kept
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_KEEP_SLOWEST = int(os.getenv("PROFILE_KEEP_SLOWEST", "20"))
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Spans recorded by the request being served, when it is being profiled
+_request_profile = contextvars.ContextVar("request_profile", default=None)
+
+
+class Histogram:
+    """
+    Cumulative-bucket latency histogram per label set, in seconds.
+    """
+
+    def __init__(self, name, help_text, label_names, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series = {}  # label values -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, labels, seconds):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    series[i] += 1
+            series[-2] += seconds
+            series[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted(self._series.items())
+        for labels, values in series:
+            label_text = ",".join(f'{name}="{value}"' for name, value in zip(self.label_names, labels))
+            prefix = label_text + "," if label_text else ""
+            for bound, count in zip(self.buckets, values):
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {count}')
+            lines.append(f'{self.name}_bucket{{{prefix}le="+Inf"}} {values[-1]}')
+            lines.append(f"{self.name}_sum{{{label_text}}} {values[-2]:.6f}")
+            lines.append(f"{self.name}_count{{{label_text}}} {values[-1]}")
+        return lines
+
+
+request_latency = Histogram("http_request_duration_seconds", "Request latency by route.", ("method", "route", "status"))
+span_latency = Histogram("span_duration_seconds", "Latency of instrumented hot-path calls.", ("span",))
+db_latency = Histogram("db_query_duration_seconds", "Database statement latency.", ("operation",))
+
+
+def _record_span(name, seconds):
+    span_latency.observe((name,), seconds)
+    profile = _request_profile.get()
+    if profile is not None:
+        profile.add_span(name, seconds)
+
+
+@contextmanager
+def span(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _record_span(name, time.perf_counter() - start)
+
+
+def timed(name):
+    """
+    Decorator recording a span around a sync or async function.
+    """
+    def decorate(fn):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            # Threadpool work is attributed to the request through this frame
+            profile = _request_profile.get()
+            if profile is not None:
+                profiler.attach(sys._getframe(), profile)
+            try:
+                with span(name):
+                    return fn(*args, **kwargs)
+            finally:
+                if profile is not None:
+                    profiler.detach(sys._getframe())
+        return wrapper
+    return decorate
+
+
+def instrument_engine(engine):
+    """
+    Time every statement the engine executes into db_query_duration_seconds
+    and the current request's spans.
+    """
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        seconds = time.perf_counter() - conn.info["query_start"].pop()
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "OTHER"
+        db_latency.observe((operation,), seconds)
+        profile = _request_profile.get()
+        if profile is not None:
+            profile.add_span(f"db.{operation.lower()}", seconds)
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context):
+        # after_cursor_execute doesn't fire for a failed statement; drop its start time
+        conn = context.connection
+        if conn is not None and context.execution_context is not None and conn.info.get("query_start"):
+            conn.info["query_start"].pop()
+
+
+class RequestProfile:
+    def __init__(self, method, route):
+        self.method = method
+        self.route = route
+        self.duration = 0.0
+        self.status = None
+        self.spans = Counter()
+        self.samples = Counter()  # folded stack -> count
+        self._lock = threading.Lock()
+
+    def add_span(self, name, seconds):
+        with self._lock:
+            self.spans[name] += seconds
+
+    def as_dict(self):
+        return {
+            "method": self.method,
+            "route": self.route,
+            "status": self.status,
+            "duration_ms": 1000.0 * self.duration,
+            "spans_ms": {name: 1000.0 * seconds for name, seconds in self.spans.most_common()},
+            "samples": sum(self.samples.values()),
+            # Brendan Gregg's folded format: "outer;inner count" per line
+            "folded": "\n".join(f"{stack} {count}" for stack, count in self.samples.most_common()),
+        }
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler for a sampled subset of requests. A background
+    thread snapshots every thread's stack each interval; a stack is charged
+    to a request when it passes through a frame attached to that request (the
+    middleware's frame on the event loop, or a timed() wrapper's frame in the
+    threadpool). Only frames above the attached one are kept. The slowest
+    keep requests are retained with their folded stacks.
+    """
+
+    def __init__(self, sample_rate=PROFILE_SAMPLE_RATE, interval_ms=PROFILE_INTERVAL_MS, keep=PROFILE_KEEP_SLOWEST):
+        self.sample_rate = sample_rate
+        self.interval = interval_ms / 1000.0
+        self.keep = keep
+        self._attached = {}  # id(frame) -> (frame, profile)
+        self._slowest = []  # heap of (duration, sequence, profile)
+        self._sequence = 0
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def enabled(self):
+        return self.sample_rate > 0
+
+    def should_sample(self):
+        return self.enabled and random.random() < self.sample_rate
+
+    def attach(self, frame, profile):
+        with self._lock:
+            self._attached[id(frame)] = (frame, profile)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+                self._thread.start()
+
+    def detach(self, frame):
+        with self._lock:
+            self._attached.pop(id(frame), None)
+
+    def finish(self, profile):
+        with self._lock:
+            self._sequence += 1
+            entry = (profile.duration, self._sequence, profile)
+            if len(self._slowest) < self.keep:
+                heapq.heappush(self._slowest, entry)
+            elif profile.duration > self._slowest[0][0]:
+                heapq.heapreplace(self._slowest, entry)
+
+    def slowest(self):
+        with self._lock:
+            entries = sorted(self._slowest, reverse=True)
+        return [profile.as_dict() for _, _, profile in entries]
+
+    def _sample(self):
+        with self._lock:
+            attached = dict(self._attached)
+        if not attached:
+            return
+        own = threading.get_ident()
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            stack = []
+            while frame is not None:
+                owner = attached.get(id(frame))
+                if owner is not None and owner[0] is frame:
+                    stack.append(_frame_label(frame))
+                    owner[1].samples[";".join(reversed(stack))] += 1
+                    break
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self._sample()
+            except Exception as e:
+                logging.error(f"Profiler sampling failed: {str(e)}")
+
+
+profiler = SamplingProfiler()
+
+
+class InstrumentationMiddleware:
+    """
+    ASGI middleware timing every HTTP request into
+    http_request_duration_seconds by route template, and profiling a
+    PROFILE_SAMPLE_RATE fraction of them.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        profile = None
+        token = None
+        if profiler.should_sample():
+            profile = RequestProfile(scope["method"], scope["path"])
+            token = _request_profile.set(profile)
+            profiler.attach(sys._getframe(), profile)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start
+            # The router stores the matched route in scope; templates keep label cardinality bounded
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            request_latency.observe((scope["method"], route, str(status["code"])), duration)
+            if profile is not None:
+                profiler.detach(sys._getframe())
+                _request_profile.reset(token)
+                profile.route, profile.status, profile.duration = route, status["code"], duration
+                profiler.finish(profile)
+
+
+def _metric_name(*parts):
+    name = "_".join(str(part) for part in parts if part != "")
+    return "".join(c if c.isalnum() or c == "_" else "_" for c in name.replace("+Inf", "inf")).lower()
+
+
+def _gauge_lines(prefix, stats):
+    lines = []
+    for key, value in stats.items():
+        if isinstance(value, dict):
+            lines.extend(_gauge_lines(_metric_name(prefix, key), value))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            name = _metric_name(prefix, key)
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {value}")
+    return lines
+
+
+def render_metrics(components=None):
+    """
+    Prometheus text exposition of the latency histograms, plus one gauge per
+    numeric field of each component's stats() dict, named <prefix>_<field>.
+    """
+    lines = []
+    for histogram in (request_latency, span_latency, db_latency):
+        lines.extend(histogram.render())
+    for prefix, stats in (components or {}).items():
+        try:
+            lines.extend(_gauge_lines(prefix, stats()))
+        except Exception as e:
+            logging.error(f"Could not collect {prefix} metrics: {str(e)}")
+    return "\n".join(lines) + "\n"
@@ -1,46 +1,213 @@
 # backend/app/utils/model_utils.py
 
 import os
+import logging
+import threading
+from collections import OrderedDict
 import joblib
 import numpy as np
-from tensorflow.keras.models import load_model
-from fastapi import HTTPException
+from app.utils.numpy_runtime import load_numpy_model
+from app.features import FeaturePipeline, pipeline_path
+
+MODELS_DIR = os.getenv("MODELS_DIR", "/app/models")
+MODEL_CACHE_MAX_BYTES = int(os.getenv("MODEL_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+PRELOAD_TICKERS = [t.strip().upper() for t in os.getenv("PRELOAD_TICKERS", "").split(",") if t.strip()]
+
+
+def lstm_model_path(ticker):
+    # NumPy export written by train_lstm_option_pricing.py, with its feature pipeline alongside
+    return os.path.join(MODELS_DIR, f"lstm_option_pricing_{ticker}.npz")
+
+
+def model_footprint(model):
+    """
+    Approximate in-memory size of a model from its weight arrays.
+    """
+    return int(sum(w.nbytes for w in model.get_weights()))
+
+
+class LSTMModelCache:
+    """
+    Bounded per-process LRU of loaded LSTM models and their feature pipelines,
+    keyed by ticker. Entries are evicted oldest-first once the summed weight
+    footprint exceeds max_bytes, and reloaded when the .npz file's mtime
+    changes on disk.
+    """
+
+    def __init__(self, max_bytes=MODEL_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._entries = OrderedDict()  # ticker -> ((model, pipeline), mtime, nbytes)
+        self._lock = threading.Lock()
+        self._load_locks = {}
+
+    def _load_lock(self, ticker):
+        with self._lock:
+            return self._load_locks.setdefault(ticker, threading.Lock())
+
+    def _lookup(self, ticker, mtime):
+        with self._lock:
+            entry = self._entries.get(ticker)
+            if entry is None or entry[1] != mtime:
+                return None
+            self._entries.move_to_end(ticker)
+            return entry[0]
+
+    def _store(self, ticker, loaded, mtime):
+        nbytes = model_footprint(loaded[0])
+        with self._lock:
+            old = self._entries.pop(ticker, None)
+            if old is not None:
+                self.total_bytes -= old[2]
+            self._entries[ticker] = (loaded, mtime, nbytes)
+            self.total_bytes += nbytes
+            # Always keep the entry just loaded, even if it alone exceeds the budget
+            while self.total_bytes > self.max_bytes and len(self._entries) > 1:
+                evicted, (_, _, evicted_bytes) = self._entries.popitem(last=False)
+                self.total_bytes -= evicted_bytes
+                logging.info(f"Evicted LSTM model for {evicted} from cache ({evicted_bytes} bytes).")
+
+    def get(self, ticker):
+        """
+        (model, pipeline) for ticker. Raises FileNotFoundError when either is
+        missing on disk.
+        """
+        path = lstm_model_path(ticker)
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            self.invalidate(ticker)
+            raise FileNotFoundError(f"LSTM model not found for ticker {ticker}. Need to train it.")
+
+        loaded = self._lookup(ticker, mtime)
+        if loaded is not None:
+            return loaded
+
+        # Only one thread per ticker pays for the load; the rest reuse its result
+        with self._load_lock(ticker):
+            loaded = self._lookup(ticker, mtime)
+            if loaded is not None:
+                return loaded
+            if not os.path.exists(pipeline_path(path)):
+                # Models from before the shared feature pipeline can't be fed correctly
+                raise FileNotFoundError(f"LSTM model not found for ticker {ticker} (no feature pipeline). Need to train it.")
+            logging.info(f"Loading LSTM model for {ticker} from {path}")
+            loaded = (load_numpy_model(path), FeaturePipeline.load(pipeline_path(path)))
+            self._store(ticker, loaded, mtime)
+            return loaded
+
+    def invalidate(self, ticker):
+        with self._lock:
+            entry = self._entries.pop(ticker, None)
+            if entry is not None:
+                self.total_bytes -= entry[2]
+
+    def warm_up(self, tickers):
+        for ticker in tickers:
+            try:
+                self.get(ticker)
+            except FileNotFoundError:
+                logging.warning(f"Skipping warm-up for {ticker}: no LSTM model on disk.")
+            except Exception as e:
+                logging.error(f"Failed to warm up LSTM model for {ticker}: {str(e)}")
+
+    def tickers(self):
+        with self._lock:
+            return list(self._entries.keys())
+
 
 class ModelUtils:
-    def __init__(self):
-        base_path = "/app/models"
-        fnn_path = os.path.join(base_path, "fnn_strategy.keras")
-        fnn_scaler_path = os.path.join(base_path, "fnn_scaler.pkl")
-        fnn_label_encoder_path = os.path.join(base_path, "fnn_label_encoder.pkl")
+    """
+    Per-process registry of the serving models. Nothing is loaded at
+    construction: LSTMs load per ticker through lstm_cache, and the FNN
+    strategy model (with its scaler and label encoder) loads once on first use.
+    """
 
-        self.fnn_model = load_model(fnn_path) if os.path.exists(fnn_path) else None
-        self.fnn_scaler = joblib.load(fnn_scaler_path) if os.path.exists(fnn_scaler_path) else None
-        self.fnn_label_encoder = joblib.load(fnn_label_encoder_path) if os.path.exists(fnn_label_encoder_path) else None
+    def __init__(self, base_path=MODELS_DIR):
+        self.fnn_path = os.path.join(base_path, "fnn_strategy.npz")
+        self.fnn_scaler_path = os.path.join(base_path, "fnn_scaler.pkl")
+        self.fnn_label_encoder_path = os.path.join(base_path, "fnn_label_encoder.pkl")
+        # Written by training runs from before the NumPy runtime; never served directly
+        self.fnn_keras_path = os.path.join(base_path, "fnn_strategy.keras")
+        self._fnn = None
+        self._reported_keras_only = False
+        self._fnn_lock = threading.Lock()
+        self.lstm_cache = LSTMModelCache()
+
+    def strategy_model(self):
+        """
+        (model, scaler, label_encoder) for the FNN, or None while any of the
+        files is missing. Missing files are re-checked on the next call so a
+        freshly trained model is picked up without a restart.
+        """
+        if self._fnn is not None:
+            return self._fnn
+        with self._fnn_lock:
+            if self._fnn is None:
+                paths = (self.fnn_path, self.fnn_scaler_path, self.fnn_label_encoder_path)
+                if not all(os.path.exists(path) for path in paths):
+                    if not os.path.exists(self.fnn_path) and os.path.exists(self.fnn_keras_path) and not self._reported_keras_only:
+                        self._reported_keras_only = True
+                        logging.error(
+                            f"Found {self.fnn_keras_path} but no {os.path.basename(self.fnn_path)}; strategies fall back to "
+                            f"'hold' until it is exported with: python models/convert_keras_models.py"
+                        )
+                    return None
+                logging.info(f"Loading FNN strategy model from {self.fnn_path}")
+                self._fnn = (load_numpy_model(self.fnn_path), joblib.load(self.fnn_scaler_path), joblib.load(self.fnn_label_encoder_path))
+            return self._fnn
 
     def load_lstm_model(self, ticker):
-        path = f"/app/models/lstm_option_pricing_{ticker}.h5"
-        if os.path.exists(path):
-            return load_model(path)
-        else:
-            # Raise an error if model doesn't exist
-            raise FileNotFoundError(f"LSTM model not found for ticker {ticker}. Need to train it.")
+        # Raises FileNotFoundError if the model doesn't exist
+        return self.lstm_cache.get(ticker)[0]
 
-    def predict_option_price(self, ticker, input_data):
-        # input_data is (1, time_steps, feature_count)
+    def load_lstm_pipeline(self, ticker):
+        # The feature pipeline the ticker's LSTM was trained with
+        return self.lstm_cache.get(ticker)[1]
+
+    def warm_up(self, tickers=None):
+        self.strategy_model()
+        self.lstm_cache.warm_up(PRELOAD_TICKERS if tickers is None else tickers)
+
+    def predict_option_prices(self, ticker, input_batch):
+        # input_batch is (batch, time_steps, feature_count); returns one prediction per row
         try:
-            lstm_model = self.load_lstm_model(ticker)
+            lstm_model, pipeline = self.lstm_cache.get(ticker)
         except FileNotFoundError as e:
             # Propagate this error up for handling in main.py
             raise ValueError(str(e))
-        prediction = lstm_model.predict(input_data)
-        return float(prediction[0][0])
+        pipeline.validate(input_batch)
+        prediction = lstm_model.predict_on_batch(input_batch)
+        return np.asarray(prediction)[:, 0]
+
+    def predict_option_price(self, ticker, input_data):
+        # input_data is (1, time_steps, feature_count)
+        return float(self.predict_option_prices(ticker, input_data)[0])
+
+    def strategy_probabilities(self, input_data):
+        """
+        Score every row of input_data (one per contract) in a single forward
+        pass and average the class probabilities over the chain. Returns
+        [(strategy, probability), ...] sorted best first, or None when the
+        strategy model is not trained.
+        """
+        fnn = self.strategy_model()
+        if fnn is None:
+            return None
+        model, scaler, label_encoder = fnn
+        scaled_data = scaler.transform(np.asarray(input_data, dtype=np.float64)).astype(np.float32)
+        probabilities = np.asarray(model.predict_on_batch(scaled_data)).mean(axis=0)
+        order = np.argsort(probabilities)[::-1]
+        strategies = label_encoder.inverse_transform(order)
+        return [(str(strategy), float(probabilities[i])) for strategy, i in zip(strategies, order)]
 
     def recommend_strategy(self, input_data):
-        if self.fnn_model is None or self.fnn_scaler is None or self.fnn_label_encoder is None:
+        ranked = self.strategy_probabilities(input_data)
+        if not ranked:
             # If strategy model not trained or missing
             return "hold"
-        scaled_data = self.fnn_scaler.transform(input_data)
-        preds = self.fnn_model.predict(scaled_data)
-        pred_class = np.argmax(preds, axis=1)[0]
-        strategy = self.fnn_label_encoder.inverse_transform([pred_class])[0]
-        return strategy
+        return ranked[0][0]
+
+
+# Shared by every module in the process so each model is loaded at most once per worker
+model_utils = ModelUtils()
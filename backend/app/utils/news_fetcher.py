@@ -1,12 +1,13 @@
 # backend/app/utils/news_fetcher.py
 
 import os
-import requests
+import httpx
 from fastapi import HTTPException
+from app.utils.http_client import upstream
 
 NEWSAPI_KEY = os.getenv("NEWSAPI_KEY")
 
-def fetch_top_business_news():
+async def fetch_top_business_news():
     if not NEWSAPI_KEY:
         raise HTTPException(status_code=500, detail="NEWSAPI_KEY not set.")
     url = "https://newsapi.org/v2/top-headlines"
@@ -16,7 +17,10 @@ def fetch_top_business_news():
         "apiKey": NEWSAPI_KEY,
         "pageSize": 5  # top 5 headlines
     }
-    r = requests.get(url, params=params)
+    try:
+        r = await upstream.get(url, params=params)
+    except httpx.HTTPError as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch news from NewsAPI: {str(e)}")
     if r.status_code != 200:
         raise HTTPException(status_code=500, detail="Failed to fetch news from NewsAPI.")
     data = r.json()
@@ -0,0 +1,164 @@
+# backend/app/utils/numpy_runtime.py
+
+import os
+import json
+import tempfile
+import numpy as np
+
+# Layers with no effect at inference time
+PASSTHROUGH_LAYERS = {"InputLayer", "Dropout"}
+
+
+def sigmoid(x):
+    return 0.5 * (np.tanh(0.5 * x) + 1.0)
+
+
+def softmax(x):
+    e = np.exp(x - x.max(axis=-1, keepdims=True))
+    return e / e.sum(axis=-1, keepdims=True)
+
+
+ACTIVATIONS = {
+    "linear": lambda x: x,
+    "relu": lambda x: np.maximum(x, 0.0),
+    "tanh": np.tanh,
+    "sigmoid": sigmoid,
+    "softmax": softmax,
+}
+
+
+def _activation(name):
+    if name not in ACTIVATIONS:
+        raise ValueError(f"Unsupported activation: {name}")
+    return ACTIVATIONS[name]
+
+
+def _lstm(x, kernel, recurrent_kernel, bias, activation, recurrent_activation, return_sequences):
+    # Gate order follows Keras: input, forget, cell, output
+    batch, steps, _ = x.shape
+    units = recurrent_kernel.shape[0]
+    act, rec_act = _activation(activation), _activation(recurrent_activation)
+    # Input projections for every timestep in one matmul; only h @ U stays in the loop
+    projected = x @ kernel + bias
+    h = np.zeros((batch, units), dtype=x.dtype)
+    c = np.zeros((batch, units), dtype=x.dtype)
+    outputs = []
+    for t in range(steps):
+        z = projected[:, t] + h @ recurrent_kernel
+        i = rec_act(z[:, :units])
+        f = rec_act(z[:, units:2 * units])
+        g = act(z[:, 2 * units:3 * units])
+        o = rec_act(z[:, 3 * units:])
+        c = f * c + i * g
+        h = o * act(c)
+        if return_sequences:
+            outputs.append(h)
+    return np.stack(outputs, axis=1) if return_sequences else h
+
+
+def layer_spec(class_name, config, weights):
+    """
+    Inference spec and float32 weights for one Keras layer, given its class
+    name, get_config() dict and get_weights() list. None for layers that are
+    no-ops at inference.
+    """
+    if class_name in PASSTHROUGH_LAYERS:
+        return None
+    if class_name == "Dense":
+        kernel = weights[0]
+        bias = weights[1] if len(weights) > 1 else np.zeros(kernel.shape[1])
+        spec = {"type": "dense", "activation": config.get("activation", "linear")}
+        return spec, [kernel, bias]
+    if class_name == "LSTM":
+        kernel, recurrent_kernel = weights[0], weights[1]
+        bias = weights[2] if len(weights) > 2 else np.zeros(kernel.shape[1])
+        spec = {
+            "type": "lstm",
+            "activation": config.get("activation", "tanh"),
+            "recurrent_activation": config.get("recurrent_activation", "sigmoid"),
+            "return_sequences": bool(config.get("return_sequences", False)),
+        }
+        return spec, [kernel, recurrent_kernel, bias]
+    raise ValueError(f"Unsupported layer for NumPy export: {class_name}")
+
+
+class NumpyModel:
+    """
+    Sequential stack of Dense and LSTM layers evaluated with NumPy in
+    float32. Stands in for a Keras model at serving time: predict_on_batch,
+    predict and get_weights behave the same for these layer types.
+    """
+
+    def __init__(self, specs, weights):
+        self.specs = specs
+        self.weights = [[np.ascontiguousarray(w, dtype=np.float32) for w in layer] for layer in weights]
+        for spec in specs:
+            _activation(spec["activation"])
+            if spec["type"] == "lstm":
+                _activation(spec["recurrent_activation"])
+
+    def predict_on_batch(self, x):
+        out = np.asarray(x, dtype=np.float32)
+        for spec, weights in zip(self.specs, self.weights):
+            if spec["type"] == "dense":
+                kernel, bias = weights
+                out = _activation(spec["activation"])(out @ kernel + bias)
+            else:
+                out = _lstm(out, *weights, spec["activation"], spec["recurrent_activation"], spec["return_sequences"])
+        return out
+
+    def predict(self, x, **kwargs):
+        return self.predict_on_batch(x)
+
+    def get_weights(self):
+        return [w for layer in self.weights for w in layer]
+
+    def save(self, path):
+        """
+        Write specs and weights to a .npz file, atomically replacing path.
+        """
+        arrays = {f"w{i}_{j}": w for i, layer in enumerate(self.weights) for j, w in enumerate(layer)}
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, specs=np.array(json.dumps(self.specs)), **arrays)
+            # mkstemp creates 0600 files; models are ordinary readable artifacts
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+
+def load_numpy_model(path):
+    with np.load(path, allow_pickle=False) as data:
+        specs = json.loads(str(data["specs"]))
+        weights = []
+        for i, _ in enumerate(specs):
+            count = sum(1 for name in data.files if name.startswith(f"w{i}_"))
+            weights.append([data[f"w{i}_{j}"] for j in range(count)])
+    return NumpyModel(specs, weights)
+
+
+def from_keras(model):
+    """
+    NumpyModel with the same weights as a trained Keras Sequential model.
+    """
+    specs, weights = [], []
+    for layer in model.layers:
+        converted = layer_spec(layer.__class__.__name__, layer.get_config(), layer.get_weights())
+        if converted is not None:
+            specs.append(converted[0])
+            weights.append(converted[1])
+    return NumpyModel(specs, weights)
+
+
+def export_keras_model(model, path):
+    """
+    Export a Keras model to path (.npz) for TensorFlow-free serving.
+    """
+    numpy_model = from_keras(model)
+    numpy_model.save(path)
+    return numpy_model
@@ -0,0 +1,142 @@
+# backend/app/utils/password_hasher.py
+
+import os
+import time
+import asyncio
+import logging
+import threading
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import numpy as np
+from passlib.context import CryptContext
+
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+# Hash jobs queued or running per API worker before new ones are turned away
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "16"))
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+class HasherSaturated(RuntimeError):
+    pass
+
+
+def _hash(password):
+    start = time.perf_counter()
+    hashed = pwd_context.hash(password)
+    return hashed, time.perf_counter() - start
+
+
+def _verify(password, hashed_password):
+    start = time.perf_counter()
+    valid = pwd_context.verify(password, hashed_password)
+    return valid, time.perf_counter() - start
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt in a small process pool so hashing never holds the API
+    worker's GIL. At most max_pending jobs are admitted at once; beyond that
+    hash() and verify() raise HasherSaturated immediately instead of queueing
+    without bound. The pool is started on first use.
+    """
+
+    def __init__(self, workers=PASSWORD_HASH_WORKERS, max_pending=PASSWORD_HASH_MAX_PENDING, samples=2048):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._pool = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._peak_pending = 0
+        self._completed = 0
+        self._rejected = 0
+        self._failed = 0
+        self._latencies = deque(maxlen=samples)  # (total, bcrypt) seconds per job
+
+    def _executor(self):
+        with self._lock:
+            if self._pool is None:
+                # spawn: children import only passlib, not a fork of the running server
+                context = multiprocessing.get_context("spawn")
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+                logging.info(f"Started password hashing pool with {self.workers} processes.")
+            return self._pool
+
+    def _admit(self):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._rejected += 1
+                raise HasherSaturated(f"Password hashing queue is full ({self.max_pending} pending).")
+            self._pending += 1
+            self._peak_pending = max(self._peak_pending, self._pending)
+
+    async def _run(self, fn, *args):
+        self._admit()
+        start = time.perf_counter()
+        try:
+            pool = self._executor()
+            try:
+                result, compute = await asyncio.get_running_loop().run_in_executor(pool, fn, *args)
+            except BrokenProcessPool:
+                # A killed child breaks the whole pool; replace it for the next caller
+                with self._lock:
+                    if self._pool is pool:
+                        self._pool = None
+                pool.shutdown(wait=False)
+                raise
+        except BaseException:
+            with self._lock:
+                self._pending -= 1
+                self._failed += 1
+            raise
+        with self._lock:
+            self._pending -= 1
+            self._completed += 1
+            self._latencies.append((time.perf_counter() - start, compute))
+        return result
+
+    async def hash(self, password):
+        return await self._run(_hash, password)
+
+    async def verify(self, password, hashed_password):
+        return await self._run(_verify, password, hashed_password)
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self):
+        with self._lock:
+            latencies = np.array(self._latencies) if self._latencies else np.zeros((1, 2))
+            total, compute = latencies[:, 0], latencies[:, 1]
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "pending": self._pending,
+                # Jobs waiting for a free process rather than running
+                "queue_depth": max(0, self._pending - self.workers),
+                "peak_pending": self._peak_pending,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "failed": self._failed,
+                "latency_ms": {
+                    "p50": 1000.0 * float(np.percentile(total, 50)),
+                    "p99": 1000.0 * float(np.percentile(total, 99)),
+                    "max": 1000.0 * float(total.max()),
+                },
+                "hash_ms": {
+                    "p50": 1000.0 * float(np.percentile(compute, 50)),
+                    "p99": 1000.0 * float(np.percentile(compute, 99)),
+                },
+                "queue_wait_ms": {
+                    "mean": 1000.0 * float((total - compute).mean()),
+                    "p99": 1000.0 * float(np.percentile(total - compute, 99)),
+                },
+            }
+
+
+password_hasher = PasswordHasher()
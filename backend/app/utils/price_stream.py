@@ -0,0 +1,154 @@
+# backend/app/utils/price_stream.py
+
+import os
+import json
+import time
+import random
+import asyncio
+import logging
+from app.utils import data_fetcher
+from app.utils.http_client import upstream
+
+PRICE_STREAM_INTERVAL_SECONDS = float(os.getenv("PRICE_STREAM_INTERVAL_SECONDS", "5"))
+
+
+class YahooPriceFeed:
+    """
+    Latest prices for many tickers in one multi-ticker Yahoo download.
+    Bypasses the quote cache so every poll sees fresh prices.
+    """
+
+    async def latest_prices(self, tickers):
+        return await upstream.run_yahoo(data_fetcher.fetch_latest_prices_yahoo, list(tickers))
+
+
+class FakePriceFeed:
+    """
+    Deterministic random-walk prices for tests and local development.
+    """
+
+    def __init__(self, start=100.0, volatility=0.001, seed=0):
+        self.start = start
+        self.volatility = volatility
+        self.prices = {}
+        self._rng = random.Random(seed)
+
+    async def latest_prices(self, tickers):
+        for ticker in tickers:
+            price = self.prices.get(ticker, self.start)
+            self.prices[ticker] = round(price * (1 + self._rng.gauss(0, self.volatility)), 4)
+        return {ticker: self.prices[ticker] for ticker in tickers}
+
+
+def price_message(ticker, price, previous):
+    return json.dumps({
+        "type": "price",
+        "ticker": ticker,
+        "price": price,
+        "change": None if previous is None else price - previous,
+        "timestamp": time.time(),
+    })
+
+
+class PriceStreamer:
+    """
+    One shared poller for every subscribed ticker.
+
+    Each interval it asks the feed for all tickers that currently have
+    subscribers (one upstream call), and hands a message to publish(ticker,
+    message) only for tickers whose price changed.
+    """
+
+    def __init__(self, feed, tickers, publish, interval=PRICE_STREAM_INTERVAL_SECONDS):
+        self.feed = feed
+        self.tickers = tickers  # callable returning the tickers to poll
+        self.publish = publish  # async callable(ticker, message)
+        self.interval = interval
+        self.last_prices = {}
+        self._task = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def poll_once(self):
+        tickers = sorted(self.tickers())
+        # Forget prices nobody listens to any more
+        for ticker in set(self.last_prices) - set(tickers):
+            del self.last_prices[ticker]
+        if not tickers:
+            return
+        prices = await self.feed.latest_prices(tickers)
+        for ticker, price in prices.items():
+            previous = self.last_prices.get(ticker)
+            if price == previous:
+                continue
+            self.last_prices[ticker] = price
+            await self.publish(ticker, price_message(ticker, price, previous))
+
+    async def _run(self):
+        while True:
+            try:
+                await self.poll_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"Price stream poll failed: {str(e)}")
+            await asyncio.sleep(self.interval)
+
+
+class InterestRegistry:
+    """
+    Union of subscribed tickers across workers, built from the "interest"
+    messages each worker publishes. Entries from workers that stopped
+    announcing expire after ttl seconds.
+    """
+
+    def __init__(self, ttl=30.0):
+        self.ttl = ttl
+        self._by_worker = {}  # worker id -> (tickers, last seen)
+
+    async def update(self, message):
+        data = json.loads(message)
+        self._by_worker[data["worker"]] = (set(data["tickers"]), time.monotonic())
+
+    def tickers(self):
+        cutoff = time.monotonic() - self.ttl
+        for worker, (_, seen) in list(self._by_worker.items()):
+            if seen < cutoff:
+                del self._by_worker[worker]
+        return set().union(*(tickers for tickers, _ in self._by_worker.values()))
+
+
+class PriceRelay:
+    """
+    Worker-side end of the price stream: delivers price messages from the
+    broker to this worker's subscribers and remembers the latest one per
+    ticker so new subscribers get an immediate snapshot.
+    """
+
+    def __init__(self, manager):
+        self.manager = manager
+        self.latest = {}
+
+    async def deliver(self, message):
+        ticker = json.loads(message)["ticker"]
+        self.latest[ticker] = message
+        await self.manager.publish(ticker, message)
+
+    def snapshot(self, ticker):
+        return self.latest.get(ticker)
+
+    def prune(self):
+        subscribed = self.manager.subscribed_tickers()
+        for ticker in set(self.latest) - subscribed:
+            del self.latest[ticker]
@@ -0,0 +1,253 @@
+# backend/app/utils/pubsub.py
+
+import os
+import json
+import fcntl
+import asyncio
+import logging
+
+PUBSUB_BACKEND = os.getenv("PUBSUB_BACKEND", "unix")
+PUBSUB_SOCKET = os.getenv("PUBSUB_SOCKET", "/tmp/options_pubsub.sock")
+PUBSUB_RECONNECT_SECONDS = float(os.getenv("PUBSUB_RECONNECT_SECONDS", "1"))
+# Largest frame (one JSON line) the socket readers accept; asyncio's default of 64 KiB is too small for broadcasts
+PUBSUB_MAX_FRAME_BYTES = int(os.getenv("PUBSUB_MAX_FRAME_BYTES", str(16 * 1024 * 1024)))
+# Hub side: frames queued per connected worker, and what to do when a worker stops reading
+# ("drop_oldest" discards its oldest queued frame, "disconnect" closes it)
+PUBSUB_PEER_QUEUE_SIZE = int(os.getenv("PUBSUB_PEER_QUEUE_SIZE", "1000"))
+PUBSUB_SLOW_PEER_POLICY = os.getenv("PUBSUB_SLOW_PEER_POLICY", "drop_oldest")
+PUBSUB_SEND_TIMEOUT_SECONDS = float(os.getenv("PUBSUB_SEND_TIMEOUT_SECONDS", "5"))
+
+
+class InMemoryBroker:
+    """
+    Single-process broker: publish() hands messages straight to local handlers.
+    This process is always the leader, so it runs the producers itself.
+    """
+
+    def __init__(self):
+        self.handlers = {}
+        self.is_leader = False
+        self._promotion_callbacks = []
+
+    def subscribe(self, channel, handler):
+        """
+        Register an async handler(message) for channel.
+        """
+        self.handlers.setdefault(channel, []).append(handler)
+
+    def on_promoted(self, callback):
+        """
+        Register an async callback run when this process becomes the leader.
+        """
+        self._promotion_callbacks.append(callback)
+
+    async def _promote(self):
+        self.is_leader = True
+        for callback in self._promotion_callbacks:
+            await callback()
+
+    async def _dispatch(self, channel, message):
+        for handler in self.handlers.get(channel, ()):
+            try:
+                await handler(message)
+            except Exception as e:
+                logging.error(f"Pub/sub handler for {channel} failed: {str(e)}")
+
+    async def publish(self, channel, message):
+        await self._dispatch(channel, message)
+
+    async def start(self):
+        await self._promote()
+
+    async def stop(self):
+        pass
+
+
+class _Peer:
+    def __init__(self, writer, queue_size):
+        self.writer = writer
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.task = None
+
+
+class UnixSocketBroker(InMemoryBroker):
+    """
+    Host-wide broker for several gunicorn workers over a Unix domain socket.
+
+    The worker that wins an flock on the socket path becomes the hub (and
+    the leader that runs producers); the others connect to it. Every message
+    is delivered locally and relayed through the hub to every other worker.
+    If the hub exits, its lock is released and a connected worker takes over.
+
+    The hub never waits on a worker's socket while relaying: each worker has
+    a bounded frame queue drained by its own writer task, with the same
+    drop-oldest / disconnect policy as the WebSocket ConnectionManager.
+    """
+
+    def __init__(self, path=PUBSUB_SOCKET, max_frame_bytes=PUBSUB_MAX_FRAME_BYTES,
+                 peer_queue_size=PUBSUB_PEER_QUEUE_SIZE, slow_peer_policy=PUBSUB_SLOW_PEER_POLICY,
+                 send_timeout=PUBSUB_SEND_TIMEOUT_SECONDS):
+        super().__init__()
+        self.path = path
+        self.max_frame_bytes = max_frame_bytes
+        self.peer_queue_size = peer_queue_size
+        self.slow_peer_policy = slow_peer_policy
+        self.send_timeout = send_timeout
+        self.dropped = 0
+        self.slow_disconnects = 0
+        self._lock_file = None
+        self._server = None
+        self._peers = {}  # hub side: StreamWriter -> _Peer for each connected worker
+        self._hub_writer = None  # worker side: connection to the hub
+        self._task = None
+
+    def _try_lock(self):
+        lock_file = open(f"{self.path}.lock", "w")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        return True
+
+    async def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self._server is not None:
+            self._server.close()
+        for peer in self._peers.values():
+            peer.task.cancel()
+        writers = list(self._peers) + ([self._hub_writer] if self._hub_writer is not None else [])
+        for writer in writers:
+            writer.close()
+        # Let peer handlers see EOF and exit before the loop shuts down
+        await asyncio.gather(*(writer.wait_closed() for writer in writers), return_exceptions=True)
+        await asyncio.sleep(0)
+        if self._lock_file is not None:
+            self._lock_file.close()
+
+    async def _run(self):
+        while True:
+            if self._try_lock():
+                await self._serve()
+                return
+            try:
+                reader, writer = await asyncio.open_unix_connection(self.path, limit=self.max_frame_bytes)
+            except OSError:
+                # Hub is starting up or just died; retry, possibly as the new hub
+                await asyncio.sleep(PUBSUB_RECONNECT_SECONDS)
+                continue
+            self._hub_writer = writer
+            logging.info(f"Pub/sub: connected to hub at {self.path} (pid {os.getpid()}).")
+            try:
+                await self._read_frames(reader)
+            finally:
+                self._hub_writer = None
+                writer.close()
+            logging.warning("Pub/sub: lost connection to hub, reconnecting.")
+
+    async def _serve(self):
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self._server = await asyncio.start_unix_server(self._handle_peer, path=self.path, limit=self.max_frame_bytes)
+        logging.info(f"Pub/sub: hub listening on {self.path} (pid {os.getpid()}).")
+        await self._promote()
+
+    async def _handle_peer(self, reader, writer):
+        peer = _Peer(writer, self.peer_queue_size)
+        peer.task = asyncio.get_running_loop().create_task(self._peer_writer(peer))
+        self._peers[writer] = peer
+        try:
+            await self._read_frames(reader, source=writer)
+        finally:
+            self._drop_peer(peer)
+
+    def _drop_peer(self, peer):
+        # Idempotent: both the reader and a failing writer task may call this
+        self._peers.pop(peer.writer, None)
+        if peer.task is not asyncio.current_task():
+            peer.task.cancel()
+        peer.writer.close()
+
+    async def _peer_writer(self, peer):
+        while True:
+            line = await peer.queue.get()
+            try:
+                peer.writer.write(line)
+                await asyncio.wait_for(peer.writer.drain(), self.send_timeout)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.warning(f"Pub/sub: dropping worker after failed send: {type(e).__name__}")
+                self._drop_peer(peer)
+                return
+
+    async def _read_frames(self, reader, source=None):
+        while True:
+            try:
+                line = await reader.readline()
+            except ValueError:
+                # Over the limit: the reader discards it and the rest of the frame fails to parse below
+                logging.error(f"Pub/sub: dropped a frame larger than {self.max_frame_bytes} bytes.")
+                continue
+            if not line:
+                return
+            try:
+                frame = json.loads(line)
+                channel, message = frame["c"], frame["m"]
+            except (ValueError, KeyError, TypeError):
+                continue
+            if source is not None:
+                # Hub: relay to every other worker
+                await self._relay(line, exclude=source)
+            await self._dispatch(channel, message)
+
+    async def _relay(self, line, exclude=None):
+        for writer, peer in list(self._peers.items()):
+            if writer is not exclude:
+                self._enqueue(peer, line)
+
+    def _enqueue(self, peer, line):
+        try:
+            peer.queue.put_nowait(line)
+            return
+        except asyncio.QueueFull:
+            pass
+        if self.slow_peer_policy == "disconnect":
+            self.slow_disconnects += 1
+            logging.warning("Pub/sub: disconnecting a worker that stopped reading.")
+            self._drop_peer(peer)
+            return
+        peer.queue.get_nowait()
+        peer.queue.put_nowait(line)
+        self.dropped += 1
+
+    async def publish(self, channel, message):
+        line = (json.dumps({"c": channel, "m": message}) + "\n").encode()
+        if len(line) > self.max_frame_bytes:
+            logging.error(f"Pub/sub: {channel} message of {len(line)} bytes is over the frame limit; delivered locally only.")
+        elif self._server is not None:
+            await self._relay(line)
+        elif self._hub_writer is not None:
+            try:
+                self._hub_writer.write(line)
+                await self._hub_writer.drain()
+            except (ConnectionError, RuntimeError) as e:
+                logging.warning(f"Pub/sub: publish to hub failed: {str(e)}")
+        await self._dispatch(channel, message)
+
+
+def create_broker(backend=PUBSUB_BACKEND):
+    if backend == "memory":
+        return InMemoryBroker()
+    if backend == "unix":
+        return UnixSocketBroker()
+    raise ValueError(f"Unknown PUBSUB_BACKEND: {backend}")
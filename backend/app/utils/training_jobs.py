@@ -0,0 +1,197 @@
+# backend/app/utils/training_jobs.py
+
+import os
+import sys
+import uuid
+import sqlite3
+import asyncio
+import logging
+from contextlib import closing
+from datetime import datetime, timedelta
+from fastapi.concurrency import run_in_threadpool
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+TRAINING_JOBS_DB = os.getenv("TRAINING_JOBS_DB", "/app/data/training_jobs.db")
+TRAINING_CONCURRENCY = int(os.getenv("TRAINING_CONCURRENCY", "1"))
+TRAINING_TIMEOUT_SECONDS = int(os.getenv("TRAINING_TIMEOUT_SECONDS", "3600"))
+# After a failed job, requests for the ticker get that job back instead of a new one until this passes
+TRAINING_RETRY_COOLDOWN_SECONDS = int(os.getenv("TRAINING_RETRY_COOLDOWN_SECONDS", "900"))
+LSTM_TRAINING_SCRIPT = os.path.join(BACKEND_DIR, "models", "train_lstm_option_pricing.py")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS training_jobs (
+    id TEXT PRIMARY KEY,
+    ticker TEXT NOT NULL,
+    status TEXT NOT NULL,
+    owner_pid INTEGER,
+    created_at TEXT NOT NULL,
+    started_at TEXT,
+    finished_at TEXT,
+    error TEXT
+);
+-- At most one queued/running job per ticker across every worker on the host
+CREATE UNIQUE INDEX IF NOT EXISTS ix_training_jobs_active_ticker
+    ON training_jobs (ticker) WHERE status IN ('queued', 'running');
+"""
+
+COLUMNS = ("id", "ticker", "status", "owner_pid", "created_at", "started_at", "finished_at", "error")
+
+# Error recorded for jobs orphaned by a dead worker; those are retried immediately
+OWNER_EXITED = "Owner process exited."
+
+
+def _now():
+    return datetime.utcnow().isoformat()
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class TrainingJobQueue:
+    """
+    SQLite-backed queue of LSTM training jobs, shared by all gunicorn workers.
+
+    enqueue() returns the active job for a ticker if there is one, or its
+    last failed job during the retry cool-down, otherwise records a new job
+    and trains it in a background subprocess owned by this worker.
+    on_complete(job) is awaited when a job finishes. SQLite calls made from
+    the event loop run in the threadpool.
+    """
+
+    def __init__(self, db_path=TRAINING_JOBS_DB, concurrency=TRAINING_CONCURRENCY, on_complete=None,
+                 retry_cooldown=TRAINING_RETRY_COOLDOWN_SECONDS):
+        self.db_path = db_path
+        self.on_complete = on_complete
+        self.retry_cooldown = retry_cooldown
+        self._slots = asyncio.Semaphore(concurrency)
+        self._tasks = set()
+        self._initialized = False
+
+    def _connect(self):
+        if not self._initialized:
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=10, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        if not self._initialized:
+            conn.executescript(SCHEMA)
+            self._initialized = True
+        return conn
+
+    def get(self, job_id):
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT * FROM training_jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    def active_job(self, ticker):
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT * FROM training_jobs WHERE ticker = ? AND status IN ('queued', 'running')", (ticker,)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def recent_failure(self, ticker):
+        """
+        Latest job for ticker that failed within the retry cool-down, or None.
+        """
+        since = (datetime.utcnow() - timedelta(seconds=self.retry_cooldown)).isoformat()
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT * FROM training_jobs WHERE ticker = ? AND status = 'failed' AND finished_at >= ? "
+                "AND (error IS NULL OR error != ?) ORDER BY finished_at DESC LIMIT 1",
+                (ticker, since, OWNER_EXITED)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def retry_after(self, job):
+        """
+        Seconds until a failed job's cool-down ends.
+        """
+        finished = datetime.fromisoformat(job["finished_at"])
+        return max(0, int((finished + timedelta(seconds=self.retry_cooldown) - datetime.utcnow()).total_seconds()) + 1)
+
+    def _update(self, job_id, **fields):
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with closing(self._connect()) as conn:
+            conn.execute(f"UPDATE training_jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+
+    def _insert(self, ticker):
+        job = dict(zip(COLUMNS, (uuid.uuid4().hex, ticker, "queued", os.getpid(), _now(), None, None, None)))
+        with closing(self._connect()) as conn:
+            conn.execute(
+                f"INSERT INTO training_jobs ({', '.join(COLUMNS)}) VALUES ({', '.join('?' for _ in COLUMNS)})",
+                tuple(job.values())
+            )
+        return job
+
+    def _claim(self, ticker):
+        # (job, created): the job to report for ticker and whether this call inserted it
+        existing = self.active_job(ticker)
+        if existing and not _pid_alive(existing["owner_pid"]):
+            # The worker that owned this job died; let a new one take over
+            self._update(existing["id"], status="failed", finished_at=_now(), error=OWNER_EXITED)
+            existing = None
+        if existing:
+            return existing, False
+        failed = self.recent_failure(ticker)
+        if failed:
+            return failed, False
+        try:
+            return self._insert(ticker), True
+        except sqlite3.IntegrityError:
+            return self.active_job(ticker), False
+
+    async def enqueue(self, ticker):
+        """
+        Active job for ticker, its recently failed job (status 'failed') while
+        the retry cool-down runs, or a newly started one. Safe to call from
+        several workers at once: the unique index lets exactly one insert win.
+        """
+        ticker = ticker.upper()
+        job, created = await run_in_threadpool(self._claim, ticker)
+        if not created:
+            return job
+
+        task = asyncio.get_running_loop().create_task(self._run(job))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        logging.info(f"Queued LSTM training job {job['id']} for {ticker}.")
+        return job
+
+    async def _run(self, job):
+        async with self._slots:
+            await run_in_threadpool(self._update, job["id"], status="running", started_at=_now())
+            logging.info(f"Training LSTM model for {job['ticker']} (job {job['id']}).")
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    sys.executable, LSTM_TRAINING_SCRIPT, job["ticker"],
+                    cwd=BACKEND_DIR,
+                    stdout=asyncio.subprocess.DEVNULL,
+                    stderr=asyncio.subprocess.PIPE
+                )
+                try:
+                    _, stderr = await asyncio.wait_for(process.communicate(), TRAINING_TIMEOUT_SECONDS)
+                except asyncio.TimeoutError:
+                    process.kill()
+                    await process.wait()
+                    raise RuntimeError(f"Training timed out after {TRAINING_TIMEOUT_SECONDS}s.")
+                if process.returncode != 0:
+                    tail = stderr.decode(errors="replace").strip().splitlines()[-1:] or [""]
+                    raise RuntimeError(f"Training exited with code {process.returncode}: {tail[0]}")
+                await run_in_threadpool(self._update, job["id"], status="succeeded", finished_at=_now())
+                logging.info(f"LSTM model trained successfully for {job['ticker']}.")
+            except Exception as e:
+                await run_in_threadpool(self._update, job["id"], status="failed", finished_at=_now(), error=str(e))
+                logging.error(f"Failed to train LSTM model for {job['ticker']}: {str(e)}")
+
+        if self.on_complete is not None:
+            try:
+                await self.on_complete(await run_in_threadpool(self.get, job["id"]))
+            except Exception as e:
+                logging.error(f"Training completion callback failed for job {job['id']}: {str(e)}")
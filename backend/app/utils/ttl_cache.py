@@ -0,0 +1,123 @@
+# backend/app/utils/ttl_cache.py
+
+import time
+import asyncio
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+
+class TTLCache:
+    """
+    Size-bounded LRU cache whose entries expire individually.
+
+    get_or_load() is single-flight: when several threads miss on the same key
+    at once, only the first one calls the loader and the others wait for its
+    result (or its exception). aget_or_load() does the same for coroutines
+    on the event loop.
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (value, expires_at)
+        self._inflight = {}  # key -> Future
+        self._ainflight = {}  # key -> asyncio.Task
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            return self._get_locked(key)
+
+    def _get_locked(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key, value, ttl):
+        """
+        Store value for ttl seconds (a number, or a callable returning one).
+        """
+        if callable(ttl):
+            ttl = ttl()
+        with self._lock:
+            self._entries[key] = (value, time.time() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_load(self, key, loader, ttl):
+        with self._lock:
+            value = self._get_locked(key)
+            if value is not None:
+                self.hits += 1
+                return value
+            self.misses += 1
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+
+        if not owner:
+            return future.result()
+
+        try:
+            value = loader()
+            self.set(key, value, ttl)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    async def aget_or_load(self, key, loader, ttl):
+        """
+        Async variant of get_or_load; loader is a zero-argument coroutine function.
+        """
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+        self.misses += 1
+        task = self._ainflight.get(key)
+        if task is None:
+            # The load runs in its own task, so no caller owns it: cancelling
+            # any waiter (the first one included) never cancels the shared load
+            task = self._ainflight[key] = asyncio.get_running_loop().create_task(self._aload(key, loader, ttl))
+            task.add_done_callback(self._aload_done)
+        return await asyncio.shield(task)
+
+    async def _aload(self, key, loader, ttl):
+        try:
+            value = await loader()
+            self.set(key, value, ttl)
+            return value
+        finally:
+            self._ainflight.pop(key, None)
+
+    @staticmethod
+    def _aload_done(task):
+        # Mark retrieved so a failure nobody is still waiting on doesn't log a warning
+        if not task.cancelled():
+            task.exception()
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,105 @@
+# backend/app/vol_surface.py
+
+import os
+import numpy as np
+import pandas as pd
+from app.utils import data_fetcher
+from app.utils.ttl_cache import TTLCache
+
+SURFACE_TTL_SECONDS = int(os.getenv("SURFACE_TTL_SECONDS", "300"))
+
+surface_cache = TTLCache(max_entries=data_fetcher.DATA_CACHE_MAX_ENTRIES)
+
+
+class VolatilitySurface:
+    """
+    Implied-volatility surface built from a multi-expiration chain.
+
+    Each expiration contributes one smile: out-of-the-money calls above spot
+    and out-of-the-money puts below it (their quotes are the most liquid).
+    Queries interpolate linearly in strike within a smile (flat beyond the
+    listed strikes) and linearly in total variance iv^2 * T between smiles,
+    with flat volatility outside the listed expirations.
+    """
+
+    def __init__(self, spot, expiries, smiles):
+        self.spot = spot
+        self.expiries = np.asarray(expiries, dtype=np.float64)  # sorted T in years
+        self.smiles = smiles  # list of (strikes, ivs), one per expiry
+
+    @classmethod
+    def from_chain(cls, chain: pd.DataFrame, spot: float, min_iv=1e-3, max_iv=5.0):
+        usable = chain[
+            np.isfinite(chain['impliedVolatility'])
+            & (chain['impliedVolatility'] > min_iv)
+            & (chain['impliedVolatility'] < max_iv)
+            & (chain['T'] > 0)
+        ]
+        otm = np.where(usable['option_type'] == 'call', usable['strike'] >= spot, usable['strike'] < spot)
+        usable = usable[otm]
+
+        expiries = []
+        smiles = []
+        for T, smile in usable.groupby('T', sort=True):
+            smile = smile.groupby('strike', sort=True)['impliedVolatility'].mean()
+            if len(smile) == 0:
+                continue
+            expiries.append(T)
+            smiles.append((smile.index.to_numpy(dtype=np.float64), smile.to_numpy(dtype=np.float64)))
+        if not smiles:
+            raise ValueError("No usable implied volatilities to build a surface.")
+        return cls(spot, expiries, smiles)
+
+    def implied_volatility(self, strike, T):
+        """
+        Interpolated IV for arrays (or scalars) of strike and T in years.
+        """
+        strike, T = np.broadcast_arrays(np.asarray(strike, dtype=np.float64), np.asarray(T, dtype=np.float64))
+        # Vol of every smile at every queried strike: (n_expiries, *strike.shape)
+        slice_vols = np.stack([np.interp(strike, strikes, ivs) for strikes, ivs in self.smiles])
+        if len(self.expiries) == 1:
+            return slice_vols[0]
+
+        T_clipped = np.clip(T, self.expiries[0], self.expiries[-1])
+        upper = np.clip(np.searchsorted(self.expiries, T_clipped, side='left'), 1, len(self.expiries) - 1)
+        lower = upper - 1
+        T0 = self.expiries[lower]
+        T1 = self.expiries[upper]
+        v0 = np.take_along_axis(slice_vols, lower[None, ...], axis=0)[0]
+        v1 = np.take_along_axis(slice_vols, upper[None, ...], axis=0)[0]
+        weight = (T_clipped - T0) / (T1 - T0)
+        total_variance = (1 - weight) * v0 * v0 * T0 + weight * v1 * v1 * T1
+        return np.sqrt(total_variance / T_clipped)
+
+    def grid(self, strikes=None, expiries=None):
+        """
+        Surface sampled on a strike x expiry grid (defaults to the listed ones).
+        """
+        if strikes is None:
+            strikes = np.unique(np.concatenate([s for s, _ in self.smiles]))
+        if expiries is None:
+            expiries = self.expiries
+        K, T = np.meshgrid(np.asarray(strikes, dtype=np.float64), np.asarray(expiries, dtype=np.float64))
+        return {
+            "strikes": K[0].tolist(),
+            "expiries": T[:, 0].tolist(),
+            "implied_volatility": self.implied_volatility(K, T).tolist(),
+        }
+
+
+async def get_volatility_surface(ticker: str) -> VolatilitySurface:
+    """
+    Cached surface per ticker; rebuilt at most once per SURFACE_TTL_SECONDS.
+    """
+    ticker = ticker.upper()
+
+    async def build():
+        chain = await data_fetcher.fetch_option_chains(ticker)
+        price_data = await data_fetcher.fetch_historical_data(ticker)
+        return VolatilitySurface.from_chain(chain, float(price_data['Close'].iloc[-1]))
+
+    return await surface_cache.aget_or_load(
+        ticker,
+        build,
+        lambda: data_fetcher.market_aware_ttl(SURFACE_TTL_SECONDS)
+    )
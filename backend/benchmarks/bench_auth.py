@@ -0,0 +1,69 @@
+# backend/benchmarks/bench_auth.py
+#
+# Per-request cost of resolving the bearer token to a user: the original
+# dependency (JWT decode + session + user query, run in the threadpool like
+# any sync dependency) against the cached get_current_identity.
+# Usage: python benchmarks/bench_auth.py [REQUESTS]
+
+import os
+import sys
+import time
+import asyncio
+import tempfile
+from datetime import timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench_auth.db"
+
+from fastapi.concurrency import run_in_threadpool
+
+from app import auth, schemas
+from app.database import Base, SessionLocal, engine
+
+
+def uncached_user(token):
+    # get_current_user as it was before the token cache
+    username, _ = auth.decode_token(token)
+    db = SessionLocal()
+    try:
+        return auth.get_user(db, username)
+    finally:
+        db.close()
+
+
+async def per_request_us(resolve, token, requests):
+    await resolve(token)
+    start = time.perf_counter()
+    for _ in range(requests):
+        await resolve(token)
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+async def run(requests):
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    await auth.create_user(db, schemas.UserCreate(username="bench", password="bench-password"))
+    db.close()
+    token = auth.create_access_token({"sub": "bench"}, timedelta(minutes=auth.ACCESS_TOKEN_EXPIRE_MINUTES))
+
+    async def before(token):
+        return await run_in_threadpool(uncached_user, token)
+
+    async def miss(token):
+        auth.token_cache.clear()
+        return await auth.get_current_identity(token)
+
+    results = [
+        ("uncached (before)", await per_request_us(before, token, requests)),
+        ("cache miss", await per_request_us(miss, token, requests)),
+        ("cache hit (after)", await per_request_us(auth.get_current_identity, token, requests)),
+    ]
+    for name, us in results:
+        print(f"{name:<18} {us:9.1f} us/request")
+    print(f"speedup on hit: {results[0][1] / results[2][1]:.0f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(run(int(sys.argv[1]) if len(sys.argv) > 1 else 2000))
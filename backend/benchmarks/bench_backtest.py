@@ -0,0 +1,43 @@
+# backend/benchmarks/bench_backtest.py
+#
+# Throughput of the vectorized strategy backtester on a synthetic price history.
+# Usage: python benchmarks/bench_backtest.py [DAYS] [REPEATS]
+
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.backtest import backtest
+
+HOLDING_DAYS = (5, 10, 21, 42)
+WIDTHS = (0.02, 0.035, 0.05, 0.075, 0.1)
+
+
+def synthetic_closes(days, spot=100.0, seed=0):
+    rng = np.random.default_rng(seed)
+    return spot * np.exp(np.cumsum(rng.normal(0.0003, 0.015, days)))
+
+
+def main(days=504, repeats=5):
+    closes = synthetic_closes(days)
+    results = backtest(closes, HOLDING_DAYS, WIDTHS)  # warm-up
+    combos = int(results['trades'].sum())
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        backtest(closes, HOLDING_DAYS, WIDTHS)
+        timings.append(time.perf_counter() - start)
+    best = min(timings)
+    median = float(np.median(timings))
+    print(f"days={days} strategy/date/parameter combinations={combos} repeats={repeats}")
+    print(f"best   {best * 1000:8.2f} ms  {combos / best:14,.0f} trades/s")
+    print(f"median {median * 1000:8.2f} ms  {combos / median:14,.0f} trades/s")
+
+
+if __name__ == "__main__":
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else 504
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    main(days, repeats)
@@ -0,0 +1,42 @@
+# backend/benchmarks/bench_implied_volatility.py
+#
+# Speed and accuracy of the vectorized implied-volatility solver.
+# Usage: python benchmarks/bench_implied_volatility.py [CONTRACTS] [REPEATS]
+
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.pricing import black_scholes, implied_volatility
+
+
+def main(contracts=50_000, repeats=10, spot=100.0, seed=0):
+    rng = np.random.default_rng(seed)
+    strikes = spot * rng.uniform(0.5, 1.5, contracts)
+    T = rng.uniform(2 / 365, 2.0, contracts)
+    true_sigma = rng.uniform(0.05, 1.5, contracts)
+    is_call = rng.random(contracts) < 0.5
+    prices = black_scholes(spot, strikes, T, true_sigma, is_call)['price']
+
+    implied_volatility(prices, spot, strikes, T, is_call)  # warm-up
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        iv = implied_volatility(prices, spot, strikes, T, is_call)
+        timings.append(time.perf_counter() - start)
+
+    solved = np.isfinite(iv)
+    repriced = black_scholes(spot, strikes, T, np.where(solved, iv, 0.2), is_call)['price']
+    best = min(timings)
+    print(f"contracts={contracts} repeats={repeats}")
+    print(f"best {best * 1000:.2f} ms  {contracts / best:,.0f} contracts/s")
+    print(f"solved {solved.mean():.2%}  max repricing error {np.max(np.abs(repriced - prices)[solved]):.2e}")
+
+
+if __name__ == "__main__":
+    contracts = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    main(contracts, repeats)
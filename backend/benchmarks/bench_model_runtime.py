@@ -0,0 +1,117 @@
+# backend/benchmarks/bench_model_runtime.py
+#
+# NumPy serving runtime vs the Keras path it replaced: cold start (fresh
+# interpreter: import, load the model, one prediction), peak RSS of that
+# process, and per-call latency. The Keras column is skipped when TensorFlow
+# is not installed.
+# Usage: python benchmarks/bench_model_runtime.py [MODEL.h5] [REPEATS]
+# MODEL.h5 needs its .npz export alongside. With no argument an untrained LSTM
+# with the serving pipeline's input shape is built and exported.
+
+import os
+import sys
+import time
+import tempfile
+import subprocess
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from app.utils.numpy_runtime import NumpyModel, load_numpy_model, export_keras_model
+from app.features import FeaturePipeline
+
+COLD_START = {
+    "numpy": (
+        "from app.utils.numpy_runtime import load_numpy_model\n"
+        "model = load_numpy_model({npz!r})\n"
+    ),
+    "keras": (
+        "from tensorflow.keras.models import load_model\n"
+        "model = load_model({h5!r}, compile=False)\n"
+    ),
+}
+# VmHWM (peak RSS since exec); ru_maxrss would also count the forked parent
+COLD_START_TAIL = (
+    "import numpy as np\n"
+    "model.predict_on_batch(np.zeros({shape!r}, dtype=np.float32))\n"
+    "print([line.split()[1] for line in open('/proc/self/status') if line.startswith('VmHWM')][0])\n"
+)
+
+
+def cold_start(runtime, h5, npz, shape):
+    code = COLD_START[runtime].format(h5=h5, npz=npz) + COLD_START_TAIL.format(shape=shape)
+    env = dict(os.environ, TF_CPP_MIN_LOG_LEVEL="3")
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR, env=env, capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0:
+        return None
+    return elapsed, int(result.stdout.strip().splitlines()[-1]) / 1024.0
+
+
+def latency(model, shape, repeats):
+    x = np.random.default_rng(0).random(shape, dtype=np.float32)
+    model.predict_on_batch(x)  # warm-up
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model.predict_on_batch(x)
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings)) * 1000
+
+
+def build_model(directory):
+    # Same architecture as train_lstm_option_pricing.py, untrained
+    h5 = os.path.join(directory, "lstm_bench.h5")
+    window, features = FeaturePipeline().input_shape
+    try:
+        from tensorflow.keras.models import Sequential
+        from tensorflow.keras.layers import LSTM, Dense, Input
+    except ImportError:
+        rng = np.random.default_rng(0)
+        specs = [
+            {"type": "lstm", "activation": "tanh", "recurrent_activation": "sigmoid", "return_sequences": False},
+            {"type": "dense", "activation": "linear"},
+        ]
+        weights = [
+            [rng.normal(0, 0.1, (features, 200)), rng.normal(0, 0.1, (50, 200)), np.zeros(200)],
+            [rng.normal(0, 0.1, (50, 1)), np.zeros(1)],
+        ]
+        NumpyModel(specs, weights).save(os.path.splitext(h5)[0] + ".npz")
+        return h5
+    model = Sequential([Input(shape=(window, features)), LSTM(50), Dense(1)])
+    model.save(h5)
+    export_keras_model(model, os.path.splitext(h5)[0] + ".npz")
+    return h5
+
+
+def main(h5=None, repeats=200):
+    os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "3")
+    if h5 is None:
+        h5 = build_model(tempfile.mkdtemp())
+    npz = os.path.splitext(h5)[0] + ".npz"
+    numpy_model = load_numpy_model(npz)
+    input_dim = numpy_model.weights[0][0].shape[0]
+    window = FeaturePipeline().window
+    models = {"numpy": numpy_model}
+    try:
+        from tensorflow.keras.models import load_model
+        models["keras"] = load_model(h5, compile=False)
+    except ImportError:
+        print("TensorFlow not installed: Keras column skipped.")
+
+    print(f"model={os.path.basename(h5)} repeats={repeats}")
+    print(f"{'runtime':8} {'cold start':>12} {'peak RSS':>10} {'batch=1':>10} {'batch=64':>10}")
+    for runtime, model in models.items():
+        cold = cold_start(runtime, h5, npz, (1, window, input_dim))
+        cold_text = f"{cold[0]:10.2f} s {cold[1]:7.0f} MB" if cold else f"{'failed':>12} {'':>10}"
+        single = latency(model, (1, window, input_dim), repeats)
+        batch = latency(model, (64, window, input_dim), repeats)
+        print(f"{runtime:8} {cold_text} {single:7.3f} ms {batch:7.3f} ms")
+
+
+if __name__ == "__main__":
+    h5 = sys.argv[1] if len(sys.argv) > 1 else None
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    main(h5, repeats)
@@ -0,0 +1,52 @@
+# backend/benchmarks/bench_portfolio_risk.py
+#
+# Latency of the portfolio risk engine (historical + Monte Carlo VaR/CVaR,
+# Sharpe, Greeks) against its target. Exits non-zero when the median misses it.
+# Usage: python benchmarks/bench_portfolio_risk.py [HOLDINGS] [PATHS] [TARGET_MS]
+
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.risk import compute_risk
+
+
+def synthetic_closes(holdings, days=504, seed=0):
+    rng = np.random.default_rng(seed)
+    # One common market factor plus idiosyncratic noise, so the covariance is realistic
+    market = rng.normal(0.0003, 0.01, (days, 1))
+    returns = market * rng.uniform(0.5, 1.5, holdings) + rng.normal(0.0, 0.012, (days, holdings))
+    closes = 100.0 * np.exp(np.cumsum(returns, axis=0))
+    dates = pd.bdate_range(end="2024-12-31", periods=days)
+    return pd.DataFrame(closes, index=dates, columns=[f"T{i:03d}" for i in range(holdings)])
+
+
+def main(holdings=50, paths=100_000, target_ms=200.0, repeats=10):
+    closes = synthetic_closes(holdings)
+    quantities = np.random.default_rng(1).integers(1, 500, holdings)
+    compute_risk(closes, quantities, paths=paths, seed=0)  # warm-up
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        metrics = compute_risk(closes, quantities, paths=paths, seed=0)
+        timings.append(time.perf_counter() - start)
+    best = min(timings) * 1000
+    median = float(np.median(timings)) * 1000
+    print(f"holdings={holdings} paths={paths} repeats={repeats}")
+    print(f"value={metrics['portfolio_value']:,.0f} var={metrics['var']:,.0f} cvar={metrics['cvar']:,.0f}")
+    print(f"best   {best:8.2f} ms")
+    print(f"median {median:8.2f} ms  (target {target_ms:.0f} ms)")
+    if median > target_ms:
+        print("FAIL: median latency above target")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    holdings = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    paths = int(sys.argv[2]) if len(sys.argv) > 2 else 100_000
+    target_ms = float(sys.argv[3]) if len(sys.argv) > 3 else 200.0
+    main(holdings, paths, target_ms)
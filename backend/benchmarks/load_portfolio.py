@@ -0,0 +1,96 @@
+# backend/benchmarks/load_portfolio.py
+#
+# Load test for GET /portfolio: concurrent users, each with its own token and
+# portfolio, hammer the endpoint in-process for a fixed time. The quote
+# request is replaced by a fixed delay so the database path (pool, session
+# handling, holdings load) is what's measured. Pool and SQLite settings come
+# from the usual DB_* / SQLITE_* variables.
+# Usage: python benchmarks/load_portfolio.py [USERS] [HOLDINGS] [SECONDS] [QUOTE_MS]
+
+import os
+import sys
+import time
+import asyncio
+import logging
+import tempfile
+import numpy as np
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/load_portfolio.db")
+
+from app import models
+from app.auth import create_access_token
+from app.database import Base, SessionLocal, engine
+from app.main import app
+from app.utils import data_fetcher
+
+# Per-request INFO lines would dominate the measurement
+logging.getLogger().setLevel(logging.WARNING)
+
+TICKERS = ["AAPL", "MSFT", "GOOG", "AMZN", "NVDA", "META", "TSLA", "JPM", "V", "XOM"]
+
+
+def seed(users, holdings):
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        for i in range(users):
+            user = models.User(username=f"load{i}", hashed_password="x")
+            db.add(user)
+            db.flush()
+            portfolio = models.Portfolio(name="main", user_id=user.id)
+            db.add(portfolio)
+            db.flush()
+            db.add_all(
+                models.Holding(ticker=TICKERS[j % len(TICKERS)], quantity=10, purchase_price=100.0, portfolio_id=portfolio.id)
+                for j in range(holdings)
+            )
+        db.commit()
+    finally:
+        db.close()
+    return [create_access_token({"sub": f"load{i}"}) for i in range(users)]
+
+
+async def run(tokens, seconds, quote_ms):
+    async def quotes(tickers):
+        await asyncio.sleep(quote_ms / 1000.0)
+        return {ticker: 101.0 for ticker in tickers}
+    data_fetcher.fetch_latest_prices = quotes
+
+    latencies, errors = [], 0
+    stop = time.perf_counter() + seconds
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://load", timeout=60) as client:
+        async def user(token):
+            nonlocal errors
+            headers = {"Authorization": f"Bearer {token}"}
+            while time.perf_counter() < stop:
+                start = time.perf_counter()
+                response = await client.get("/portfolio", headers=headers)
+                if response.status_code != 200:
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+        await asyncio.gather(*(user(token) for token in tokens))
+    return np.array(latencies) * 1000.0, errors
+
+
+def main(users=50, holdings=20, seconds=10.0, quote_ms=50.0):
+    tokens = seed(users, holdings)
+    print(f"{engine.url.render_as_string(hide_password=True)}: {users} users x {holdings} holdings, quotes {quote_ms:.0f} ms, {seconds:.0f}s")
+    latencies, errors = asyncio.run(run(tokens, seconds, quote_ms))
+    print(f"{len(latencies) / seconds:.0f} reads/s  p50 {np.percentile(latencies, 50):.1f} ms  "
+          f"p99 {np.percentile(latencies, 99):.1f} ms  errors {errors}")
+    print(f"pool: {engine.pool.status()}")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(
+        int(args[0]) if len(args) > 0 else 50,
+        int(args[1]) if len(args) > 1 else 20,
+        float(args[2]) if len(args) > 2 else 10.0,
+        float(args[3]) if len(args) > 3 else 50.0,
+    )
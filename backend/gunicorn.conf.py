@@ -0,0 +1,13 @@
+# backend/gunicorn.conf.py
+
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", "4"))
+worker_class = "uvicorn.workers.UvicornWorker"
+
+
+def on_starting(server):
+    # Runs once in the master before any worker is forked
+    from app.database import init_db
+    init_db()
@@ -0,0 +1,55 @@
+# backend/models/convert_keras_models.py
+#
+# One-off conversion of Keras artifacts from before the NumPy runtime: every
+# fnn_strategy.keras / lstm_option_pricing_<TICKER>.h5 in the models directory
+# without a matching .npz is exported next to it, so the API (which never
+# imports TensorFlow) can serve it. LSTMs saved without a feature pipeline
+# still need retraining after conversion.
+# Usage: python models/convert_keras_models.py [--force] [--models-dir DIR]
+
+import os
+import sys
+import glob
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.features import pipeline_path
+from app.utils.numpy_runtime import export_keras_model
+
+
+def keras_artifacts(models_dir):
+    """
+    (keras_path, npz_path) for every Keras model in models_dir.
+    """
+    candidates = [os.path.join(models_dir, "fnn_strategy.keras")]
+    candidates += sorted(glob.glob(os.path.join(models_dir, "lstm_option_pricing_*.h5")))
+    return [(path, os.path.splitext(path)[0] + ".npz") for path in candidates if os.path.exists(path)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export Keras models to .npz for the NumPy runtime.")
+    parser.add_argument("--models-dir", default=os.getenv("MODELS_DIR", os.path.dirname(os.path.abspath(__file__))))
+    parser.add_argument("--force", action="store_true", help="Overwrite existing .npz exports.")
+    args = parser.parse_args()
+
+    artifacts = keras_artifacts(args.models_dir)
+    if not artifacts:
+        print(f"No Keras models found in {args.models_dir}.")
+        return
+
+    # Only needed here, never by the API
+    from tensorflow.keras.models import load_model
+
+    for keras_path, npz_path in artifacts:
+        if os.path.exists(npz_path) and not args.force:
+            print(f"Skipping {os.path.basename(keras_path)}: {os.path.basename(npz_path)} already exists.")
+            continue
+        export_keras_model(load_model(keras_path, compile=False), npz_path)
+        print(f"Exported {os.path.basename(keras_path)} -> {os.path.basename(npz_path)}")
+        if os.path.basename(keras_path).startswith("lstm_") and not os.path.exists(pipeline_path(npz_path)):
+            print(f"  {os.path.basename(pipeline_path(npz_path))} is missing; retrain this ticker before serving it.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+# backend/models/train_all.py
+#
+# Train the per-ticker LSTMs for a whole universe. Bars for every ticker are
+# downloaded concurrently into the local bar store, then models train in a
+# process pool. Tickers whose stored bars haven't changed since their last
+# model are skipped, and models/manifest.json records every model version.
+# Usage: python models/train_all.py [--workers N] [--download-concurrency N]
+#            [--force] [--models-dir DIR] (TICKER ... | --tickers-file FILE)
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+import multiprocessing
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils import data_fetcher
+from app.utils.bar_store import bar_store
+from app.utils.http_client import upstream
+
+MANIFEST_NAME = "manifest.json"
+
+
+async def download_all(tickers, concurrency):
+    """
+    Bring every ticker's stored bars up to date. Returns {ticker: error or None}.
+    """
+    slots = asyncio.Semaphore(concurrency)
+
+    async def download(ticker):
+        async with slots:
+            try:
+                await data_fetcher.fetch_historical_data_upstream(ticker)
+                return ticker, None
+            except Exception as e:
+                return ticker, str(getattr(e, "detail", e))
+
+    try:
+        return dict(await asyncio.gather(*(download(ticker) for ticker in tickers)))
+    finally:
+        await upstream.aclose()
+
+
+def data_fingerprint(ticker):
+    bars = bar_store.read(ticker)
+    if bars is None or len(bars) == 0:
+        return None
+    return f"{bars['date'][-1]}:{len(bars)}:{float(bars['close'][-1]):.6f}"
+
+
+def training_bars(ticker):
+    # Same two-year span the API serves predictions from
+    bars = bar_store.frame(ticker)
+    return bars[bars.index >= bars.index[-1] - pd.DateOffset(years=2)]
+
+
+def load_manifest(path):
+    if not os.path.exists(path):
+        return {"tickers": {}}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_manifest(manifest, path):
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.chmod(tmp_path, 0o644)
+    os.replace(tmp_path, path)
+
+
+def _init_worker(threads):
+    # Runs before TensorFlow is imported in the worker; keeps N workers from oversubscribing cores
+    os.environ["TF_NUM_INTRAOP_THREADS"] = str(threads)
+    os.environ["TF_NUM_INTEROP_THREADS"] = "1"
+    os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "2")
+
+
+def _train(ticker, models_dir):
+    import train_lstm_option_pricing
+    start = time.time()
+    metrics = train_lstm_option_pricing.train_model(ticker, training_bars(ticker), models_dir=models_dir, verbose=0)
+    metrics["duration_seconds"] = round(time.time() - start, 2)
+    return metrics
+
+
+def needs_training(entry, fingerprint, models_dir, ticker):
+    if entry is None or entry.get("status") != "trained" or entry.get("data_fingerprint") != fingerprint:
+        return True
+    return not os.path.exists(os.path.join(models_dir, f"lstm_option_pricing_{ticker}.npz"))
+
+
+def main(tickers, workers, download_concurrency, models_dir, force=False):
+    manifest_path = os.path.join(models_dir, MANIFEST_NAME)
+    manifest = load_manifest(manifest_path)
+    entries = manifest["tickers"]
+
+    start = time.time()
+    download_errors = asyncio.run(download_all(tickers, download_concurrency))
+    print(f"Downloaded bars for {len(tickers)} tickers in {time.time() - start:.1f}s")
+
+    pending, skipped, failed = [], [], []
+    trained = 0
+    for ticker in tickers:
+        fingerprint = data_fingerprint(ticker)
+        if fingerprint is None:
+            failed.append(ticker)
+            print(f"{ticker}: no bars ({download_errors.get(ticker) or 'empty download'}), skipping")
+            continue
+        if not force and not needs_training(entries.get(ticker), fingerprint, models_dir, ticker):
+            skipped.append(ticker)
+            continue
+        pending.append((ticker, fingerprint))
+    print(f"Training {len(pending)} models with {workers} workers; {len(skipped)} unchanged, skipped")
+
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    # spawn: each worker imports TensorFlow fresh rather than inheriting a forked parent
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker, initargs=(threads,)) as pool:
+        futures = {pool.submit(_train, ticker, models_dir): (ticker, fingerprint) for ticker, fingerprint in pending}
+        for future in as_completed(futures):
+            ticker, fingerprint = futures[future]
+            entry = entries.get(ticker, {})
+            try:
+                metrics = future.result()
+            except Exception as e:
+                failed.append(ticker)
+                entry.update({"status": "failed", "error": str(e), "failed_at": datetime.utcnow().isoformat()})
+                print(f"{ticker}: failed: {e}")
+            else:
+                trained += 1
+                entry = {
+                    "version": entry.get("version", 0) + 1,
+                    "status": "trained",
+                    "trained_at": datetime.utcnow().isoformat(),
+                    "data_fingerprint": fingerprint,
+                    "data_last_date": fingerprint.split(":")[0],
+                    **metrics,
+                }
+                print(f"{ticker}: v{entry['version']} trained in {metrics['duration_seconds']}s (val_loss {metrics['val_loss']:.4f})")
+            entries[ticker] = entry
+            # Rewritten after every model so an interrupted run keeps its progress
+            save_manifest(manifest, manifest_path)
+
+    print(f"Done in {time.time() - start:.1f}s: {trained} trained, {len(skipped)} skipped, {len(failed)} failed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train LSTM models for many tickers in parallel.")
+    parser.add_argument("tickers", nargs="*")
+    parser.add_argument("--tickers-file", help="File with one ticker per line")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Training processes")
+    parser.add_argument("--download-concurrency", type=int, default=16, help="Concurrent bar downloads")
+    parser.add_argument("--models-dir", default="models")
+    parser.add_argument("--force", action="store_true", help="Retrain even if the data is unchanged")
+    args = parser.parse_args()
+
+    tickers = list(args.tickers)
+    if args.tickers_file:
+        with open(args.tickers_file) as f:
+            tickers += [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    tickers = list(dict.fromkeys(t.upper() for t in tickers))
+    if not tickers:
+        parser.error("no tickers given")
+    sys.exit(main(tickers, max(1, args.workers), args.download_concurrency, args.models_dir, args.force))
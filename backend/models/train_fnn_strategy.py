@@ -14,6 +14,13 @@ from tensorflow.keras.callbacks import EarlyStopping
 from tensorflow.keras import regularizers
 import yfinance as yf
 import random
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.utils.numpy_runtime import export_keras_model
+from app.features import prepare_option_chain, option_chain_features
+
+DOWNLOAD_CONCURRENCY = int(os.getenv("TRAINING_DOWNLOAD_CONCURRENCY", "8"))
 
 STRATEGIES = [
     "call_spread",
@@ -66,30 +73,20 @@ def label_strategies(options_data):
 
 def engineer_features(price_data, options_data):
     current_price = price_data['Close'].iloc[-1]
-    options_data['moneyness'] = (options_data['strike'] / current_price) - 1.0
 
     if 'expiration' not in options_data.columns:
         # If no expiration, assume fixed T
-        T = 0.25
-        options_data['T'] = T
+        options_data['moneyness'] = (options_data['strike'] / current_price) - 1.0
+        options_data['T'] = 0.25
     else:
-        now = pd.Timestamp.now(tz='UTC')
         # Make sure expiration is tz-aware or tz-naive consistently
         if options_data['expiration'].dt.tz is None:
             # Localize expiration to UTC
             options_data['expiration'] = options_data['expiration'].dt.tz_localize('UTC')
-        options_data['T'] = (options_data['expiration'] - now).dt.days / 365.0
-
-    options_data.fillna(0, inplace=True)
-    options_data['option_type_encoded'] = options_data['option_type'].map({'call':1,'put':0})
-    options_data['Close'] = current_price
+        prepare_option_chain(options_data, current_price, pd.Timestamp.now(tz='UTC'))
 
-    feature_cols = ['Close','strike','T','impliedVolatility','moneyness','lastPrice','volume','openInterest','option_type_encoded']
-    for col in feature_cols:
-        if col not in options_data.columns:
-            options_data[col] = 0.0
-
-    X = options_data[feature_cols].values
+    # Shared with the API so the served chain rows match the training rows
+    X = option_chain_features(options_data, current_price)
     return X, options_data
 
 def build_and_train_model(X, y):
@@ -123,40 +120,55 @@ def build_and_train_model(X, y):
     model.fit(X_train, Y_train, batch_size=32, epochs=50, validation_data=(X_test, Y_test), callbacks=[early_stop])
 
     model.save("fnn_strategy.keras")
+    # The API serves the NumPy export and never imports TensorFlow
+    export_keras_model(model, "fnn_strategy.npz")
     joblib.dump(scaler, "fnn_scaler.pkl")
     joblib.dump(label_encoder, "fnn_label_encoder.pkl")
     print("FNN Strategy Model trained and saved.")
 
-def main(tickers):
+def load_ticker_chain(ticker):
+    """
+    (price_data, options_data) for ticker's nearest expiration, or None when
+    it has no usable option chain.
+    """
+    print(f"Processing {ticker}")
+    price_data = get_historical_data(ticker, years=1)
+    ticker_obj = yf.Ticker(ticker)
+    expirations = ticker_obj.options
+    if not expirations:
+        print(f"No expirations for {ticker}, skipping...")
+        return None
+    expiration_str = expirations[0]
+    expiration_date = pd.to_datetime(expiration_str)
+    # Make sure expiration_date is tz-aware
+    expiration_date = expiration_date.tz_localize('UTC', nonexistent='shift_forward', ambiguous='NaT')
+
+    chain = ticker_obj.option_chain(expiration_str)
+    calls = chain.calls.copy()
+    puts = chain.puts.copy()
+
+    if calls.empty and puts.empty:
+        print(f"No option chain data for {ticker} at {expiration_str}, skipping...")
+        return None
+
+    calls['option_type'] = 'call'
+    puts['option_type'] = 'put'
+    options_data = pd.concat([calls, puts], ignore_index=True)
+    options_data['expiration'] = expiration_date
+    return price_data, options_data
+
+def main(tickers, download_concurrency=DOWNLOAD_CONCURRENCY):
     all_X = []
     all_y = []
 
-    for ticker in tickers:
-        print(f"Processing {ticker}")
-        price_data = get_historical_data(ticker, years=1)
-        ticker_obj = yf.Ticker(ticker)
-        expirations = ticker_obj.options
-        if not expirations:
-            print(f"No expirations for {ticker}, skipping...")
-            continue
-        expiration_str = expirations[0]
-        expiration_date = pd.to_datetime(expiration_str)
-        # Make sure expiration_date is tz-aware
-        expiration_date = expiration_date.tz_localize('UTC', nonexistent='shift_forward', ambiguous='NaT')
-
-        chain = ticker_obj.option_chain(expiration_str)
-        calls = chain.calls.copy()
-        puts = chain.puts.copy()
+    # Downloads are I/O bound; fetch every ticker's bars and chain in parallel
+    with ThreadPoolExecutor(max_workers=download_concurrency) as pool:
+        loaded = list(pool.map(load_ticker_chain, tickers))
 
-        if calls.empty and puts.empty:
-            print(f"No option chain data for {ticker} at {expiration_str}, skipping...")
+    for result in loaded:
+        if result is None:
             continue
-
-        calls['option_type'] = 'call'
-        puts['option_type'] = 'put'
-        options_data = pd.concat([calls, puts], ignore_index=True)
-        options_data['expiration'] = expiration_date
-
+        price_data, options_data = result
         X, df = engineer_features(price_data, options_data)
         strat_label = label_strategies(df)  # single strategy for entire option chain
         y = [strat_label]*len(X)
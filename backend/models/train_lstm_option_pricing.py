@@ -4,60 +4,63 @@ import yfinance as yf
 import sys
 import os
 from datetime import datetime, timedelta
-from sklearn.preprocessing import MinMaxScaler
 from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import LSTM, Dense
+from tensorflow.keras.layers import LSTM, Dense, Input
 
-def compute_rsi(series, period=14):
-    delta = series.diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-    rs = gain / loss
-    rsi = 100 - (100 / (1 + rs))
-    return rsi
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.utils.numpy_runtime import export_keras_model
+from app.features import FeaturePipeline, indicator_frame, pipeline_path
 
 def load_data(ticker):
     ticker_obj = yf.Ticker(ticker)
     data = ticker_obj.history(period="2y", interval='1d')
     if data.empty:
         raise ValueError(f"No data found for ticker {ticker}")
-    data['SMA_50'] = data['Close'].rolling(window=50).mean()
-    data['SMA_200'] = data['Close'].rolling(window=200).mean()
-    data['RSI'] = compute_rsi(data['Close'])
-    data.dropna(inplace=True)
     return data
 
-def train_model(ticker):
-    data = load_data(ticker)
-    features = data[['Close','SMA_50','SMA_200','RSI']]
-    target = data['Close'].shift(-1)
-    features = features[:-1]
-    target = target[:-1]
+def train_model(ticker, data=None, models_dir='models', verbose=1):
+    """
+    Train and save the LSTM for ticker from daily bars (downloaded when data
+    is None). Returns the number of training samples and final losses.
+    """
+    if data is None:
+        data = load_data(ticker)
+    # Same indicators, scaling and windows the API computes at prediction time
+    features = indicator_frame(data)
+    pipeline = FeaturePipeline()
+    samples = len(features) - pipeline.window
+    if samples < 10:
+        raise ValueError(f"Not enough history for {ticker}: {len(data)} bars")
 
-    split = int(0.8 * len(features))
-    X_train, X_test = features[:split], features[split:]
-    y_train, y_test = target[:split], target[split:]
-
-    scaler = MinMaxScaler()
-    X_train_scaled = scaler.fit_transform(X_train)
-    X_test_scaled = scaler.transform(X_test)
-
-    # LSTM expects [samples, timesteps, features], we have 1 timestep here
-    X_train_scaled = X_train_scaled.reshape((X_train_scaled.shape[0], 1, X_train_scaled.shape[1]))
-    X_test_scaled = X_test_scaled.reshape((X_test_scaled.shape[0], 1, X_test_scaled.shape[1]))
+    split = int(0.8 * samples)
+    # Fit the scaler on rows the training windows cover, never on the test period
+    pipeline.fit(features.iloc[:split + pipeline.window])
+    X, y = pipeline.training_set(features)
+    X_train, X_test = X[:split], X[split:]
+    y_train, y_test = y[:split], y[split:]
 
     model = Sequential()
-    model.add(LSTM(50, input_shape=(1, X_train.shape[1])))
+    model.add(Input(shape=pipeline.input_shape))
+    model.add(LSTM(50))
     model.add(Dense(1))
     model.compile(optimizer='adam', loss='mse')
 
-    model.fit(X_train_scaled, y_train, epochs=20, batch_size=32, validation_data=(X_test_scaled, y_test))
+    history = model.fit(X_train, y_train, epochs=20, batch_size=32, validation_data=(X_test, y_test), verbose=verbose)
 
-    models_dir = 'models'
     if not os.path.exists(models_dir):
         os.makedirs(models_dir)
     model.save(f'{models_dir}/lstm_option_pricing_{ticker}.h5')
+    # The pipeline goes first: the API reloads when the .npz changes and expects both
+    npz_path = f'{models_dir}/lstm_option_pricing_{ticker}.npz'
+    pipeline.save(pipeline_path(npz_path))
+    # The API serves the NumPy export and never imports TensorFlow
+    export_keras_model(model, npz_path)
     print(f"LSTM Option Pricing Model trained and saved for ticker {ticker}.")
+    return {
+        "samples": int(len(X)),
+        "loss": float(history.history['loss'][-1]),
+        "val_loss": float(history.history['val_loss'][-1]),
+    }
 
 if __name__ == "__main__":
     if len(sys.argv) != 2:
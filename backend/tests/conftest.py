@@ -0,0 +1,12 @@
+# backend/tests/conftest.py
+
+import os
+import sys
+import tempfile
+
+# Make the app package importable when pytest runs from the repository root (as CI does)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Settings the app reads at import time; CI has no .env
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}")
@@ -0,0 +1,67 @@
+# backend/tests/test_auth.py
+
+import time
+import pytest
+from datetime import timedelta
+from fastapi import HTTPException
+from jose import jwt
+from app import schemas
+from app.auth import TokenCache, decode_token, create_access_token, SECRET_KEY, ALGORITHM
+
+
+def identity(username="alice", user_id=1):
+    return schemas.User(id=user_id, username=username)
+
+
+def test_invalidate_user_drops_only_that_users_tokens():
+    cache = TokenCache()
+    cache.set("a1", identity(), time.time() + 600, cache.generation("alice"))
+    cache.set("a2", identity(), time.time() + 600, cache.generation("alice"))
+    cache.set("b1", identity("bob", 2), time.time() + 600, cache.generation("bob"))
+
+    cache.invalidate_user("alice")
+
+    assert cache.get("a1") is None and cache.get("a2") is None
+    assert cache.get("b1").username == "bob"
+    # Tokens verified after the invalidation are cached again
+    cache.set("a3", identity(), time.time() + 600, cache.generation("alice"))
+    assert cache.get("a3").username == "alice"
+
+
+def test_lookup_racing_an_invalidation_is_not_cached():
+    cache = TokenCache()
+    # load_identity reads the generation before the database lookup...
+    generation = cache.generation("alice")
+    cache.invalidate_user("alice")
+    # ...so a result stored after a concurrent invalidation is a miss
+    cache.set("a1", identity(), time.time() + 600, generation)
+    assert cache.get("a1") is None
+
+
+def test_entries_expire_with_the_token_or_the_ttl_cap():
+    cache = TokenCache(max_ttl=0.4)
+    cache.set("long", identity(), time.time() + 600, 0)
+    cache.set("short", identity(), time.time() + 0.2, 0)
+    cache.set("expired", identity(), time.time() - 1, 0)
+
+    assert cache.get("long") is not None and cache.get("short") is not None
+    assert cache.get("expired") is None
+    time.sleep(0.25)
+    assert cache.get("short") is None and cache.get("long") is not None
+    time.sleep(0.2)
+    assert cache.get("long") is None
+
+
+def test_decode_token_returns_subject_and_expiry():
+    token = create_access_token({"sub": "alice"}, expires_delta=timedelta(minutes=5))
+    username, expires_at = decode_token(token)
+    assert username == "alice"
+    assert expires_at == pytest.approx(time.time() + 300, abs=5)
+
+
+@pytest.mark.parametrize("claims", [{"sub": "alice"}, {"exp": int(time.time()) + 300}])
+def test_signed_token_missing_claims_is_a_401(claims):
+    token = jwt.encode(claims, SECRET_KEY, algorithm=ALGORITHM)
+    with pytest.raises(HTTPException) as excinfo:
+        decode_token(token)
+    assert excinfo.value.status_code == 401
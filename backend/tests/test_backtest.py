@@ -0,0 +1,61 @@
+# backend/tests/test_backtest.py
+
+import numpy as np
+import pytest
+from app.backtest import backtest, strategy_pnl_paths, STRATEGY_LEGS, TRADING_DAYS
+from app.pricing import black_scholes
+
+
+def synthetic_closes(days=120, seed=3):
+    rng = np.random.default_rng(seed)
+    return 100.0 * np.exp(np.cumsum(rng.normal(0.0003, 0.015, days)))
+
+
+def scalar_trade(closes, start, holding_days, width, strategy, lookback=20, r=0.01):
+    """
+    Mark-to-market P&L of one trade, leg by leg and day by day with scalar
+    black_scholes calls: the loop the vectorized backtest replaces.
+    """
+    log_returns = np.diff(np.log(closes[:start + 1]))[-lookback:]
+    sigma = log_returns.std(ddof=1) * np.sqrt(TRADING_DAYS)
+    entry = closes[start]
+    values = []
+    for day in range(holding_days + 1):
+        spot = closes[start + day]
+        T = (holding_days - day) / TRADING_DAYS
+        value = 0.0
+        for kind, offset, qty in STRATEGY_LEGS[strategy]:
+            if kind == "stock":
+                value += qty * spot
+            else:
+                strike = entry * (1.0 + offset * width)
+                value += qty * float(black_scholes(spot, strike, T, sigma, kind == "call", r=r)['price'])
+        values.append(value)
+    return np.array(values) - values[0]
+
+
+@pytest.mark.parametrize("strategy", ["iron_condor", "covered_call", "butterfly"])
+def test_single_combination_matches_scalar_loop(strategy):
+    closes = synthetic_closes()
+    holding_days, width, r = 10, 0.05, 0.01
+
+    paths, starts = strategy_pnl_paths(closes, holding_days, [width], [strategy], r=r)
+    expected = np.array([scalar_trade(closes, start, holding_days, width, strategy, r=r) for start in starts])
+    np.testing.assert_allclose(paths[0, 0], expected, rtol=1e-9, atol=1e-9)
+
+    row = backtest(closes, holding_days=[holding_days], widths=[width], strategies=[strategy], r=r).iloc[0]
+    returns = expected[:, -1] / closes[starts]
+    drawdowns = (np.maximum.accumulate(expected, axis=1) - expected).max(axis=1) / closes[starts]
+    assert row['trades'] == len(starts) == len(closes) - holding_days - 20
+    assert row['mean_return'] == pytest.approx(returns.mean())
+    assert row['median_return'] == pytest.approx(np.median(returns))
+    assert row['hit_rate'] == pytest.approx((returns > 0).mean())
+    assert row['mean_drawdown'] == pytest.approx(drawdowns.mean())
+    assert row['max_drawdown'] == pytest.approx(drawdowns.max())
+
+
+def test_history_shorter_than_the_lookback_gives_no_trades():
+    result = backtest(synthetic_closes(days=25), holding_days=[10])
+    assert result.empty
+    assert list(result.columns) == ['strategy', 'holding_days', 'width', 'trades', 'mean_return',
+                                    'median_return', 'hit_rate', 'mean_drawdown', 'max_drawdown']
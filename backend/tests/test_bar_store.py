@@ -0,0 +1,172 @@
+# backend/tests/test_bar_store.py
+
+import os
+import asyncio
+import numpy as np
+import pandas as pd
+import pytest
+from app.utils import bar_store as bar_store_module
+from app.utils import data_fetcher
+from app.utils.bar_store import bar_store, records_to_frame, frame_to_records
+
+SESSION = pd.Timestamp("2026-03-13")  # a Friday
+TODAY = pd.Timestamp("2026-03-16")
+
+
+def bars(start, end, scale=1.0, tz=None, source="Yahoo Finance"):
+    """
+    Upstream-shaped daily bars: close = 100 + day number (times scale),
+    with the extra columns yfinance returns.
+    """
+    index = pd.bdate_range(start, end)
+    close = (100.0 + np.arange(len(index))) * scale
+    frame = pd.DataFrame({
+        "Open": close - 1.0, "High": close + 1.0, "Low": close - 2.0, "Close": close,
+        "Volume": 1000.0, "Dividends": 0.0, "Stock Splits": 0.0, "data_source": source,
+    }, index=index)
+    if tz is not None:
+        frame.index = frame.index.tz_localize(tz)
+    return frame
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    # The shared store writes under a temporary BAR_STORE_DIR for the test
+    monkeypatch.setattr(bar_store, "root", str(tmp_path))
+    monkeypatch.setattr(data_fetcher, "last_completed_session", lambda now=None: SESSION)
+    monkeypatch.setattr(data_fetcher, "is_market_open", lambda now=None: True)
+    return bar_store
+
+
+class Upstream:
+    """
+    Stand-ins for the full and incremental downloads, recording calls.
+    """
+
+    def __init__(self, monkeypatch, full, since=None):
+        self.calls = []
+        self.full = full
+        self.since = since
+
+        async def fetch_full(ticker):
+            self.calls.append("full")
+            return self.full.copy()
+
+        async def fetch_since(ticker, last_date):
+            self.calls.append("since")
+            frame = self.since.copy()
+            index = frame.index.tz_localize(None) if frame.index.tz is not None else frame.index
+            return frame[index.normalize() >= last_date], "Yahoo Finance"
+
+        monkeypatch.setattr(data_fetcher, "fetch_historical_data_full", fetch_full)
+        monkeypatch.setattr(data_fetcher, "fetch_historical_data_since", fetch_since)
+
+
+def fetch(ticker="TEST"):
+    return asyncio.run(data_fetcher.fetch_historical_data_upstream(ticker))
+
+
+def test_first_fetch_stores_completed_bars_and_returns_store_shape(store, monkeypatch):
+    # Includes today's in-progress bar, tz-aware like yfinance
+    upstream = Upstream(monkeypatch, bars("2024-01-01", TODAY, tz="America/New_York"))
+
+    df = fetch()
+
+    assert upstream.calls == ["full"]
+    assert list(df.columns) == ["Open", "High", "Low", "Close", "Volume", "data_source"]
+    assert df.index.tz is None
+    assert df.index[-1] == TODAY
+    assert (df["data_source"] == "Yahoo Finance").all()
+    assert df.index[0] >= TODAY - pd.DateOffset(years=2)
+    # The live bar is served but never persisted
+    assert store.last_date("TEST") == SESSION
+
+
+def test_incremental_fetch_appends_only_new_sessions(store, monkeypatch):
+    history = bars("2025-01-01", "2026-03-10")
+    store.append("TEST", history)
+    upstream = Upstream(monkeypatch, full=None, since=bars("2025-01-01", TODAY))
+
+    df = fetch()
+
+    assert upstream.calls == ["since"]
+    stored = store.read("TEST")
+    assert pd.Timestamp(stored["date"][-1]) == SESSION
+    assert len(stored) == len(history) + 3  # Mar 11-13; Mar 16 is still trading
+    assert df.index[-1] == TODAY
+    np.testing.assert_allclose(stored["close"][:len(history)], history["Close"].to_numpy())
+
+
+def test_live_bar_is_replaced_not_stored_on_later_polls(store, monkeypatch):
+    store.append("TEST", bars("2025-01-01", SESSION))
+    since = bars("2025-01-01", TODAY)
+    upstream = Upstream(monkeypatch, full=None, since=since)
+
+    first = fetch()
+    upstream.since.loc[TODAY, "Close"] = 999.0
+    second = fetch()
+
+    assert first["Close"].iloc[-1] != 999.0
+    assert second["Close"].iloc[-1] == 999.0
+    assert store.last_date("TEST") == SESSION
+    assert len(store.read("TEST")) == len(bars("2025-01-01", SESSION))
+
+
+def test_readjusted_history_rebuilds_the_file(store, monkeypatch):
+    store.append("TEST", bars("2025-01-01", "2026-03-10"))
+    # A 2:1 split: upstream now reports every historical close halved
+    adjusted = bars("2025-01-01", TODAY, scale=0.5)
+    upstream = Upstream(monkeypatch, full=adjusted, since=adjusted)
+
+    df = fetch()
+
+    assert upstream.calls == ["since", "full"]
+    stored = store.read("TEST")
+    np.testing.assert_allclose(stored["close"], adjusted["Close"].to_numpy()[:len(stored)])
+    assert pd.Timestamp(stored["date"][-1]) == SESSION
+    assert df["Close"].iloc[0] == pytest.approx(adjusted.loc[df.index[0], "Close"])
+
+
+def test_matches_tolerates_rounding_but_not_adjustments(store):
+    store.append("TEST", bars("2026-01-01", "2026-03-10"))
+    assert store.matches("TEST", bars("2026-01-01", "2026-03-12", scale=1.0 + 1e-5))
+    assert not store.matches("TEST", bars("2026-01-01", "2026-03-12", scale=0.98))
+    # Nothing overlapping: nothing to compare
+    assert store.matches("TEST", bars("2026-03-11", "2026-03-12", scale=0.5))
+
+
+def test_failed_write_leaves_no_temp_files(store, monkeypatch):
+    store.append("TEST", bars("2026-01-01", "2026-03-10"))
+    before = store.read("TEST").copy()
+
+    def failing_save(f, records):
+        f.write(b"partial")
+        raise OSError("disk full")
+
+    with monkeypatch.context() as patched:
+        patched.setattr(bar_store_module.np, "save", failing_save)
+        with pytest.raises(OSError):
+            store.replace("TEST", bars("2026-01-01", "2026-03-12"))
+
+    assert not [name for name in os.listdir(store.root) if name.endswith(".tmp")]
+    np.testing.assert_array_equal(np.asarray(store.read("TEST")), before)
+
+
+def test_two_year_window_does_not_copy_stored_bars():
+    records = frame_to_records(bars("2023-01-02", "2026-03-13"))
+    df = data_fetcher.two_year_window(records_to_frame(records), "Local store")
+
+    assert df.index[0] >= df.index[-1] - pd.DateOffset(years=2)
+    assert (df["data_source"] == "Local store").all()
+    assert np.shares_memory(df["Close"].to_numpy(), records["close"])
+
+
+def test_alpha_vantage_bars_are_adjusted():
+    raw = pd.DataFrame({
+        "Open": [10.0, 20.0], "High": [11.0, 21.0], "Low": [9.0, 19.0],
+        "Close": [10.0, 20.0], "Adj Close": [5.0, 20.0], "Volume": [1.0, 1.0],
+    })
+    adjusted = data_fetcher.adjusted_bars(raw)
+    assert "Adj Close" not in adjusted.columns
+    assert adjusted[["Open", "High", "Low", "Close"]].iloc[0].tolist() == [5.0, 5.5, 4.5, 5.0]
+    assert adjusted["Close"].iloc[1] == 20.0
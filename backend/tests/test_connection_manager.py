@@ -0,0 +1,72 @@
+# backend/tests/test_connection_manager.py
+
+import json
+import asyncio
+from app.utils.connection_manager import ConnectionManager
+
+
+class FakeWebSocket:
+    """
+    Records sent messages; with block=True every send hangs, like a client
+    that stopped reading.
+    """
+
+    def __init__(self, block=False):
+        self.messages = []
+        self.closed = None
+        self._block = asyncio.Event() if block else None
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, message):
+        if self._block is not None:
+            await self._block.wait()
+        self.messages.append(json.loads(message))
+
+    async def close(self, code=1000):
+        self.closed = code
+
+
+async def drain():
+    # Let every per-client sender task deliver what's queued
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+def test_slow_consumer_does_not_hold_up_others():
+    async def main():
+        manager = ConnectionManager(queue_size=2, slow_consumer_policy="drop_oldest")
+        slow, fast = FakeWebSocket(block=True), FakeWebSocket()
+        for ws in (slow, fast):
+            await manager.connect(ws)
+            manager.subscribe(ws, "AAPL")
+
+        for i in range(5):
+            await manager.publish("AAPL", json.dumps({"type": "price", "ticker": "AAPL", "price": float(i)}))
+            await drain()
+
+        assert [m["price"] for m in fast.messages] == [0.0, 1.0, 2.0, 3.0, 4.0]
+        assert slow.messages == []
+        assert manager.dropped > 0
+        assert manager.stats()["queue_depth"]["max"] <= 2
+        for ws in (slow, fast):
+            manager.disconnect(ws)
+
+    asyncio.run(main())
+
+
+def test_slow_consumer_disconnect_policy():
+    async def main():
+        manager = ConnectionManager(queue_size=1, slow_consumer_policy="disconnect")
+        slow = FakeWebSocket(block=True)
+        await manager.connect(slow)
+        manager.subscribe(slow, "AAPL")
+        for i in range(4):
+            await manager.publish("AAPL", json.dumps({"type": "price", "ticker": "AAPL", "price": float(i)}))
+            await drain()
+        assert manager.slow_disconnects == 1
+        assert slow.closed == 1013
+        assert manager.subscribed_tickers() == set()
+
+    asyncio.run(main())
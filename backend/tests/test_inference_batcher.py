@@ -0,0 +1,107 @@
+# backend/tests/test_inference_batcher.py
+
+import threading
+import numpy as np
+import pytest
+from app.utils.inference_batcher import InferenceBatcher
+
+
+def submit_concurrently(batcher, inputs, key="AAPL"):
+    """
+    Submit every input from its own thread at (nearly) the same time;
+    returns results (or exceptions) in input order.
+    """
+    start = threading.Barrier(len(inputs))
+    results = [None] * len(inputs)
+
+    def worker(i):
+        start.wait()
+        try:
+            results[i] = batcher.submit(key, inputs[i])
+        except Exception as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(len(inputs))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def recording_model(calls):
+    def predict(key, batch):
+        calls.append((key, batch.shape[0]))
+        # One output per row, identifying the row it came from
+        return batch.reshape(batch.shape[0], -1)[:, 0] * 10.0
+    return predict
+
+
+def test_concurrent_requests_share_one_call():
+    calls = []
+    batcher = InferenceBatcher(recording_model(calls), window_ms=500, max_batch_size=8)
+    inputs = [np.full((1, 20, 4), float(i)) for i in range(8)]
+
+    results = submit_concurrently(batcher, inputs)
+
+    assert calls == [("AAPL", 8)]
+    # Each caller gets its own row back
+    assert [float(r) for r in results] == [10.0 * i for i in range(8)]
+    stats = batcher.stats()
+    assert stats["batches"] == 1
+    assert stats["requests"] == 8
+
+
+def test_batches_are_capped_at_max_batch_size():
+    calls = []
+    batcher = InferenceBatcher(recording_model(calls), window_ms=200, max_batch_size=4)
+    inputs = [np.full((1, 20, 4), float(i)) for i in range(10)]
+
+    results = submit_concurrently(batcher, inputs)
+
+    assert sum(size for _, size in calls) == 10
+    assert max(size for _, size in calls) <= 4
+    assert [float(r) for r in results] == [10.0 * i for i in range(10)]
+
+
+def test_single_request_runs_after_window():
+    calls = []
+    batcher = InferenceBatcher(recording_model(calls), window_ms=1, max_batch_size=8)
+    assert float(batcher.submit("AAPL", np.full((1, 20, 4), 3.0))) == 30.0
+    assert calls == [("AAPL", 1)]
+
+
+def test_different_models_and_shapes_are_not_mixed():
+    calls = []
+    batcher = InferenceBatcher(recording_model(calls), window_ms=100, max_batch_size=64)
+    barrier = threading.Barrier(3)
+    results = {}
+
+    def worker(name, key, shape):
+        barrier.wait()
+        results[name] = batcher.submit(key, np.ones(shape))
+
+    threads = [
+        threading.Thread(target=worker, args=("a", "AAPL", (1, 20, 4))),
+        threading.Thread(target=worker, args=("b", "MSFT", (1, 20, 4))),
+        threading.Thread(target=worker, args=("c", "AAPL", (1, 30, 4))),
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(calls) == [("AAPL", 1), ("AAPL", 1), ("MSFT", 1)]
+    assert set(results) == {"a", "b", "c"}
+
+
+def test_model_error_reaches_every_caller():
+    def failing(key, batch):
+        raise ValueError("LSTM model not found for ticker AAPL. Need to train it.")
+
+    batcher = InferenceBatcher(failing, window_ms=200, max_batch_size=4)
+    results = submit_concurrently(batcher, [np.zeros((1, 20, 4)) for _ in range(4)])
+
+    assert all(isinstance(result, ValueError) for result in results)
+    with pytest.raises(ValueError):
+        batcher.submit("AAPL", np.zeros((1, 20, 4)))
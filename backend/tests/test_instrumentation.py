@@ -0,0 +1,67 @@
+# backend/tests/test_instrumentation.py
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from app.utils.instrumentation import Histogram, render_metrics, instrument_engine, db_latency
+
+
+def test_histogram_renders_cumulative_buckets_per_label_set():
+    histogram = Histogram("job_seconds", "Job latency.", ("kind",), buckets=(0.1, 1.0))
+    histogram.observe(("fast",), 0.05)
+    histogram.observe(("fast",), 0.5)
+    histogram.observe(("slow",), 3.0)
+
+    assert histogram.render() == [
+        "# HELP job_seconds Job latency.",
+        "# TYPE job_seconds histogram",
+        'job_seconds_bucket{kind="fast",le="0.1"} 1',
+        'job_seconds_bucket{kind="fast",le="1.0"} 2',
+        'job_seconds_bucket{kind="fast",le="+Inf"} 2',
+        'job_seconds_sum{kind="fast"} 0.550000',
+        'job_seconds_count{kind="fast"} 2',
+        'job_seconds_bucket{kind="slow",le="0.1"} 0',
+        'job_seconds_bucket{kind="slow",le="1.0"} 0',
+        'job_seconds_bucket{kind="slow",le="+Inf"} 1',
+        'job_seconds_sum{kind="slow"} 3.000000',
+        'job_seconds_count{kind="slow"} 1',
+    ]
+
+
+def test_render_metrics_flattens_component_stats_into_gauges():
+    def failing():
+        raise RuntimeError("unavailable")
+
+    output = render_metrics({
+        "websocket": lambda: {"sent": 3, "lag_ms": {"p50": 1.5}, "enabled": True, "name": "ws"},
+        "broken": failing,
+    })
+
+    lines = output.splitlines()
+    assert output.endswith("\n")
+    assert "# TYPE http_request_duration_seconds histogram" in lines
+    assert "# TYPE websocket_sent gauge" in lines and "websocket_sent 3" in lines
+    assert "websocket_lag_ms_p50 1.5" in lines
+    # Booleans, strings and a component whose stats() fails are left out
+    assert not [line for line in lines if line.startswith(("websocket_enabled", "websocket_name", "broken"))]
+
+
+def db_count(operation):
+    return db_latency._series.get((operation,), [0])[-1]
+
+
+def test_instrument_engine_times_statements_and_clears_failed_ones():
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+    selects = db_count("SELECT")
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        with pytest.raises(OperationalError):
+            conn.execute(text("SELECT * FROM missing_table"))
+        # The failed statement's start time must not linger for the next one to pop
+        assert conn.info["query_start"] == []
+        conn.execute(text("SELECT 2"))
+        assert conn.info["query_start"] == []
+
+    assert db_count("SELECT") == selects + 2
@@ -0,0 +1,45 @@
+# backend/tests/test_numpy_runtime.py
+
+import numpy as np
+import pytest
+from app.utils.numpy_runtime import export_keras_model, load_numpy_model
+
+keras = pytest.importorskip("tensorflow").keras
+
+RTOL, ATOL = 1e-4, 1e-5
+
+
+def assert_exported_matches_keras(model, x, tmp_path):
+    exported = export_keras_model(model, str(tmp_path / "model.npz"))
+    loaded = load_numpy_model(str(tmp_path / "model.npz"))
+    expected = np.asarray(model.predict_on_batch(x))
+    np.testing.assert_allclose(exported.predict_on_batch(x), expected, rtol=RTOL, atol=ATOL)
+    np.testing.assert_allclose(loaded.predict_on_batch(x), expected, rtol=RTOL, atol=ATOL)
+
+
+def test_lstm_export_matches_keras(tmp_path):
+    # Same shape as train_lstm_option_pricing.py, plus a stacked sequence layer
+    keras.utils.set_random_seed(0)
+    model = keras.Sequential([
+        keras.Input(shape=(30, 6)),
+        keras.layers.LSTM(16, return_sequences=True),
+        keras.layers.LSTM(50),
+        keras.layers.Dense(1),
+    ])
+    x = np.random.default_rng(0).normal(size=(8, 30, 6)).astype(np.float32)
+    assert_exported_matches_keras(model, x, tmp_path)
+
+
+def test_dense_export_matches_keras(tmp_path):
+    # Same shape as train_fnn_strategy.py; Dropout is dropped at export
+    keras.utils.set_random_seed(0)
+    model = keras.Sequential([
+        keras.Input(shape=(12,)),
+        keras.layers.Dense(128, activation="relu"),
+        keras.layers.Dropout(0.3),
+        keras.layers.Dense(64, activation="relu"),
+        keras.layers.Dropout(0.3),
+        keras.layers.Dense(5, activation="softmax"),
+    ])
+    x = np.random.default_rng(1).normal(size=(32, 12)).astype(np.float32)
+    assert_exported_matches_keras(model, x, tmp_path)
@@ -0,0 +1,53 @@
+# backend/tests/test_predict_batch.py
+
+import json
+import asyncio
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from app import main, schemas
+
+# Seconds each fake prediction takes, so completion order differs from request order
+DELAYS = {"SLOW": 0.4, "BOOM": 0.3, "TRAIN": 0.2, "BAD": 0.1, "FAST": 0.0}
+
+
+async def fake_prediction(ticker):
+    await asyncio.sleep(DELAYS[ticker])
+    if ticker == "BAD":
+        raise HTTPException(status_code=404, detail="No data found for ticker BAD.")
+    if ticker == "BOOM":
+        raise RuntimeError("unexpected")
+    if ticker == "TRAIN":
+        return 202, {"ticker": ticker, "detail": "training"}
+    return 200, {"ticker": ticker, "predicted_close": 101.5}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(main, "run_prediction", fake_prediction)
+    main.app.dependency_overrides[main.get_current_identity] = lambda: schemas.User(id=1, username="tester")
+    # Not entered as a context manager: startup (model warm-up, broker, price stream) doesn't run
+    yield TestClient(main.app)
+    main.app.dependency_overrides.clear()
+
+
+def test_results_stream_in_completion_order_with_errors_isolated(client):
+    response = client.post("/predict/batch", json={"tickers": ["slow", "BOOM", " train ", "BAD", "FAST", "fast"]})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    # Upper-cased and de-duplicated; fastest first regardless of request order
+    assert [line["ticker"] for line in lines] == ["FAST", "BAD", "TRAIN", "BOOM", "SLOW"]
+    by_ticker = {line["ticker"]: line for line in lines}
+    assert by_ticker["FAST"] == {"ticker": "FAST", "status": 200, "result": {"ticker": "FAST", "predicted_close": 101.5}}
+    assert by_ticker["TRAIN"]["status"] == 202
+    assert by_ticker["BAD"] == {"ticker": "BAD", "status": 404, "error": "No data found for ticker BAD."}
+    # An unexpected failure is reported for that ticker only, without its details
+    assert by_ticker["BOOM"] == {"ticker": "BOOM", "status": 500, "error": "Internal server error."}
+    assert by_ticker["SLOW"]["status"] == 200
+
+
+@pytest.mark.parametrize("tickers", [[], [" ", ""], [f"T{i}" for i in range(main.PREDICT_BATCH_MAX_TICKERS + 1)]])
+def test_empty_or_oversized_batches_are_rejected(client, tickers):
+    assert client.post("/predict/batch", json={"tickers": tickers}).status_code == 400
@@ -0,0 +1,97 @@
+# backend/tests/test_price_stream.py
+
+import json
+import asyncio
+from app.utils.connection_manager import ConnectionManager
+from app.utils.price_stream import FakePriceFeed, PriceStreamer, PriceRelay
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.messages = []
+        self.closed = None
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, message):
+        self.messages.append(json.loads(message))
+
+    async def close(self, code=1000):
+        self.closed = code
+
+
+class CountingFeed(FakePriceFeed):
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+
+    async def latest_prices(self, tickers):
+        self.calls.append(list(tickers))
+        return await super().latest_prices(tickers)
+
+
+async def drain():
+    # Let every per-client sender task deliver what's queued
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+def test_poll_fans_out_to_subscribers_only():
+    async def main():
+        manager = ConnectionManager()
+        relay = PriceRelay(manager)
+        feed = CountingFeed()
+
+        async def publish(ticker, message):
+            await relay.deliver(message)
+
+        streamer = PriceStreamer(feed, manager.subscribed_tickers, publish, interval=60)
+        apple_only, both, idle = FakeWebSocket(), FakeWebSocket(), FakeWebSocket()
+        for ws in (apple_only, both, idle):
+            await manager.connect(ws)
+        manager.subscribe(apple_only, "AAPL")
+        manager.subscribe(both, "AAPL")
+        manager.subscribe(both, "MSFT")
+
+        await streamer.poll_once()
+        await drain()
+
+        # One upstream call covers every subscribed ticker
+        assert feed.calls == [["AAPL", "MSFT"]]
+        assert [m["ticker"] for m in apple_only.messages] == ["AAPL"]
+        assert sorted(m["ticker"] for m in both.messages) == ["AAPL", "MSFT"]
+        assert idle.messages == []
+        assert all(m["type"] == "price" and m["change"] is None for m in both.messages)
+
+        # New subscribers get the last price straight away
+        assert json.loads(relay.snapshot("MSFT"))["price"] == feed.prices["MSFT"]
+
+        manager.unsubscribe(both, "MSFT")
+        await streamer.poll_once()
+        await drain()
+        assert feed.calls[-1] == ["AAPL"]
+        assert [m["ticker"] for m in both.messages].count("MSFT") == 1
+        assert both.messages[-1]["change"] is not None
+
+        for ws in (apple_only, both, idle):
+            manager.disconnect(ws)
+        assert manager.subscribed_tickers() == set()
+
+    asyncio.run(main())
+
+
+def test_unchanged_price_is_not_republished():
+    async def main():
+        published = []
+
+        async def publish(ticker, message):
+            published.append(ticker)
+
+        feed = FakePriceFeed(volatility=0.0)
+        streamer = PriceStreamer(feed, lambda: {"AAPL"}, publish, interval=60)
+        await streamer.poll_once()
+        await streamer.poll_once()
+        assert published == ["AAPL"]
+
+    asyncio.run(main())
@@ -0,0 +1,52 @@
+# backend/tests/test_pricing.py
+
+import numpy as np
+import pandas as pd
+from app.pricing import RISK_FREE_RATE, black_scholes, implied_volatility, chain_implied_volatility, years_to_expiry
+
+
+def test_implied_volatility_round_trips_black_scholes():
+    S = 100.0
+    K, T, sigma = np.meshgrid([60.0, 90.0, 100.0, 110.0, 150.0], [0.01, 0.25, 2.0], [0.05, 0.3, 1.5])
+    K, T, sigma = K.ravel(), T.ravel(), sigma.ravel()
+    for is_call in (True, False):
+        price = black_scholes(S, K, T, sigma, is_call)['price']
+        solved = implied_volatility(price, S, K, T, is_call)
+        # Contracts worth ~their intrinsic value (deep in or out of the money) carry no vol information
+        intrinsic = np.maximum((1.0 if is_call else -1.0) * (S - K * np.exp(-RISK_FREE_RATE * T)), 0.0)
+        informative = price - intrinsic > 1e-3
+        assert informative.sum() > len(price) // 2
+        np.testing.assert_allclose(solved[informative], sigma[informative], rtol=1e-3, atol=1e-4)
+
+
+def test_prices_outside_arbitrage_bounds_are_nan():
+    S, K, T = 100.0, 100.0, 0.5
+    below_intrinsic = implied_volatility(-1.0, S, K, T, True)
+    above_spot = implied_volatility(101.0, S, K, T, True)
+    expired = implied_volatility(5.0, S, K, 0.0, True)
+    assert np.isnan(below_intrinsic) and np.isnan(above_spot) and np.isnan(expired)
+
+
+def test_chain_implied_volatility_uses_quotes_and_time_column():
+    T = np.array([0.1, 0.5])
+    price = black_scholes(100.0, [95.0, 105.0], T, 0.25, [True, False])['price']
+    chain = pd.DataFrame({
+        'strike': [95.0, 105.0],
+        'option_type': ['call', 'put'],
+        'bid': price - 0.01,
+        'ask': price + 0.01,
+        'lastPrice': [0.0, 0.0],
+        'T': [-1.0, -1.0],
+        'T_pricing': T,
+    })
+    np.testing.assert_allclose(chain_implied_volatility(chain, 100.0, time_column='T_pricing'), 0.25, rtol=1e-3)
+    assert np.isnan(chain_implied_volatility(chain, 100.0)).all()
+
+
+def test_years_to_expiry_counts_to_the_new_york_close():
+    expiration = pd.Series(pd.to_datetime(["2026-10-16", "2026-10-23"], utc=True))
+    now = pd.Timestamp("2026-10-16 14:00", tz="America/New_York")
+    years = years_to_expiry(expiration, now).to_numpy()
+    np.testing.assert_allclose(years * 365.0 * 24.0, [2.0, 7 * 24.0 + 2.0])
+    after_close = pd.Timestamp("2026-10-16 17:00", tz="America/New_York")
+    assert years_to_expiry(expiration, after_close).iloc[0] == 0.0
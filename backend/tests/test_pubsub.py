@@ -0,0 +1,137 @@
+# backend/tests/test_pubsub.py
+
+import os
+import asyncio
+import tempfile
+from app.utils.pubsub import UnixSocketBroker
+
+
+class Recorder:
+    def __init__(self):
+        self.messages = []
+
+    async def __call__(self, message):
+        self.messages.append(message)
+
+
+async def wait_for(condition, timeout=5.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+async def started_broker(path, **kwargs):
+    broker = UnixSocketBroker(path, **kwargs)
+    received = Recorder()
+    broker.subscribe("prices", received)
+    promotions = []
+
+    async def promoted():
+        promotions.append(os.getpid())
+
+    broker.on_promoted(promoted)
+    await broker.start()
+    return broker, received, promotions
+
+
+def test_two_brokers_exchange_messages_and_survive_hub_exit():
+    async def main(path):
+        hub, hub_received, hub_promotions = await started_broker(path)
+        await wait_for(lambda: hub.is_leader)
+        peer, peer_received, peer_promotions = await started_broker(path)
+        await wait_for(lambda: peer._hub_writer is not None)
+        assert not peer.is_leader and hub_promotions and not peer_promotions
+
+        # Hub -> worker and worker -> hub; every broker also delivers locally
+        await hub.publish("prices", "from hub")
+        await peer.publish("prices", "from peer")
+        await wait_for(lambda: len(peer_received.messages) == 2 and len(hub_received.messages) == 2)
+        # Local delivery is immediate, so order across publishers may differ per broker
+        assert sorted(peer_received.messages) == ["from hub", "from peer"]
+        assert sorted(hub_received.messages) == ["from hub", "from peer"]
+
+        # The hub goes away: the remaining worker takes over as hub and leader
+        await hub.stop()
+        await wait_for(lambda: peer.is_leader)
+        assert peer_promotions
+
+        # ...and a worker that (re)starts now connects to it
+        late, late_received, _ = await started_broker(path)
+        await wait_for(lambda: late._hub_writer is not None)
+        await peer.publish("prices", "after failover")
+        await late.publish("prices", "from late")
+        await wait_for(lambda: len(late_received.messages) == 2 and len(peer_received.messages) == 4)
+        assert sorted(late_received.messages) == ["after failover", "from late"]
+        assert sorted(peer_received.messages[2:]) == ["after failover", "from late"]
+
+        await late.stop()
+        await peer.stop()
+
+    with tempfile.TemporaryDirectory() as directory:
+        asyncio.run(main(os.path.join(directory, "pubsub.sock")))
+
+
+def test_frames_over_64_kib_are_delivered():
+    async def main(path):
+        hub, _, _ = await started_broker(path)
+        await wait_for(lambda: hub.is_leader)
+        peer, peer_received, _ = await started_broker(path)
+        await wait_for(lambda: peer._hub_writer is not None)
+
+        large = "x" * (256 * 1024)
+        await hub.publish("prices", large)
+        await hub.publish("prices", "small")
+        await wait_for(lambda: len(peer_received.messages) == 2)
+        assert peer_received.messages == [large, "small"]
+
+        await peer.stop()
+        await hub.stop()
+
+    with tempfile.TemporaryDirectory() as directory:
+        asyncio.run(main(os.path.join(directory, "pubsub.sock")))
+
+
+async def relay_past_stalled_peer(path, policy):
+    """
+    Hub relays 100 frames of 64 KiB while one connected worker never reads;
+    returns the hub, what the healthy worker received and the frames sent.
+    """
+    hub, _, _ = await started_broker(path, peer_queue_size=32, slow_peer_policy=policy)
+    await wait_for(lambda: hub.is_leader)
+    # Connects like a worker but never reads, so its socket buffer fills up
+    _, stalled_writer = await asyncio.open_unix_connection(path)
+    peer, peer_received, _ = await started_broker(path)
+    await wait_for(lambda: peer._hub_writer is not None and len(hub._peers) == 2)
+
+    sent = [f"{i:03d}" + "x" * (64 * 1024) for i in range(100)]
+    for message in sent:
+        # publish() must not wait on the stalled worker's socket
+        await asyncio.wait_for(hub.publish("prices", message), 1.0)
+        await asyncio.sleep(0.001)
+    await wait_for(lambda: len(peer_received.messages) == len(sent))
+
+    await peer.stop()
+    stalled_writer.close()
+    await hub.stop()
+    return hub, peer_received.messages, sent
+
+
+def test_stalled_peer_drops_its_oldest_frames_without_blocking_others():
+    async def main(path):
+        hub, received, sent = await relay_past_stalled_peer(path, "drop_oldest")
+        assert received == sent
+        assert hub.dropped > 0 and hub.slow_disconnects == 0
+
+    with tempfile.TemporaryDirectory() as directory:
+        asyncio.run(main(os.path.join(directory, "pubsub.sock")))
+
+
+def test_stalled_peer_is_disconnected_under_disconnect_policy():
+    async def main(path):
+        hub, received, sent = await relay_past_stalled_peer(path, "disconnect")
+        assert received == sent
+        assert hub.slow_disconnects == 1 and hub.dropped == 0
+
+    with tempfile.TemporaryDirectory() as directory:
+        asyncio.run(main(os.path.join(directory, "pubsub.sock")))
@@ -0,0 +1,108 @@
+# backend/tests/test_risk.py
+
+import asyncio
+import numpy as np
+import pandas as pd
+import pytest
+from types import SimpleNamespace
+from fastapi import HTTPException
+from scipy.stats import norm
+from app import auth, risk
+
+
+def closes_from_returns(returns, tickers, start=100.0):
+    # (days + 1, tickers) closes whose daily log returns are exactly `returns`
+    log_prices = np.vstack([np.zeros(returns.shape[1]), np.cumsum(returns, axis=0)])
+    index = pd.bdate_range("2024-01-01", periods=len(log_prices))
+    return pd.DataFrame(start * np.exp(log_prices), index=index, columns=tickers)
+
+
+def test_historical_var_matches_hand_computed_quantile():
+    rng = np.random.default_rng(7)
+    # 101 return days: the 5% quantile falls exactly on the 6th-worst day
+    returns = rng.normal(0.0005, 0.02, size=(101, 2))
+    closes = closes_from_returns(returns, ["AAA", "BBB"])
+    quantities = [10.0, -4.0]
+
+    metrics = risk.compute_risk(closes, quantities, confidence=0.95, paths=1000, seed=0)
+
+    values = np.array(quantities) * closes.iloc[-1].to_numpy()
+    pnl = sorted(sum((np.exp(day[j]) - 1.0) * values[j] for j in range(2)) for day in returns)
+    assert metrics["historical_var"] == pytest.approx(-pnl[5])
+    assert metrics["historical_cvar"] == pytest.approx(-np.mean(pnl[:6]))
+    assert metrics["portfolio_value"] == pytest.approx(values.sum())
+
+
+def test_monte_carlo_var_converges_to_the_normal_quantile():
+    rng = np.random.default_rng(11)
+    mu, sigma, value = 0.0003, 0.015, 1_000_000.0
+    returns = rng.normal(mu, sigma, size=(20000, 1))
+    # Single position: P&L is monotone in the return, so VaR is the return quantile
+    fitted_mu, fitted_sigma = returns.mean(), returns.std(ddof=1)
+    exact = -value * np.expm1(fitted_mu + fitted_sigma * norm.ppf(0.05))
+
+    errors = []
+    for paths in (1000, 200000):
+        var, cvar = risk.value_at_risk(risk.monte_carlo_pnl(returns, [value], paths=paths, seed=3), 0.95)
+        errors.append(abs(var - exact) / exact)
+        assert cvar > var
+    assert errors[1] < 0.01
+    assert errors[1] < errors[0]
+
+    # ...and to the historical VaR of the same normal history
+    hist_var, _ = risk.value_at_risk(risk.historical_pnl(returns, np.array([value])), 0.95)
+    assert hist_var == pytest.approx(exact, rel=0.03)
+
+
+def test_monte_carlo_chunking_does_not_change_the_sample():
+    returns = np.random.default_rng(5).normal(0.0, 0.01, size=(250, 3))
+    values = np.array([1000.0, 2000.0, -500.0])
+    whole = risk.monte_carlo_pnl(returns, values, paths=5000, chunk_size=5000, seed=1)
+    chunked = risk.monte_carlo_pnl(returns, values, paths=5000, chunk_size=700, seed=1)
+    np.testing.assert_allclose(chunked, whole, rtol=1e-5, atol=1e-4)
+
+
+def portfolio_risk(monkeypatch, frames):
+    """
+    Risk of a portfolio holding one share of each ticker in frames, with
+    frames standing in for the price history fetch.
+    """
+    holdings = [SimpleNamespace(ticker=ticker, quantity=1.0) for ticker in frames]
+    monkeypatch.setattr(auth, "get_portfolio", lambda db, user_id, with_holdings=False: SimpleNamespace(holdings=holdings))
+    monkeypatch.setattr(auth, "release_connection", lambda db: None)
+
+    async def fetch(ticker):
+        return frames[ticker]
+
+    monkeypatch.setattr(risk.data_fetcher, "fetch_historical_data", fetch)
+    return asyncio.run(auth.get_portfolio_risk(None, 1))
+
+
+def bars(start, periods):
+    index = pd.bdate_range(start, periods=periods)
+    return pd.DataFrame({"Close": np.linspace(100.0, 110.0, periods) + np.sin(np.arange(periods))}, index=index)
+
+
+def test_portfolio_risk_aligns_tickers_on_session_date(monkeypatch):
+    aaa = bars("2025-01-01", 60)
+    bbb = bars("2025-01-01", 60)
+    # Same sessions, different times of day and a tz-aware index
+    bbb.index = (bbb.index + pd.Timedelta(hours=16)).tz_localize("America/New_York")
+    metrics = portfolio_risk(monkeypatch, {"AAA": aaa, "BBB": bbb})
+    assert metrics.historical_var > 0
+
+
+@pytest.mark.parametrize("frames", [
+    # No overlapping sessions
+    {"AAA": bars("2024-01-01", 30), "BBB": bars("2025-01-01", 30)},
+    # No history at all for one ticker
+    {"AAA": bars("2025-01-01", 30), "BBB": pd.DataFrame()},
+    # A single bar: no returns
+    {"AAA": bars("2025-01-01", 1)},
+    # No holdings
+    {},
+])
+def test_unusable_inputs_are_a_400(monkeypatch, frames):
+    with pytest.raises(HTTPException) as excinfo:
+        portfolio_risk(monkeypatch, frames)
+    assert excinfo.value.status_code == 400
@@ -0,0 +1,107 @@
+# backend/tests/test_training_jobs.py
+
+import json
+import sys
+import sqlite3
+import asyncio
+import subprocess
+import threading
+from datetime import datetime, timedelta
+import pytest
+from app.utils.training_jobs import TrainingJobQueue, OWNER_EXITED
+from app.utils.connection_manager import ConnectionManager
+from test_connection_manager import FakeWebSocket, drain
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return TrainingJobQueue(db_path=str(tmp_path / "training_jobs.db"), retry_cooldown=900)
+
+
+def dead_pid():
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+def test_one_active_job_per_ticker(queue):
+    job, created = queue._claim("AAPL")
+    again, created_again = queue._claim("AAPL")
+    assert created and not created_again
+    assert again["id"] == job["id"]
+
+    # The partial unique index only covers queued/running jobs
+    with pytest.raises(sqlite3.IntegrityError):
+        queue._insert("AAPL")
+    queue._update(job["id"], status="succeeded", finished_at=datetime.utcnow().isoformat())
+    assert queue._insert("AAPL")["id"] != job["id"]
+
+
+def test_concurrent_claims_from_several_workers_create_one_job(queue):
+    # One queue object per worker, all on the same database file
+    workers = [TrainingJobQueue(db_path=queue.db_path) for _ in range(8)]
+    results = []
+    barrier = threading.Barrier(len(workers))
+
+    def claim(worker):
+        barrier.wait()
+        results.append(worker._claim("MSFT"))
+
+    threads = [threading.Thread(target=claim, args=(worker,)) for worker in workers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sum(created for _, created in results) == 1
+    assert len({job["id"] for job, _ in results}) == 1
+
+
+def test_job_of_a_dead_worker_is_orphaned_and_replaced(queue):
+    orphan, _ = queue._claim("AAPL")
+    queue._update(orphan["id"], owner_pid=dead_pid())
+
+    job, created = queue._claim("AAPL")
+
+    assert created and job["id"] != orphan["id"]
+    recorded = queue.get(orphan["id"])
+    assert recorded["status"] == "failed" and recorded["error"] == OWNER_EXITED
+    # Orphaned jobs don't start a retry cool-down
+    assert queue.recent_failure("AAPL") is None
+
+
+def test_failed_job_is_returned_until_the_cooldown_ends(queue):
+    failed, _ = queue._claim("AAPL")
+    queue._update(failed["id"], status="failed", finished_at=datetime.utcnow().isoformat(), error="boom")
+
+    job, created = queue._claim("AAPL")
+    assert not created and job["id"] == failed["id"]
+    assert 0 < queue.retry_after(job) <= 901
+
+    # Once the cool-down has passed, a new job starts
+    ended = (datetime.utcnow() - timedelta(seconds=901)).isoformat()
+    queue._update(failed["id"], finished_at=ended)
+    job, created = queue._claim("AAPL")
+    assert created and job["id"] != failed["id"]
+
+
+def test_completion_reaches_only_sockets_following_the_ticker(monkeypatch):
+    from app import main
+
+    async def run():
+        manager = ConnectionManager()
+        monkeypatch.setattr(main, "manager", manager)
+        following, other = FakeWebSocket(), FakeWebSocket()
+        for ws, ticker in ((following, "AAPL"), (other, "MSFT")):
+            await manager.connect(ws)
+            manager.subscribe(ws, ticker)
+
+        await main.notify_training_complete({"id": "job-1", "ticker": "AAPL", "status": "succeeded"})
+        await drain()
+
+        assert following.messages == [{"type": "training_job", "id": "job-1", "ticker": "AAPL", "status": "succeeded"}]
+        assert other.messages == []
+        for ws in (following, other):
+            manager.disconnect(ws)
+
+    asyncio.run(run())
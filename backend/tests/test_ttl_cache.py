@@ -0,0 +1,137 @@
+# backend/tests/test_ttl_cache.py
+
+import time
+import asyncio
+import threading
+import pytest
+from app.utils.ttl_cache import TTLCache
+
+
+def test_get_or_load_single_flight_across_threads():
+    cache = TTLCache()
+    calls = []
+    start = threading.Barrier(8)
+    results = []
+
+    def loader():
+        calls.append(1)
+        time.sleep(0.1)
+        return "bars"
+
+    def worker():
+        start.wait()
+        results.append(cache.get_or_load("AAPL", loader, 60))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == ["bars"] * 8
+    assert cache.get("AAPL") == "bars"
+
+
+def test_get_or_load_shares_failure_then_retries():
+    cache = TTLCache()
+
+    def failing():
+        raise RuntimeError("upstream down")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_load("AAPL", failing, 60)
+    # A failed load is not cached
+    assert cache.get_or_load("AAPL", lambda: "bars", 60) == "bars"
+
+
+def test_entries_expire():
+    cache = TTLCache()
+    cache.set("AAPL", "old", 0.05)
+    time.sleep(0.1)
+    assert cache.get("AAPL") is None
+    assert cache.get_or_load("AAPL", lambda: "new", 60) == "new"
+
+
+def test_lru_bound():
+    cache = TTLCache(max_entries=2)
+    for key in ("A", "B", "C"):
+        cache.set(key, key, 60)
+    assert cache.get("A") is None
+    assert len(cache) == 2
+
+
+def test_aget_or_load_single_flight():
+    cache = TTLCache()
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "chain"
+
+    async def main():
+        return await asyncio.gather(*(cache.aget_or_load("AAPL", loader, 60) for _ in range(10)))
+
+    assert asyncio.run(main()) == ["chain"] * 10
+    assert len(calls) == 1
+
+
+def test_cancelled_caller_does_not_cancel_shared_load():
+    cache = TTLCache()
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "chain"
+
+    async def main():
+        first = asyncio.ensure_future(cache.aget_or_load("AAPL", loader, 60))
+        await asyncio.sleep(0.01)
+        second = asyncio.ensure_future(cache.aget_or_load("AAPL", loader, 60))
+        await asyncio.sleep(0)
+        # The caller that started the load goes away (e.g. client disconnect)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(main()) == "chain"
+    assert len(calls) == 1
+    assert cache.get("AAPL") == "chain"
+
+
+def test_load_completes_when_every_caller_is_cancelled():
+    cache = TTLCache()
+
+    async def loader():
+        await asyncio.sleep(0.02)
+        return "chain"
+
+    async def main():
+        caller = asyncio.ensure_future(cache.aget_or_load("AAPL", loader, 60))
+        await asyncio.sleep(0)
+        caller.cancel()
+        await asyncio.sleep(0.05)
+
+    asyncio.run(main())
+    assert cache.get("AAPL") == "chain"
+
+
+def test_aget_or_load_shares_failure_then_retries():
+    cache = TTLCache()
+
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream down")
+
+    async def ok():
+        return "chain"
+
+    async def main():
+        results = await asyncio.gather(*(cache.aget_or_load("AAPL", failing, 60) for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(result, RuntimeError) for result in results)
+        return await cache.aget_or_load("AAPL", ok, 60)
+
+    assert asyncio.run(main()) == "chain"